@@ -0,0 +1,948 @@
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # duckdb is only needed for DuckDB databases
+    duckdb = None
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from database_queries import *
+from database_utils import close_quietly, connect_to_database, connection_pool
+from query_metrics import record_measure, start_measure
+
+# This is a file with the database backends: one interface over the SQLite,
+# MySQL and DuckDB connections, used by every stage writing to the database.
+# The queries are written for SQLite, with ? placeholders, and adapted once
+# to the other databases by translate_query. Every backend also has a bulk
+# load through staging tables with the fastest way of appending rows of its
+# database (executemany for SQLite, LOAD DATA LOCAL INFILE for MySQL and
+# registered DataFrames for DuckDB).
+
+# Files with this extension are opened as DuckDB databases, other local files as SQLite
+DUCKDB_FILE_EXTENSION: str = ".duckdb"
+
+# String literals, whose question marks are not placeholders, or a placeholder
+QUERY_PLACEHOLDER_PATTERN: re.Pattern = re.compile(r"('(?:[^']|'')*')|\?")
+
+# Escapes of the special characters in the fields of a LOAD DATA file
+LOAD_DATA_ESCAPES: Dict[int, str] = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+
+# The first MySQL version with row aliases in INSERT ... ON DUPLICATE KEY UPDATE
+MYSQL_ROW_ALIAS_VERSION: Tuple[int, int, int] = (8, 0, 19)
+
+# The columns of the rows appended to the staging tables
+STAGING_COLUMNS: Dict[str, List[str]] = {
+    "Users": [column.strip() for column in USER_COLUMNS.split(",")],
+    "Tweets": [column.strip() for column in TWEET_COLUMNS.split(",")],
+}
+
+
+def check_duckdb() -> None:
+    """
+    Check if duckdb is installed.
+
+    Raises:
+        ImportError: If duckdb is not installed.
+    """
+    if duckdb is None:
+        raise ImportError(
+            "DuckDB databases require duckdb, install it with `pip install duckdb`"
+        )
+
+
+def plan_params(query: str) -> Tuple[str, ...]:
+    """
+    Returns the parameters with which the plan of a query is explained: "0"
+    for every placeholder, as MySQL explains a comparison with NULL as a query
+    without rows.
+
+    Args:
+        query (str): The query, with ? placeholders.
+
+    Returns:
+        Tuple[str, ...]: The parameters.
+    """
+    return tuple(
+        "0"
+        for match in QUERY_PLACEHOLDER_PATTERN.finditer(query)
+        if match.group(1) is None
+    )
+
+
+def supports_row_alias(version: str) -> bool:
+    """
+    Checks if a MySQL server supports the row alias of UPSERT_USERS_MYSQL.
+
+    Args:
+        version (str): The version of the server, from SELECT VERSION(),
+            e.g. "8.0.36" or "10.11.6-MariaDB".
+
+    Returns:
+        bool: True for MySQL 8.0.19 or later, False for older servers and MariaDB.
+    """
+    match: Optional[re.Match] = re.match(r"(\d+)\.(\d+)\.(\d+)", version)
+    if match is None or "mariadb" in version.lower():
+        return False
+    return tuple(map(int, match.groups())) >= MYSQL_ROW_ALIAS_VERSION
+
+
+@lru_cache(maxsize=None)
+def translate_query(query: str, dialect: str) -> str:
+    """
+    Adapts a query written for SQLite to the dialect of a database. The result
+    is cached, so every query is only translated once.
+
+    Args:
+        query (str): The query, with ? placeholders, INSERT OR IGNORE and REPLACE INTO.
+        dialect (str): The dialect of the database, "sqlite", "mysql" or "duckdb".
+
+    Returns:
+        str: The query, with %s placeholders and INSERT IGNORE for MySQL, and
+            INSERT OR REPLACE INTO for DuckDB.
+    """
+    if dialect == "mysql":
+        query = QUERY_PLACEHOLDER_PATTERN.sub(
+            lambda match: match.group(1) or "%s", query
+        )
+        return query.replace("INSERT OR IGNORE", "INSERT IGNORE").replace(
+            "INSERT OR REPLACE", "REPLACE"
+        )
+    if dialect == "duckdb":
+        return re.sub(r"(?<!OR )\bREPLACE INTO\b", "INSERT OR REPLACE INTO", query)
+    return query
+
+
+def format_load_data_value(value: Any) -> str:
+    """
+    Formats a value as a field of a LOAD DATA file (see the MySQL bulk load queries).
+
+    Args:
+        value (Any): The value of a user or tweet row.
+
+    Returns:
+        str: The field, with \\N for None and the tabs, newlines and backslashes escaped.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime):
+        # Like mysql-connector, which ignores the time zone of the timestamps
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value).translate(LOAD_DATA_ESCAPES)
+
+
+def write_load_data_file(file_path: str, rows: List[Tuple[Any, ...]]) -> None:
+    """
+    Writes rows to a tab-separated file for LOAD DATA LOCAL INFILE.
+
+    Args:
+        file_path (str): The path to the file, overwritten if it exists.
+        rows (List[Tuple[Any, ...]]): The user or tweet rows.
+
+    Returns:
+        None
+    """
+    # newline="" so that the rows end with \n on Windows as well
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        file.writelines(
+            "\t".join(map(format_load_data_value, row)) + "\n" for row in rows
+        )
+
+
+class DatabaseBackend(ABC):
+    """
+    A connection to a database, running the queries written for SQLite in
+    the dialect of the database.
+
+    The SQLite and MySQL connections are taken from the connection pool of
+    database_utils and given back by close, except the ones of a bulk load,
+    which change the settings of the connection.
+
+    A bulk load appends the rows of every batch to staging tables without keys
+    (begin_bulk_load and stage_rows), and end_bulk_load then fills the Users
+    and Tweets tables from them, keeping the newest snapshot of every user and
+    the first row of every tweet ID like the upserts of the batch insertion.
+
+    Every database implements the abstract methods: the connection, the
+    secondary indexes, the query plans and the bulk load.
+
+    Attributes:
+        dialect (str): The dialect of the queries, see translate_query.
+        table_creation (List[str]): The queries creating the tables.
+        table_creation_integer_ids (List[str]): The queries creating the
+            tables with integer IDs (see the Integer IDs queries).
+        upsert_users (str): The query inserting a user row, or updating the
+            user if the row is a newer snapshot.
+        added_columns (List[Tuple[str, str, str]]): The columns added to the
+            tables of older databases, see ADDED_COLUMNS_SQLITE.
+        secondary_indexes (Dict[str, Tuple[str, str, str]]): The managed
+            indexes of the database, see SECONDARY_INDEXES.
+    """
+
+    dialect: str = "sqlite"
+    table_creation: List[str] = []
+    table_creation_integer_ids: List[str] = []
+    upsert_users: str = ""
+    added_columns: List[Tuple[str, str, str]] = []
+    secondary_indexes: Dict[str, Tuple[str, str, str]] = {}
+
+    def __init__(self, connection_params: Dict[str, Any], pooled: bool = False):
+        self.connection_params = connection_params
+        self.pooled = pooled
+        self.connection = self.connect()
+
+    def __enter__(self) -> "DatabaseBackend":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """
+        Connects to the database.
+
+        Returns:
+            Any: The connection object.
+        """
+
+    def close(self) -> None:
+        """
+        Closes the connection, discarding the uncommitted changes.
+
+        Returns:
+            None
+        """
+        self.connection.close()
+
+    def prepare(self, query: str) -> str:
+        """
+        Adapts a query written for SQLite to the database, see translate_query.
+
+        Args:
+            query (str): The query.
+
+        Returns:
+            str: The query in the dialect of the database.
+        """
+        return translate_query(query, self.dialect)
+
+    def execute(
+        self, query: str, params: Union[Tuple[Any, ...], List[Any]] = ()
+    ) -> Any:
+        """
+        Executes a query with its parameters.
+
+        Args:
+            query (str): The query, written for SQLite.
+            params (Union[Tuple[Any, ...], List[Any]], optional): The parameters. Defaults to ().
+
+        Returns:
+            Any: A cursor with the results of the query.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(self.prepare(query), params)
+        return cursor
+
+    def executemany(self, query: str, rows: List[Tuple[Any, ...]]) -> None:
+        """
+        Executes a query once for every row of parameters.
+
+        Args:
+            query (str): The query, written for SQLite.
+            rows (List[Tuple[Any, ...]]): The parameters of every execution.
+
+        Returns:
+            None
+        """
+        self.connection.cursor().executemany(self.prepare(query), rows)
+
+    def commit(self) -> None:
+        """
+        Commits the current transaction.
+
+        Returns:
+            None
+        """
+        self.connection.commit()
+
+    def execute_queries(
+        self, queries: List[Union[str, Tuple[str, List[Tuple[Any, ...]]]]]
+    ) -> None:
+        """
+        Executes a list of queries in one transaction, like
+        database_utils.execute_queries.
+
+        Args:
+            queries (List[Union[str, Tuple[str, List[Tuple[Any, ...]]]]]): The
+                queries, written for SQLite, where each query can be a string or
+                a tuple containing the query and the rows of parameters.
+
+        Returns:
+            None
+        """
+        for query in queries:
+            started = start_measure()
+            if isinstance(query, str):
+                cursor = self.execute(query)
+                if started is not None:
+                    rows: Optional[int] = getattr(cursor, "rowcount", None)
+                    record_measure(started, "backend_execute", query, rows)
+            else:
+                self.executemany(*query)
+                if started is not None:
+                    record_measure(
+                        started,
+                        "backend_executemany",
+                        query[0],
+                        len(query[1]),
+                        query[1],
+                    )
+        self.commit()
+
+    def create_tables(self, integer_ids: bool = False) -> None:
+        """
+        Creates the tables of the database if they do not exist, and adds the
+        columns of added_columns to the tables which were created without them.
+
+        Args:
+            integer_ids (bool, optional): Whether the tweet and user IDs are
+                stored as integers instead of text. Defaults to False.
+
+        Returns:
+            None
+        """
+        self.execute_queries(
+            self.table_creation_integer_ids if integer_ids else self.table_creation
+        )
+        self.execute_queries(
+            [
+                f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"
+                for table, column, column_type in self.added_columns
+                if column not in self.table_columns(table)
+            ]
+        )
+
+    def table_columns(self, table: str) -> List[str]:
+        """
+        Returns the columns of a table.
+
+        Args:
+            table (str): The name of the table.
+
+        Returns:
+            List[str]: The names of its columns, in order.
+        """
+        cursor = self.execute(f"SELECT * FROM {table} LIMIT 0")
+        cursor.fetchall()
+        return [column[0] for column in cursor.description]
+
+    def update_rows(
+        self, table: str, column: str, key_column: str, rows: List[Tuple[Any, Any]]
+    ) -> None:
+        """
+        Sets a column of the rows of a table, e.g. the sentiment scores of tweets.
+
+        Args:
+            table (str): The name of the table.
+            column (str): The name of the updated column.
+            key_column (str): The name of the column identifying the rows.
+            rows (List[Tuple[Any, Any]]): (value, key) pairs.
+
+        Returns:
+            None
+        """
+        self.execute_queries(
+            [(f"UPDATE {table} SET {column} = ? WHERE {key_column} = ?", rows)]
+        )
+
+    @abstractmethod
+    def create_indexes(self) -> None:
+        """
+        Creates the secondary indexes which do not exist yet, once the tables
+        are loaded.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def drop_indexes(self) -> None:
+        """
+        Drops the secondary indexes before a load, so that they are built at
+        once by create_indexes instead of being updated for every row.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def query_plan(self, query: str) -> List[str]:
+        """
+        Explains how the database runs a query, with "0" for every parameter.
+
+        Args:
+            query (str): The query, written for SQLite.
+
+        Returns:
+            List[str]: One line per step of the plan, naming the index it uses.
+        """
+
+    def index_aliases(self, index: str) -> List[str]:
+        """
+        Returns the names under which the database may use a secondary index.
+
+        Args:
+            index (str): The name of the index, see SECONDARY_INDEXES.
+
+        Returns:
+            List[str]: The names of the index.
+        """
+        return [index]
+
+    def uses_index(self, query: str, index: str) -> bool:
+        """
+        Checks with the plan of a query whether the database uses an index for it.
+
+        Args:
+            query (str): The query, written for SQLite.
+            index (str): The name of the index, see SECONDARY_INDEXES.
+
+        Returns:
+            bool: Whether a step of the plan uses the index.
+        """
+        pattern: re.Pattern = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, self.index_aliases(index))) + r")\b"
+        )
+        return any(pattern.search(line) for line in self.query_plan(query))
+
+    def check_indexed_queries(self) -> Dict[str, bool]:
+        """
+        Checks that every hot query of INDEXED_QUERIES uses its index.
+
+        Returns:
+            Dict[str, bool]: Whether each query uses its index, for the
+                queries with an index managed by the database.
+        """
+        return {
+            name: self.uses_index(query, index)
+            for name, (query, index) in INDEXED_QUERIES.items()
+            if index in self.secondary_indexes
+        }
+
+    @abstractmethod
+    def begin_bulk_load(self) -> None:
+        """
+        Creates the empty staging tables of a bulk load.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def stage_rows(self, table: str, rows: List[Tuple[Any, ...]]) -> None:
+        """
+        Appends rows to the staging table of a bulk load.
+
+        Args:
+            table (str): "Users" or "Tweets".
+            rows (List[Tuple[Any, ...]]): The rows, with the columns of STAGING_COLUMNS.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def end_bulk_load(self) -> None:
+        """
+        Fills the Users and Tweets tables from the staging tables, drops them
+        and commits the bulk load.
+
+        Returns:
+            None
+        """
+
+
+class SqliteBackend(DatabaseBackend):
+    """
+    A local SQLite database.
+
+    sqlite3 keeps the compiled statements of a connection by their text, so
+    the queries are only compiled once per connection.
+
+    The bulk load runs in a single transaction without a rollback journal, so
+    a load interrupted by a crash leaves a database which has to be reset.
+    """
+
+    dialect: str = "sqlite"
+    table_creation: List[str] = [
+        CREATE_USERS_SQLITE,
+        CREATE_TWEETS_SQLITE,
+        CREATE_CONVERSATIONS_SQLITE,
+        CREATE_CONVERSATIONS_CATEGORY_SQLITE,
+        CREATE_LOAD_PROGRESS_SQLITE,
+    ]
+    table_creation_integer_ids: List[str] = [
+        CREATE_USERS_SQLITE_INTEGER_IDS,
+        CREATE_TWEETS_SQLITE_INTEGER_IDS,
+        CREATE_CONVERSATIONS_SQLITE_INTEGER_IDS,
+        CREATE_CONVERSATIONS_CATEGORY_SQLITE,
+        CREATE_LOAD_PROGRESS_SQLITE,
+    ]
+    upsert_users: str = UPSERT_USERS_SQLITE
+    added_columns: List[Tuple[str, str, str]] = ADDED_COLUMNS_SQLITE
+    secondary_indexes: Dict[str, Tuple[str, str, str]] = SECONDARY_INDEXES
+    insert_staging: Dict[str, str] = {
+        "Users": INSERT_USERS_STAGING_SQLITE,
+        "Tweets": INSERT_TWEETS_STAGING_SQLITE,
+    }
+
+    def connect(self) -> sqlite3.Connection:
+        if self.pooled:
+            return connection_pool.acquire(self.connection_params, local=True)
+        return connect_to_database(self.connection_params, local=True)
+
+    def close(self) -> None:
+        if self.pooled:
+            connection_pool.release(self.connection, self.connection_params, True)
+        else:
+            self.connection.close()
+
+    def execute(
+        self, query: str, params: Union[Tuple[Any, ...], List[Any]] = ()
+    ) -> sqlite3.Cursor:
+        return self.connection.execute(self.prepare(query), params)
+
+    def executemany(self, query: str, rows: List[Tuple[Any, ...]]) -> None:
+        self.connection.executemany(self.prepare(query), rows)
+
+    def create_indexes(self) -> None:
+        self.execute_queries(
+            [
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table}({column})"
+                + (f" WHERE {condition}" if condition else "")
+                for name, (table, column, condition) in self.secondary_indexes.items()
+            ]
+        )
+
+    def drop_indexes(self) -> None:
+        self.execute_queries(
+            [f"DROP INDEX IF EXISTS {name}" for name in self.secondary_indexes]
+        )
+
+    def query_plan(self, query: str) -> List[str]:
+        # The detail column, e.g. "SEARCH Tweets USING INDEX idx_tweets_unscored (sentiment_score=?)"
+        return [
+            row[3]
+            for row in self.execute(f"EXPLAIN QUERY PLAN {query}", plan_params(query))
+        ]
+
+    def begin_bulk_load(self) -> None:
+        # The transaction is started and committed explicitly
+        self.connection.isolation_level = None
+        for query in SQLITE_BULK_LOAD_PRAGMAS + ["BEGIN"] + DROP_STAGING_SQLITE:
+            self.connection.execute(query)
+        self.connection.execute(CREATE_USERS_STAGING_SQLITE)
+        self.connection.execute(CREATE_TWEETS_STAGING_SQLITE)
+
+    def stage_rows(self, table: str, rows: List[Tuple[Any, ...]]) -> None:
+        self.connection.executemany(self.insert_staging[table], rows)
+
+    def end_bulk_load(self) -> None:
+        for query in [
+            MERGE_USERS_STAGING_SQLITE,
+            MERGE_TWEETS_STAGING_SQLITE,
+            *DROP_STAGING_SQLITE,
+            "COMMIT",
+        ]:
+            self.connection.execute(query)
+
+
+class MysqlBackend(DatabaseBackend):
+    """
+    A remote MySQL database.
+
+    The INSERT queries run by executemany are sent as a single multi-row
+    INSERT by mysql-connector. The other ones (e.g. the updates of the
+    sentiment scores) run as server-side prepared statements, prepared once
+    per connection.
+
+    The bulk load writes every batch to temporary tab-separated files, which
+    are uploaded with LOAD DATA LOCAL INFILE. The server must allow it with the
+    local_infile variable set to ON.
+
+    The user upsert depends on the version of the server, see upsert_users.
+    """
+
+    dialect: str = "mysql"
+    table_creation: List[str] = [
+        CREATE_USERS_MYSQL,
+        CREATE_TWEETS_MYSQL,
+        CREATE_CONVERSATIONS_MYSQL,
+        CREATE_CONVERSATIONS_CATEGORY_MYSQL,
+        CREATE_LOAD_PROGRESS_MYSQL,
+    ]
+    table_creation_integer_ids: List[str] = [
+        CREATE_USERS_MYSQL_INTEGER_IDS,
+        CREATE_TWEETS_MYSQL_INTEGER_IDS,
+        CREATE_CONVERSATIONS_MYSQL_INTEGER_IDS,
+        CREATE_CONVERSATIONS_CATEGORY_MYSQL,
+        CREATE_LOAD_PROGRESS_MYSQL,
+    ]
+    added_columns: List[Tuple[str, str, str]] = ADDED_COLUMNS_MYSQL
+    secondary_indexes: Dict[str, Tuple[str, str, str]] = SECONDARY_INDEXES
+    load_staging: Dict[str, str] = {
+        "Users": LOAD_USERS_STAGING_MYSQL,
+        "Tweets": LOAD_TWEETS_STAGING_MYSQL,
+    }
+
+    def __init__(
+        self,
+        connection_params: Dict[str, Any],
+        pooled: bool = False,
+        allow_local_infile: bool = False,
+    ):
+        self.allow_local_infile = allow_local_infile
+        self.prepared_cursors: Dict[str, Any] = {}
+        self.load_directory: Optional[str] = None
+        self._upsert_users: Optional[str] = None
+        super().__init__(connection_params, pooled)
+        # Shared by the queries, like the temporary staging tables of the connection
+        self.cursor = self.connection.cursor()
+
+    def connect(self) -> Any:
+        if self.pooled:
+            return connection_pool.acquire(
+                self.connection_params, False, self.allow_local_infile
+            )
+        return connect_to_database(
+            self.connection_params,
+            local=False,
+            allow_local_infile=self.allow_local_infile,
+        )
+
+    def close(self) -> None:
+        try:
+            if self.pooled:
+                # The server-side prepared statements only live as long as
+                # their cursor, not as long as the pooled connection
+                for cursor in [self.cursor, *self.prepared_cursors.values()]:
+                    close_quietly(cursor)
+                connection_pool.release(
+                    self.connection,
+                    self.connection_params,
+                    False,
+                    self.allow_local_infile,
+                )
+            else:
+                super().close()
+        finally:
+            if self.load_directory is not None:
+                shutil.rmtree(self.load_directory, ignore_errors=True)
+
+    def execute(
+        self, query: str, params: Union[Tuple[Any, ...], List[Any]] = ()
+    ) -> Any:
+        self.cursor.execute(self.prepare(query), params)
+        return self.cursor
+
+    def executemany(self, query: str, rows: List[Tuple[Any, ...]]) -> None:
+        query = self.prepare(query)
+        if query.lstrip().upper().startswith(("INSERT", "REPLACE")):
+            self.cursor.executemany(query, rows)
+            return
+        if query not in self.prepared_cursors:
+            self.prepared_cursors[query] = self.connection.cursor(prepared=True)
+        self.prepared_cursors[query].executemany(query, rows)
+
+    @property
+    def upsert_users(self) -> str:
+        """
+        The user upsert for the version of the server, checked once: with the
+        row alias of MySQL 8.0.19 and later, or with the VALUES() function on
+        older servers and MariaDB, which do not support the alias.
+        """
+        if self._upsert_users is None:
+            version: str = self.execute("SELECT VERSION()").fetchone()[0]
+            self._upsert_users = (
+                UPSERT_USERS_MYSQL
+                if supports_row_alias(version)
+                else UPSERT_USERS_MYSQL_VALUES
+            )
+        return self._upsert_users
+
+    def existing_indexes(self) -> Dict[Tuple[str, str], List[str]]:
+        """
+        Returns the indexes of the database by their table and first column.
+
+        Returns:
+            Dict[Tuple[str, str], List[str]]: The names of the indexes of every
+                (table, column) pair.
+        """
+        indexes: Dict[Tuple[str, str], List[str]] = {}
+        for name, table, column in self.execute(SELECT_INDEXES_MYSQL).fetchall():
+            indexes.setdefault((table, column), []).append(name)
+        return indexes
+
+    def create_indexes(self) -> None:
+        # The foreign keys already have an index on their column, which is kept
+        # instead of a duplicate. All the indexes of a table are added by a
+        # single ALTER TABLE, which reads the table once.
+        existing: Dict[Tuple[str, str], List[str]] = self.existing_indexes()
+        added: Dict[str, List[str]] = {}
+        for name, (table, column, _) in self.secondary_indexes.items():
+            if (table, column) not in existing:
+                added.setdefault(table, []).append(f"ADD INDEX {name} ({column})")
+        self.execute_queries(
+            [f"ALTER TABLE {table} {', '.join(adds)}" for table, adds in added.items()]
+        )
+
+    def drop_indexes(self) -> None:
+        existing: Dict[Tuple[str, str], List[str]] = self.existing_indexes()
+        dropped: Dict[str, List[str]] = {}
+        for name, (table, column, _) in self.secondary_indexes.items():
+            if name in existing.get((table, column), []):
+                dropped.setdefault(table, []).append(f"DROP INDEX {name}")
+        self.execute_queries(
+            [
+                f"ALTER TABLE {table} {', '.join(drops)}"
+                for table, drops in dropped.items()
+            ]
+        )
+
+    def query_plan(self, query: str) -> List[str]:
+        # The key column, i.e. the index used for every table of the query
+        cursor = self.execute(f"EXPLAIN {query}", plan_params(query))
+        key: int = [column[0] for column in cursor.description].index("key")
+        return [str(row[key]) for row in cursor.fetchall()]
+
+    def index_aliases(self, index: str) -> List[str]:
+        table, column, _ = self.secondary_indexes[index]
+        return [index, *self.existing_indexes().get((table, column), [])]
+
+    def begin_bulk_load(self) -> None:
+        self.load_directory = tempfile.mkdtemp(prefix="load_data_")
+        for query in DROP_STAGING_MYSQL + [
+            CREATE_USERS_STAGING_MYSQL,
+            CREATE_TWEETS_STAGING_MYSQL,
+        ]:
+            self.cursor.execute(query)
+
+    def stage_rows(self, table: str, rows: List[Tuple[Any, ...]]) -> None:
+        file_path: str = os.path.join(self.load_directory, f"{table}.tsv")
+        write_load_data_file(file_path, rows)
+        self.cursor.execute(self.load_staging[table], (file_path,))
+
+    def end_bulk_load(self) -> None:
+        for query in [
+            MERGE_USERS_STAGING_MYSQL,
+            MERGE_TWEETS_STAGING_MYSQL,
+            *DROP_STAGING_MYSQL,
+        ]:
+            self.cursor.execute(query)
+        self.connection.commit()
+
+
+class DuckdbBackend(DatabaseBackend):
+    """
+    A local DuckDB database, for files ending with DUCKDB_FILE_EXTENSION.
+
+    DuckDB commits every query by itself, so execute_queries runs its queries
+    in an explicit transaction. DuckDB runs an INSERT per row slowly, so the
+    batches of the insertion (see staged_queries), the updates of update_rows
+    and the bulk load are run on all their rows at once, from a registered
+    DataFrame.
+    """
+
+    dialect: str = "duckdb"
+    table_creation: List[str] = [
+        CREATE_USERS_DUCKDB,
+        CREATE_TWEETS_DUCKDB,
+        CREATE_CONVERSATIONS_DUCKDB,
+        CREATE_CONVERSATIONS_CATEGORY_DUCKDB,
+        CREATE_LOAD_PROGRESS_DUCKDB,
+    ]
+    table_creation_integer_ids: List[str] = [
+        CREATE_USERS_DUCKDB_INTEGER_IDS,
+        CREATE_TWEETS_DUCKDB_INTEGER_IDS,
+        CREATE_CONVERSATIONS_DUCKDB_INTEGER_IDS,
+        CREATE_CONVERSATIONS_CATEGORY_DUCKDB,
+        CREATE_LOAD_PROGRESS_DUCKDB,
+    ]
+    upsert_users: str = UPSERT_USERS_DUCKDB
+    added_columns: List[Tuple[str, str, str]] = ADDED_COLUMNS_DUCKDB
+    insert_staging: Dict[str, str] = {
+        "Users": INSERT_USERS_STAGING_DUCKDB,
+        "Tweets": INSERT_TWEETS_STAGING_DUCKDB,
+    }
+    # The queries run by executemany on all the rows at once, with the columns
+    # of their rows
+    staged_queries: Dict[str, Tuple[str, List[str]]] = {
+        UPSERT_USERS_DUCKDB: (UPSERT_USERS_STAGED_DUCKDB, STAGING_COLUMNS["Users"]),
+        INSERT_TWEETS: (INSERT_TWEETS_STAGED_DUCKDB, STAGING_COLUMNS["Tweets"]),
+    }
+
+    def connect(self) -> "duckdb.DuckDBPyConnection":
+        check_duckdb()
+        return duckdb.connect(self.connection_params["file_path"])
+
+    def execute(
+        self, query: str, params: Union[Tuple[Any, ...], List[Any]] = ()
+    ) -> "duckdb.DuckDBPyConnection":
+        return self.connection.execute(self.prepare(query), params)
+
+    def executemany(self, query: str, rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        if query in self.staged_queries:
+            self.execute_on_rows(*self.staged_queries[query], rows)
+        else:
+            self.connection.executemany(self.prepare(query), rows)
+
+    def execute_on_rows(
+        self, query: str, columns: List[str], rows: List[Tuple[Any, ...]]
+    ) -> None:
+        """
+        Executes a query reading rows from the table staged_rows, registered as
+        a DataFrame for the query, with the position of every row as staged_row.
+
+        Args:
+            query (str): The query.
+            columns (List[str]): The names of the columns of the rows.
+            rows (List[Tuple[Any, ...]]): The rows.
+
+        Returns:
+            None
+        """
+        # One array per column with the nullable types of pandas, as a column
+        # of integer IDs with NULL would otherwise be rounded to float
+        staged_rows = pd.DataFrame(
+            {column: pd.array(values) for column, values in zip(columns, zip(*rows))}
+        )
+        staged_rows["staged_row"] = range(len(rows))
+        self.connection.register("staged_rows", staged_rows)
+        try:
+            self.connection.execute(query)
+        finally:
+            self.connection.unregister("staged_rows")
+
+    def execute_queries(
+        self, queries: List[Union[str, Tuple[str, List[Tuple[Any, ...]]]]]
+    ) -> None:
+        self.connection.begin()
+        try:
+            super().execute_queries(queries)
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def update_rows(
+        self, table: str, column: str, key_column: str, rows: List[Tuple[Any, Any]]
+    ) -> None:
+        if not rows:
+            return
+        # The last value of every key is kept, like with one UPDATE per row
+        query: str = f"""
+        UPDATE {table} SET {column} = updates.{column}
+        FROM (
+            SELECT {column}, {key_column} FROM staged_rows
+            QUALIFY row_number() OVER (
+                PARTITION BY {key_column} ORDER BY staged_row DESC
+            ) = 1
+        ) AS updates
+        WHERE {table}.{key_column} = updates.{key_column}
+        """
+        started = start_measure()
+        self.connection.begin()
+        try:
+            self.execute_on_rows(query, [column, key_column], rows)
+        except Exception:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+        if started is not None:
+            record_measure(started, "backend_executemany", query, len(rows), rows)
+
+    # DuckDB scans the columns of its tables instead of using secondary
+    # indexes, which would only slow down the loads
+    def create_indexes(self) -> None:
+        pass
+
+    def drop_indexes(self) -> None:
+        pass
+
+    def query_plan(self, query: str) -> List[str]:
+        plan: str = self.execute(f"EXPLAIN {query}", plan_params(query)).fetchall()[0][
+            1
+        ]
+        return plan.splitlines()
+
+    def begin_bulk_load(self) -> None:
+        self.connection.begin()
+        for query in DROP_STAGING_DUCKDB + [
+            CREATE_USERS_STAGING_DUCKDB,
+            CREATE_TWEETS_STAGING_DUCKDB,
+        ]:
+            self.connection.execute(query)
+
+    def stage_rows(self, table: str, rows: List[Tuple[Any, ...]]) -> None:
+        if rows:
+            self.execute_on_rows(
+                self.insert_staging[table], STAGING_COLUMNS[table], rows
+            )
+
+    def end_bulk_load(self) -> None:
+        for query in [
+            MERGE_USERS_STAGING_DUCKDB,
+            MERGE_TWEETS_STAGING_DUCKDB,
+            *DROP_STAGING_DUCKDB,
+        ]:
+            self.connection.execute(query)
+        self.connection.commit()
+
+
+def open_backend(
+    connection_params: Dict[str, Any], local: bool, bulk_load: bool = False
+) -> DatabaseBackend:
+    """
+    Connects to a database through its backend.
+
+    Args:
+        connection_params (Dict[str, Any]): The parameters required to establish
+            the database connection, see database_utils.form_connection_params.
+        local (bool): Flag indicating whether the database is local (SQLite, or
+            DuckDB for a file ending with DUCKDB_FILE_EXTENSION) or remote (MySQL).
+        bulk_load (bool, optional): Whether the connection is used for a bulk
+            load, which MySQL only allows to upload files. Defaults to False.
+
+    Returns:
+        DatabaseBackend: The backend, to be closed (e.g. with a with statement).
+    """
+    if not local:
+        return MysqlBackend(
+            connection_params, pooled=not bulk_load, allow_local_infile=bulk_load
+        )
+    if connection_params["file_path"].endswith(DUCKDB_FILE_EXTENSION):
+        # Not pooled, as an open DuckDB database is locked for other processes
+        return DuckdbBackend(connection_params)
+    return SqliteBackend(connection_params, pooled=not bulk_load)
@@ -1,3 +1,8 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from viz_constants import QUERY_REPLY
+
 categories = [
     "Baggage and Luggage",
     "Booking",
@@ -27,7 +32,8 @@ CREATE TABLE IF NOT EXISTS Users(
     statuses_count INTEGER NOT NULL,
     creation_time DATETIME NOT NULL,
     default_profile INTEGER NOT NULL,  -- 0 or 1 for boolean
-    default_profile_image INTEGER NOT NULL  -- 0 or 1 for boolean
+    default_profile_image INTEGER NOT NULL,  -- 0 or 1 for boolean
+    snapshot_time DATETIME  -- creation time of the tweet the user data is from
 );
 """
 
@@ -81,7 +87,8 @@ CREATE TABLE IF NOT EXISTS Users(
     statuses_count INT UNSIGNED NOT NULL,
     creation_time TIMESTAMP NOT NULL,
     default_profile TINYINT(1) NOT NULL,
-    default_profile_image TINYINT(1) NOT NULL            
+    default_profile_image TINYINT(1) NOT NULL,
+    snapshot_time TIMESTAMP NULL
 );
 """
 
@@ -122,3 +129,514 @@ CREATE TABLE IF NOT EXISTS ConversationsCategory (
     FOREIGN KEY (conversation_id) REFERENCES Conversations(conversation_id)
 );
 """
+
+
+# DuckDB
+# DuckDB checks the foreign keys of a table on every update of the rows they
+# reference, and only accepts references to a whole key (ConversationsCategory
+# references a part of the key of Conversations), so its tables have none.
+CREATE_USERS_DUCKDB: str = """
+CREATE TABLE IF NOT EXISTS Users(
+    user_id VARCHAR PRIMARY KEY,
+    verified TINYINT NOT NULL,
+    followers_count INTEGER NOT NULL,
+    friends_count INTEGER NOT NULL,
+    statuses_count INTEGER NOT NULL,
+    creation_time TIMESTAMP NOT NULL,
+    default_profile TINYINT NOT NULL,
+    default_profile_image TINYINT NOT NULL,
+    snapshot_time TIMESTAMP
+);
+"""
+
+CREATE_TWEETS_DUCKDB: str = """
+CREATE TABLE IF NOT EXISTS Tweets(
+    tweet_id VARCHAR PRIMARY KEY,
+    user_id VARCHAR NOT NULL,
+    full_text VARCHAR NOT NULL,
+    lang VARCHAR NOT NULL,
+    creation_time TIMESTAMP NOT NULL,
+    country_code VARCHAR,
+    favorite_count INTEGER NOT NULL,
+    retweet_count INTEGER NOT NULL,
+    possibly_sensitive TINYINT,
+    replied_tweet_id VARCHAR,
+    reply_count INTEGER NOT NULL,
+    quoted_status_id VARCHAR,
+    quote_count INTEGER NOT NULL,
+    sentiment_score REAL
+);
+"""
+
+CREATE_CONVERSATIONS_DUCKDB: str = """
+CREATE TABLE IF NOT EXISTS Conversations (
+    conversation_id INTEGER,
+    tweet_order SMALLINT,
+    tweet_id VARCHAR,
+    PRIMARY KEY (conversation_id, tweet_order)
+);
+"""
+
+CREATE_CONVERSATIONS_CATEGORY_DUCKDB: str = f"""
+CREATE TABLE IF NOT EXISTS ConversationsCategory (
+    conversation_id INTEGER PRIMARY KEY,
+    category VARCHAR NOT NULL CHECK(category IN ({formatted_categories}))
+);
+"""
+
+
+# Integer IDs
+# An optional variant of the tables, with the snowflake IDs of the tweets and
+# users stored as 64-bit integers instead of text (converted on ingest, see
+# helper_functions.convert_ids_to_integers). The keys, their indexes and the
+# joins on them are several times smaller, and SQLite stores the Users and
+# Tweets tables in the order of their INTEGER PRIMARY KEY without a separate
+# index. SQLite integers are signed, which holds the snowflake IDs (< 2**63).
+ID_COLUMNS: List[str] = ["user_id", "tweet_id", "replied_tweet_id", "quoted_status_id"]
+
+
+def with_integer_ids(create_query: str, text_type: str, integer_type: str) -> str:
+    """
+    Returns a CREATE TABLE query with the type of the ID columns replaced.
+
+    Args:
+        create_query (str): The query, with the text IDs.
+        text_type (str): The type of the text IDs, e.g. "VARCHAR(20)".
+        integer_type (str): The type of the integer IDs, e.g. "BIGINT UNSIGNED".
+
+    Returns:
+        str: The query, with the integer IDs.
+    """
+    return re.sub(
+        rf"\b({'|'.join(ID_COLUMNS)}) {re.escape(text_type)}",
+        rf"\1 {integer_type}",
+        create_query,
+    )
+
+
+CREATE_USERS_SQLITE_INTEGER_IDS: str = with_integer_ids(
+    CREATE_USERS_SQLITE, "TEXT", "INTEGER"
+)
+CREATE_TWEETS_SQLITE_INTEGER_IDS: str = with_integer_ids(
+    CREATE_TWEETS_SQLITE, "TEXT", "INTEGER"
+)
+CREATE_CONVERSATIONS_SQLITE_INTEGER_IDS: str = with_integer_ids(
+    CREATE_CONVERSATIONS_SQLITE, "TEXT", "INTEGER"
+)
+
+CREATE_USERS_MYSQL_INTEGER_IDS: str = with_integer_ids(
+    CREATE_USERS_MYSQL, "VARCHAR(20)", "BIGINT UNSIGNED"
+)
+CREATE_TWEETS_MYSQL_INTEGER_IDS: str = with_integer_ids(
+    CREATE_TWEETS_MYSQL, "VARCHAR(20)", "BIGINT UNSIGNED"
+)
+CREATE_CONVERSATIONS_MYSQL_INTEGER_IDS: str = with_integer_ids(
+    CREATE_CONVERSATIONS_MYSQL, "VARCHAR(20)", "BIGINT UNSIGNED"
+)
+
+CREATE_USERS_DUCKDB_INTEGER_IDS: str = with_integer_ids(
+    CREATE_USERS_DUCKDB, "VARCHAR", "UBIGINT"
+)
+CREATE_TWEETS_DUCKDB_INTEGER_IDS: str = with_integer_ids(
+    CREATE_TWEETS_DUCKDB, "VARCHAR", "UBIGINT"
+)
+CREATE_CONVERSATIONS_DUCKDB_INTEGER_IDS: str = with_integer_ids(
+    CREATE_CONVERSATIONS_DUCKDB, "VARCHAR", "UBIGINT"
+)
+
+
+# The columns added to the tables after they were first created, as (table,
+# column, type). create_tables adds them to the tables of an older database,
+# so that it does not have to be filled again.
+ADDED_COLUMNS_SQLITE: List[Tuple[str, str, str]] = [
+    ("Users", "snapshot_time", "DATETIME"),
+]
+ADDED_COLUMNS_MYSQL: List[Tuple[str, str, str]] = [
+    ("Users", "snapshot_time", "TIMESTAMP NULL"),
+]
+ADDED_COLUMNS_DUCKDB: List[Tuple[str, str, str]] = [
+    ("Users", "snapshot_time", "TIMESTAMP"),
+]
+
+
+# SQLite bulk load
+# The rows are first appended to temporary staging tables without any key (in
+# a separate file, deleted when the connection is closed), and the keyed
+# tables are then filled in one pass sorted by their key, which builds the
+# primary key indexes sequentially. Like the insertion of every batch, the
+# newest snapshot of every user is kept (see UPSERT_USERS_SQLITE), and the
+# first of the duplicated tweet IDs, by sorting by the staging rowid as well.
+USER_COLUMNS: str = """user_id, verified, followers_count, friends_count,
+    statuses_count, creation_time, default_profile, default_profile_image, snapshot_time"""
+
+# The user columns updated by a newer snapshot of the user, snapshot_time last
+USER_SNAPSHOT_COLUMNS: List[str] = [
+    column.strip() for column in USER_COLUMNS.split(",")[1:]
+]
+
+# Updates of a user by a newer snapshot, in the upserts of the Users table
+# (a snapshot without time is never newer, like in reduce_user_snapshots)
+UPDATE_NEWER_SNAPSHOT_SQLITE: str = (
+    ",\n    ".join(f"{column} = excluded.{column}" for column in USER_SNAPSHOT_COLUMNS)
+    + "\nWHERE excluded.snapshot_time > Users.snapshot_time"
+    "\nOR (Users.snapshot_time IS NULL AND excluded.snapshot_time IS NOT NULL)"
+)
+
+
+def update_newer_snapshot_mysql(new: str) -> str:
+    """
+    Returns the updates of a user by a newer snapshot, in the MySQL upserts of
+    the Users table. MySQL has no WHERE clause for the update, and evaluates
+    the assignments in order, so snapshot_time is compared in every one before
+    being updated last. The columns are qualified by the table, as the staging
+    table has the same columns.
+
+    Args:
+        new (str): The inserted value of a column, with {column} for its
+            name: "new.{column}" for the row alias of the inserted values
+            (MySQL 8.0.19 or later), "VALUES({column})" for older servers
+            and MariaDB, or "UsersStaging.{column}" for the table the inserted
+            rows are selected from.
+
+    Returns:
+        str: The assignments of ON DUPLICATE KEY UPDATE.
+    """
+    new_snapshot_time: str = new.format(column="snapshot_time")
+    return ",\n    ".join(
+        f"Users.{column} = IF({new_snapshot_time} > Users.snapshot_time "
+        f"OR (Users.snapshot_time IS NULL AND {new_snapshot_time} IS NOT NULL), "
+        f"{new.format(column=column)}, Users.{column})"
+        for column in USER_SNAPSHOT_COLUMNS
+    )
+
+
+TWEET_COLUMNS: str = """tweet_id, user_id, full_text, lang, creation_time, country_code, favorite_count,
+    retweet_count, possibly_sensitive, replied_tweet_id, reply_count, quoted_status_id, quote_count"""
+
+# Settings of the connection during the load: no rollback journal, no waiting
+# for the disk and page caches of about 512 MB (a negative size is in KiB).
+# A load interrupted by a crash leaves the database to be reset.
+SQLITE_BULK_LOAD_PRAGMAS: List[str] = [
+    "PRAGMA journal_mode = OFF;",
+    "PRAGMA synchronous = OFF;",
+    "PRAGMA main.cache_size = -500000;",
+    "PRAGMA temp.cache_size = -500000;",
+    "PRAGMA locking_mode = EXCLUSIVE;",
+]
+
+CREATE_USERS_STAGING_SQLITE: str = f"""
+CREATE TEMP TABLE UsersStaging AS SELECT {USER_COLUMNS} FROM main.Users WHERE 0;
+"""
+
+CREATE_TWEETS_STAGING_SQLITE: str = f"""
+CREATE TEMP TABLE TweetsStaging AS SELECT {TWEET_COLUMNS} FROM main.Tweets WHERE 0;
+"""
+
+INSERT_USERS_STAGING_SQLITE: str = f"""
+INSERT INTO UsersStaging({USER_COLUMNS})
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+INSERT_TWEETS_STAGING_SQLITE: str = f"""
+INSERT INTO TweetsStaging({TWEET_COLUMNS})
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+# The newest snapshot of a user first, so that the older ones are not written
+# (the WHERE clause of the SELECT avoids an ambiguity with ON CONFLICT)
+MERGE_USERS_STAGING_SQLITE: str = f"""
+INSERT OR IGNORE INTO main.Users({USER_COLUMNS})
+SELECT {USER_COLUMNS} FROM UsersStaging WHERE TRUE
+ORDER BY user_id, snapshot_time DESC, rowid
+ON CONFLICT(user_id) DO UPDATE SET
+    {UPDATE_NEWER_SNAPSHOT_SQLITE};
+"""
+
+MERGE_TWEETS_STAGING_SQLITE: str = f"""
+INSERT OR IGNORE INTO main.Tweets({TWEET_COLUMNS})
+SELECT {TWEET_COLUMNS} FROM TweetsStaging ORDER BY tweet_id, rowid;
+"""
+
+DROP_STAGING_SQLITE: List[str] = [
+    "DROP TABLE IF EXISTS temp.UsersStaging;",
+    "DROP TABLE IF EXISTS temp.TweetsStaging;",
+]
+
+
+# MySQL bulk load
+# Like the SQLite bulk load, with the batches uploaded by LOAD DATA LOCAL INFILE
+# from tab-separated files into temporary staging tables. Their only key is an
+# increasing staging_id, which keeps the order of the rows for the merge.
+CREATE_USERS_STAGING_MYSQL: str = f"""
+CREATE TEMPORARY TABLE UsersStaging (staging_id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY)
+SELECT {USER_COLUMNS} FROM Users WHERE FALSE;
+"""
+
+CREATE_TWEETS_STAGING_MYSQL: str = f"""
+CREATE TEMPORARY TABLE TweetsStaging (staging_id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY)
+SELECT {TWEET_COLUMNS} FROM Tweets WHERE FALSE;
+"""
+
+# The file path is passed as the parameter of the query. Fields are separated
+# by tabs and rows by newlines, with \N for NULL and backslash escapes.
+LOAD_USERS_STAGING_MYSQL: str = f"""
+LOAD DATA LOCAL INFILE %s INTO TABLE UsersStaging CHARACTER SET utf8mb4
+FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'
+({USER_COLUMNS});
+"""
+
+LOAD_TWEETS_STAGING_MYSQL: str = f"""
+LOAD DATA LOCAL INFILE %s INTO TABLE TweetsStaging CHARACTER SET utf8mb4
+FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'
+({TWEET_COLUMNS});
+"""
+
+MERGE_USERS_STAGING_MYSQL: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+SELECT {USER_COLUMNS} FROM UsersStaging
+ORDER BY user_id, snapshot_time DESC, staging_id
+ON DUPLICATE KEY UPDATE
+    {update_newer_snapshot_mysql("UsersStaging.{column}")};
+"""
+
+MERGE_TWEETS_STAGING_MYSQL: str = f"""
+INSERT IGNORE INTO Tweets({TWEET_COLUMNS})
+SELECT {TWEET_COLUMNS} FROM TweetsStaging ORDER BY tweet_id, staging_id;
+"""
+
+DROP_STAGING_MYSQL: List[str] = [
+    "DROP TEMPORARY TABLE IF EXISTS UsersStaging;",
+    "DROP TEMPORARY TABLE IF EXISTS TweetsStaging;",
+]
+
+
+# DuckDB bulk load
+# Like the SQLite bulk load, with every batch appended to the staging tables
+# at once from a registered DataFrame (see database_backends.DuckdbBackend).
+# DuckDB cannot update a row twice in one INSERT, so the merge keeps a single
+# row per key with a window over the staging rowid instead of relying on the
+# order of the rows.
+CREATE_USERS_STAGING_DUCKDB: str = f"""
+CREATE TEMP TABLE UsersStaging AS SELECT {USER_COLUMNS} FROM Users WHERE FALSE;
+"""
+
+CREATE_TWEETS_STAGING_DUCKDB: str = f"""
+CREATE TEMP TABLE TweetsStaging AS SELECT {TWEET_COLUMNS} FROM Tweets WHERE FALSE;
+"""
+
+INSERT_USERS_STAGING_DUCKDB: str = f"""
+INSERT INTO UsersStaging({USER_COLUMNS}) SELECT {USER_COLUMNS} FROM staged_rows;
+"""
+
+INSERT_TWEETS_STAGING_DUCKDB: str = f"""
+INSERT INTO TweetsStaging({TWEET_COLUMNS}) SELECT {TWEET_COLUMNS} FROM staged_rows;
+"""
+
+MERGE_USERS_STAGING_DUCKDB: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+SELECT {USER_COLUMNS} FROM UsersStaging
+QUALIFY row_number() OVER (
+    PARTITION BY user_id ORDER BY snapshot_time DESC NULLS LAST, rowid
+) = 1
+ON CONFLICT(user_id) DO UPDATE SET
+    {UPDATE_NEWER_SNAPSHOT_SQLITE};
+"""
+
+MERGE_TWEETS_STAGING_DUCKDB: str = f"""
+INSERT OR IGNORE INTO Tweets({TWEET_COLUMNS})
+SELECT {TWEET_COLUMNS} FROM TweetsStaging
+QUALIFY row_number() OVER (PARTITION BY tweet_id ORDER BY rowid) = 1;
+"""
+
+DROP_STAGING_DUCKDB: List[str] = [
+    "DROP TABLE IF EXISTS temp.UsersStaging;",
+    "DROP TABLE IF EXISTS temp.TweetsStaging;",
+]
+
+
+# Insertion of the cleaned tweets, written for SQLite (see
+# database_backends.translate_query for the other databases)
+# A user is only updated by a newer snapshot, i.e. one from a more recent tweet
+UPSERT_USERS_SQLITE: str = f"""
+INSERT OR IGNORE INTO Users({USER_COLUMNS})
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    {UPDATE_NEWER_SNAPSHOT_SQLITE};
+"""
+
+# The row alias requires MySQL 8.0.19 or later, the VALUES() function of the
+# older servers and MariaDB is deprecated since then (see
+# database_backends.MysqlBackend.upsert_users)
+UPSERT_USERS_MYSQL: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+VALUES(%s, %s, %s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    {update_newer_snapshot_mysql("new.{column}")};
+"""
+
+UPSERT_USERS_MYSQL_VALUES: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+VALUES(%s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    {update_newer_snapshot_mysql("VALUES({column})")};
+"""
+
+# DuckDB has no INSERT OR IGNORE with an ON CONFLICT clause
+UPSERT_USERS_DUCKDB: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    {UPDATE_NEWER_SNAPSHOT_SQLITE};
+"""
+
+INSERT_TWEETS: str = f"""
+INSERT OR IGNORE INTO Tweets({TWEET_COLUMNS})
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+# The same insertion on DuckDB, with every batch inserted at once from a
+# registered DataFrame (see database_backends.DuckdbBackend.executemany), with
+# the position of the rows in the batch as staged_row. Like in the merge of
+# the bulk load, a single row per key is kept: the first one with the newest
+# snapshot of every user, and the first row of every tweet ID.
+UPSERT_USERS_STAGED_DUCKDB: str = f"""
+INSERT INTO Users({USER_COLUMNS})
+SELECT {USER_COLUMNS} FROM staged_rows
+QUALIFY row_number() OVER (
+    PARTITION BY user_id ORDER BY snapshot_time DESC NULLS LAST, staged_row
+) = 1
+ON CONFLICT(user_id) DO UPDATE SET
+    {UPDATE_NEWER_SNAPSHOT_SQLITE};
+"""
+
+INSERT_TWEETS_STAGED_DUCKDB: str = f"""
+INSERT OR IGNORE INTO Tweets({TWEET_COLUMNS})
+SELECT {TWEET_COLUMNS} FROM staged_rows
+QUALIFY row_number() OVER (PARTITION BY tweet_id ORDER BY staged_row) = 1;
+"""
+
+# Load progress
+# The position in a cleaned JSON file up to which its tweets are committed. It
+# is updated in the same transaction as every batch, so a load can resume
+# after the last committed batch (see insert_to_db.resume_insert_json).
+CREATE_LOAD_PROGRESS_SQLITE: str = """
+CREATE TABLE IF NOT EXISTS LoadProgress(
+    source TEXT PRIMARY KEY,  -- name of the loaded file
+    byte_offset INTEGER NOT NULL,
+    line_number INTEGER NOT NULL
+);
+"""
+
+CREATE_LOAD_PROGRESS_MYSQL: str = """
+CREATE TABLE IF NOT EXISTS LoadProgress(
+    source VARCHAR(255) PRIMARY KEY,
+    byte_offset BIGINT UNSIGNED NOT NULL,
+    line_number BIGINT UNSIGNED NOT NULL
+);
+"""
+
+CREATE_LOAD_PROGRESS_DUCKDB: str = """
+CREATE TABLE IF NOT EXISTS LoadProgress(
+    source VARCHAR PRIMARY KEY,
+    byte_offset BIGINT NOT NULL,
+    line_number BIGINT NOT NULL
+);
+"""
+
+SELECT_LOAD_PROGRESS: str = """
+SELECT byte_offset, line_number FROM LoadProgress WHERE source = ?;
+"""
+
+REPLACE_LOAD_PROGRESS: str = """
+REPLACE INTO LoadProgress(source, byte_offset, line_number) VALUES(?, ?, ?);
+"""
+
+# Secondary indexes
+# The indexes of the hot queries below, created once the tables are loaded
+# (see database_backends.DatabaseBackend.create_indexes), as building an index
+# at once is faster than updating it for every inserted row.
+# Index name: (table, column, condition of a partial index)
+SECONDARY_INDEXES: Dict[str, Tuple[str, str, str]] = {
+    "idx_tweets_creation_time": ("Tweets", "creation_time", ""),
+    # Only the tweets without a sentiment score, so the index shrinks as the
+    # tweets are scored (MySQL has no partial indexes and indexes every score)
+    "idx_tweets_unscored": ("Tweets", "sentiment_score", "sentiment_score IS NULL"),
+    "idx_conversations_tweet_id": ("Conversations", "tweet_id", ""),
+}
+
+# The first column of every index of the MySQL database, e.g. the ones of the
+# foreign keys
+SELECT_INDEXES_MYSQL: str = """
+SELECT index_name, table_name, column_name FROM information_schema.statistics
+WHERE table_schema = DATABASE() AND seq_in_index = 1;
+"""
+
+# The hot queries of the notebooks
+# The tweets of the conversation extraction, newest first, read in the order
+# of the creation time index instead of sorting the table
+QUERY_CONVO_EXTRACT: str = """
+SELECT 
+    Tweets.tweet_id,
+    Users.user_id AS user_id, 
+    Tweets.replied_tweet_id
+FROM Users
+INNER JOIN Tweets ON Users.user_id = Tweets.user_id
+ORDER BY Tweets.creation_time DESC;
+"""
+
+# The tweets mentioning Lufthansa without a conversation (NonResponses.ipynb)
+QUERY_NON_RESPONSES: str = """
+SELECT *
+FROM Tweets
+WHERE (full_text LIKE '%@Lufthansa%' OR full_text LIKE '%#Lufthansa%')
+  AND tweet_id NOT IN (SELECT tweet_id FROM Conversations)
+  AND user_id != 124476322;
+"""
+
+# The tweets to be scored by the sentiment analysis
+QUERY_UNSCORED_TWEETS: str = """
+SELECT tweet_id, full_text
+FROM Tweets
+WHERE sentiment_score IS NULL;
+"""
+
+# The first two tweets of every categorised conversation (category_upload.ipynb)
+QUERY_CATEGORY_TEXT: str = """
+SELECT 
+    c.conversation_id, 
+    CONCAT(t1.full_text, ' ', t2.full_text) AS combined_full_text
+FROM 
+    Conversations AS c
+JOIN 
+    Tweets AS t1
+ON 
+    c.tweet_id = t1.tweet_id
+JOIN 
+    ConversationsCategory AS cc
+ON 
+    c.conversation_id = cc.conversation_id
+JOIN 
+    Conversations AS c2
+ON 
+    c.conversation_id = c2.conversation_id 
+AND 
+    c2.tweet_order = 2
+JOIN 
+    Tweets AS t2
+ON 
+    c2.tweet_id = t2.tweet_id
+WHERE 
+    c.tweet_order = 1
+"""
+
+# Every hot query with the secondary index it uses, or None for the joins
+# which read a whole table and only search the primary keys of the others
+# (e.g. QUERY_REPLY reads every tweet, so an index of the replied tweets
+# would never be used)
+INDEXED_QUERIES: Dict[str, Tuple[str, Optional[str]]] = {
+    "reply join": (QUERY_REPLY, None),
+    "conversation extraction": (QUERY_CONVO_EXTRACT, "idx_tweets_creation_time"),
+    "non-responses": (QUERY_NON_RESPONSES, "idx_conversations_tweet_id"),
+    "unscored tweets": (QUERY_UNSCORED_TWEETS, "idx_tweets_unscored"),
+    "category texts": (QUERY_CATEGORY_TEXT, None),
+}
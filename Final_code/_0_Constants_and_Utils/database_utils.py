@@ -1,13 +1,23 @@
+import atexit
+import importlib
 import os
 import sqlite3
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from itertools import islice
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 
-import mysql.connector
 import pandas as pd
-from mysql.connector import Error
-from sqlalchemy import create_engine
+import pyarrow as pa
+
+# mysql-connector and SQLAlchemy take a fifth of a second to import, so they
+# are only imported by the functions connecting to MySQL
+if TYPE_CHECKING:
+    import mysql.connector
+    from sqlalchemy.engine import Engine
 
 sys.path.append(
     os.path.join(
@@ -18,6 +28,34 @@ sys.path.append(
 
 from defined_paths import path_local_database, path_local_database_notebook
 from env_vars import check_env_vars
+from query_metrics import record_measure, start_measure
+from viz_constants import LOAD_PROFILES, TABLE_COLUMNS, TABLE_DATES, TABLE_INDEXES
+
+# Number of rows fetched at once by the Arrow reads from SQLite
+ARROW_FETCH_SIZE: int = 100_000
+
+# Idle connections kept per database by the connection pool, and the seconds
+# after which an idle connection is closed (below the wait_timeout of MySQL
+# servers, which close the idle connections themselves)
+POOL_SIZE: int = 4
+POOL_IDLE_TIMEOUT: float = 300.0
+
+
+@lru_cache(maxsize=None)
+def import_optional(module_name: str) -> Optional[Any]:
+    """
+    Imports an optional module the first time it is needed.
+
+    Args:
+        module_name (str): The name of the module, e.g. "connectorx".
+
+    Returns:
+        Optional[Any]: The module, None if it is not installed.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
 
 
 def check_given_var(env_var_str: str) -> str:
@@ -61,14 +99,16 @@ def form_connection_params(local: bool, notebook: bool = False) -> Dict[str, Any
 
 
 def connect_to_database(
-    connection_params: Dict[str, str], local: bool
-) -> Union[sqlite3.Connection, mysql.connector.MySQLConnection]:
+    connection_params: Dict[str, str], local: bool, allow_local_infile: bool = False
+) -> Union[sqlite3.Connection, "mysql.connector.MySQLConnection"]:
     """
     Connects to a database based on the provided connection parameters and local flag.
 
     Args:
         connection_params (Dict[str, str]): The parameters required to establish the database connection.
         local (bool): Flag indicating whether the connection should be local (SQLite) or remote (MySQL).
+        allow_local_infile (bool, optional): Whether the MySQL connection may upload
+            files with LOAD DATA LOCAL INFILE. Defaults to False.
 
     Returns:
         Union[sqlite3.Connection, mysql.connector.MySQLConnection]: The database connection object if successful.
@@ -78,6 +118,8 @@ def connect_to_database(
     """
     if local:
         return sqlite3.connect(connection_params["file_path"])
+    import mysql.connector
+
     try:
         connection = mysql.connector.connect(
             user=connection_params["user"],
@@ -85,15 +127,241 @@ def connect_to_database(
             password=connection_params["password"],
             host=connection_params["host"],
             connect_timeout=10,
+            allow_local_infile=allow_local_infile,
         )
         if connection.is_connected():
             return connection
-    except Error as e:
+    except mysql.connector.Error as e:
         raise ConnectionError(f"Error while connecting to MySQL: {e}") from e
 
 
+def get_pool_key(
+    connection_params: Dict[str, str], local: bool, allow_local_infile: bool = False
+) -> Tuple[Any, ...]:
+    """
+    Returns the key of a database in the connection pool and the engine registry.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        allow_local_infile (bool, optional): Whether the MySQL connection may upload
+            files with LOAD DATA LOCAL INFILE. Defaults to False.
+
+    Returns:
+        Tuple[Any, ...]: The key.
+    """
+    return (local, allow_local_infile, *sorted(connection_params.items()))
+
+
+class ConnectionPool:
+    """
+    A process-wide pool of database connections, keyed by their connection
+    parameters, so that the helpers and backends opening a connection for
+    every batch reuse the same few connections.
+
+    A connection taken from the pool is pinged first (MySQL) and replaced if
+    the server closed it, and the connections idle for more than
+    POOL_IDLE_TIMEOUT seconds are closed. The pool is emptied without closing
+    the connections in a forked process, which must not share them.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, idle_timeout: float = POOL_IDLE_TIMEOUT):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.pid: int = os.getpid()
+        # Key: idle connections with the time they were released, newest last
+        self.idle: Dict[Tuple[Any, ...], List[Tuple[Any, float]]] = {}
+
+    def take_idle(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        """
+        Takes the most recently released connection of a database, closing
+        the idle connections which expired.
+
+        Args:
+            key (Tuple[Any, ...]): The key of the database, see get_pool_key.
+
+        Returns:
+            Optional[Any]: The connection, None if there is none.
+        """
+        expired: List[Any] = []
+        connection: Optional[Any] = None
+        with self.lock:
+            if os.getpid() != self.pid:
+                self.pid, self.idle = os.getpid(), {}
+            now: float = time.monotonic()
+            for pool_key, connections in self.idle.items():
+                expired += [c for c, t in connections if now - t > self.idle_timeout]
+                connections[:] = [
+                    (c, t) for c, t in connections if now - t <= self.idle_timeout
+                ]
+            if self.idle.get(key):
+                connection = self.idle[key].pop()[0]
+        for expired_connection in expired:
+            close_quietly(expired_connection)
+        return connection
+
+    def acquire(
+        self,
+        connection_params: Dict[str, str],
+        local: bool,
+        allow_local_infile: bool = False,
+    ) -> Union[sqlite3.Connection, "mysql.connector.MySQLConnection"]:
+        """
+        Takes a connection of a database from the pool, or connects to it.
+
+        Args:
+            connection_params (Dict[str, str]): The parameters required to establish the database connection.
+            local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+            allow_local_infile (bool, optional): Whether the MySQL connection may upload
+                files with LOAD DATA LOCAL INFILE. Defaults to False.
+
+        Returns:
+            Union[sqlite3.Connection, mysql.connector.MySQLConnection]: The
+                connection, to be given back with release.
+        """
+        key: Tuple[Any, ...] = get_pool_key(
+            connection_params, local, allow_local_infile
+        )
+        while (connection := self.take_idle(key)) is not None:
+            # is_connected pings the MySQL server
+            if local or connection.is_connected():
+                return connection
+            close_quietly(connection)
+        if local:
+            # A pooled connection may be used by another thread than the one
+            # which opened it, but only by one thread at a time
+            return sqlite3.connect(
+                connection_params["file_path"], check_same_thread=False
+            )
+        return connect_to_database(connection_params, local, allow_local_infile)
+
+    def release(
+        self,
+        connection: Union[sqlite3.Connection, "mysql.connector.MySQLConnection"],
+        connection_params: Dict[str, str],
+        local: bool,
+        allow_local_infile: bool = False,
+    ) -> None:
+        """
+        Gives a connection back to the pool, discarding its uncommitted
+        changes. It is closed if the pool of its database is full.
+
+        Args:
+            connection (Union[sqlite3.Connection, mysql.connector.MySQLConnection]):
+                The connection, from acquire.
+            connection_params (Dict[str, str]): The parameters of the connection.
+            local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+            allow_local_infile (bool, optional): Whether the MySQL connection may upload
+                files with LOAD DATA LOCAL INFILE. Defaults to False.
+
+        Returns:
+            None
+        """
+        key: Tuple[Any, ...] = get_pool_key(
+            connection_params, local, allow_local_infile
+        )
+        try:
+            connection.rollback()
+        except Exception:
+            close_quietly(connection)
+            return
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if os.getpid() == self.pid and len(connections) < self.size:
+                connections.append((connection, time.monotonic()))
+                return
+        close_quietly(connection)
+
+    def close_all(self) -> None:
+        """
+        Closes the idle connections of every database.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                close_quietly(connection)
+
+
+def close_quietly(connection: Any) -> None:
+    """
+    Closes a connection, ignoring the errors of a connection which is already lost.
+
+    Args:
+        connection (Any): The connection.
+
+    Returns:
+        None
+    """
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+connection_pool: ConnectionPool = ConnectionPool()
+atexit.register(connection_pool.close_all)
+
+
+@contextmanager
+def pooled_connection(
+    connection_params: Dict[str, str], local: bool
+) -> Iterator[Union[sqlite3.Connection, "mysql.connector.MySQLConnection"]]:
+    """
+    Takes a connection from the connection pool for the body of a with
+    statement, and gives it back afterwards, discarding the uncommitted changes.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+
+    Yields:
+        Union[sqlite3.Connection, mysql.connector.MySQLConnection]: The connection.
+    """
+    connection = connection_pool.acquire(connection_params, local)
+    try:
+        yield connection
+    finally:
+        connection_pool.release(connection, connection_params, local)
+
+
+# Key: the SQLAlchemy engine of a MySQL database, see get_engine
+engines: Dict[Tuple[Any, ...], "Engine"] = {}
+engines_lock: threading.Lock = threading.Lock()
+
+
+def get_engine(connection_params: Dict[str, str]) -> "Engine":
+    """
+    Returns the SQLAlchemy engine of a MySQL database, created once per
+    process. Its pool pings every connection before using it and replaces
+    the connections older than POOL_IDLE_TIMEOUT seconds.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+
+    Returns:
+        Engine: The engine.
+    """
+    from sqlalchemy import create_engine
+
+    key: Tuple[Any, ...] = get_pool_key(connection_params, local=False)
+    with engines_lock:
+        if key not in engines:
+            engines[key] = create_engine(
+                form_mysql_url(connection_params, "mysqlconnector"),
+                pool_size=POOL_SIZE,
+                pool_pre_ping=True,
+                pool_recycle=POOL_IDLE_TIMEOUT,
+            )
+        return engines[key]
+
+
 def execute_queries(
-    connection: Union[sqlite3.Connection, mysql.connector.MySQLConnection],
+    connection: Union[sqlite3.Connection, "mysql.connector.MySQLConnection"],
     queries: List[Union[str, Tuple[str, List[Tuple[Any]]]]],
 ) -> None:
     """
@@ -110,14 +378,92 @@ def execute_queries(
     """
     cursor = connection.cursor()
     for query in queries:
+        started = start_measure()
         if isinstance(query, str):
-            cursor.execute(query)
+            sql, params = query, None
+            cursor.execute(sql)
         else:
             sql, params = query
             cursor.executemany(sql, params)
+        if started is not None:
+            record_measure(started, "execute", sql, cursor.rowcount, params)
     connection.commit()
 
 
+def is_nullable_integer(dtype: Any) -> bool:
+    """
+    Check if a dtype is a nullable integer type of pandas, e.g. "UInt64".
+
+    Args:
+        dtype (Any): The dtype, or its name.
+
+    Returns:
+        bool: Whether the dtype is a nullable integer type.
+    """
+    dtype = pd.api.types.pandas_dtype(dtype)
+    return isinstance(
+        dtype, pd.api.extensions.ExtensionDtype
+    ) and pd.api.types.is_integer_dtype(dtype)
+
+
+def check_arrow_reader(local: bool) -> None:
+    """
+    Check if the libraries of the Arrow reads are installed.
+
+    Args:
+        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+
+    Raises:
+        ImportError: If connectorx is not installed, for MySQL.
+    """
+    if not local and import_optional("connectorx") is None:
+        raise ImportError(
+            "The Arrow reads from MySQL require connectorx, install it with `pip install connectorx`"
+        )
+
+
+def form_mysql_url(connection_params: Dict[str, str], driver: str = "") -> str:
+    """
+    Forms the URL of a MySQL database.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        driver (str, optional): The driver of SQLAlchemy, e.g. "mysqlconnector".
+            Defaults to "", for the URL of connectorx.
+
+    Returns:
+        str: The URL of the database.
+    """
+    scheme: str = f"mysql+{driver}" if driver else "mysql"
+    return f"{scheme}://{connection_params['user']}:{connection_params['password']}@{connection_params['host']}:3306/{connection_params['database']}"
+
+
+def get_read_options(
+    dtypes: Optional[Dict[str, str]], parse_dates: Optional[List[str]]
+) -> Tuple[Optional[Dict[str, str]], Dict[str, Any]]:
+    """
+    Returns the dtypes and the options of pandas.read_sql_query for a query.
+
+    Args:
+        dtypes (Optional[Dict[str, str]]): Dictionary specifying column data types.
+        parse_dates (Optional[List[str]]): List of columns to parse as dates.
+
+    Returns:
+        Tuple[Optional[Dict[str, str]], Dict[str, Any]]: The dtypes without the
+            columns parsed as dates, and the other options.
+    """
+    if parse_dates:
+        dtypes = {k: v for k, v in (dtypes or {}).items() if k not in parse_dates}
+    # NULL turns a numpy integer column into floats, which round the 64-bit
+    # IDs, so nullable integer columns are read with the nullable types of pandas
+    read_options: Dict[str, Any] = (
+        {"dtype_backend": "numpy_nullable"}
+        if any(is_nullable_integer(dtype) for dtype in (dtypes or {}).values())
+        else {}
+    )
+    return dtypes, read_options
+
+
 def get_dataframe_from_query(
     query: str,
     connection_params: Dict[str, str],
@@ -143,26 +489,467 @@ def get_dataframe_from_query(
     Returns:
         pd.DataFrame: A pandas DataFrame containing the results of the query.
     """
-    if parse_dates:
-        dtypes = {k: v for k, v in (dtypes or {}).items() if k not in parse_dates}
+    started = start_measure()
+    dtypes, read_options = get_read_options(dtypes, parse_dates)
 
     if not local:
-        url: str = (
-            f"mysql+mysqlconnector://{connection_params['user']}:{connection_params['password']}@{connection_params['host']}:3306/{connection_params['database']}"
-        )
-        engine = create_engine(url)
-        return pd.read_sql_query(
-            query, engine, dtype=dtypes, index_col=index_col, parse_dates=parse_dates
+        df = pd.read_sql_query(
+            query,
+            get_engine(connection_params),
+            dtype=dtypes,
+            index_col=index_col,
+            parse_dates=parse_dates,
+            **read_options,
         )
+    else:
+        with pooled_connection(connection_params, local) as connection:
+            df = pd.read_sql_query(
+                query,
+                connection,
+                dtype=dtypes,
+                index_col=index_col,
+                parse_dates=parse_dates,
+                **read_options,
+            )
+    if started is not None:
+        record_measure(started, "read", query, len(df), df)
+    return df
+
+
+def rows_to_dataframe(
+    rows: List[Tuple[Any, ...]],
+    columns: List[str],
+    dtypes: Optional[Dict[str, str]],
+    index_col: Optional[str],
+    parse_dates: Optional[List[str]],
+    read_options: Dict[str, Any],
+) -> pd.DataFrame:
+    """
+    Builds a DataFrame from fetched rows, like pandas.read_sql_query does.
+
+    Args:
+        rows (List[Tuple[Any, ...]]): The rows.
+        columns (List[str]): The names of the columns.
+        dtypes (Optional[Dict[str, str]]): The dtypes, see get_read_options.
+        index_col (Optional[str]): Name of the column to set as the index.
+        parse_dates (Optional[List[str]]): List of columns to parse as dates.
+        read_options (Dict[str, Any]): The other options, see get_read_options.
+
+    Returns:
+        pd.DataFrame: The rows, with the dtypes.
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    if "dtype_backend" in read_options:
+        df = df.convert_dtypes(dtype_backend=read_options["dtype_backend"])
+    for column in parse_dates or []:
+        df[column] = pd.to_datetime(df[column], errors="coerce")
+    if dtypes:
+        df = df.astype(dtypes)
+    if index_col is not None:
+        df = df.set_index(index_col)
+    return df
+
+
+def iterate_sqlite_dataframes(
+    query: str,
+    connection_params: Dict[str, str],
+    chunksize: int,
+    dtypes: Optional[Dict[str, str]],
+    index_col: Optional[str],
+    parse_dates: Optional[List[str]],
+    read_options: Dict[str, Any],
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the result of a SQLite query in DataFrames of at most chunksize
+    rows, with the cursor of a pooled connection.
 
-    with sqlite3.connect(connection_params["file_path"]) as connection:
-        return pd.read_sql_query(
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        chunksize (int): The number of rows of every chunk.
+        dtypes (Optional[Dict[str, str]]): The dtypes, see get_read_options.
+        index_col (Optional[str]): Name of the column to set as the index.
+        parse_dates (Optional[List[str]]): List of columns to parse as dates.
+        read_options (Dict[str, Any]): The other options, see get_read_options.
+
+    Yields:
+        pd.DataFrame: The rows of the next chunk.
+    """
+    with pooled_connection(connection_params, True) as connection:
+        yield from pd.read_sql_query(
             query,
             connection,
             dtype=dtypes,
             index_col=index_col,
             parse_dates=parse_dates,
+            chunksize=chunksize,
+            **read_options,
+        )
+
+
+def iterate_mysql_dataframes(
+    query: str,
+    connection_params: Dict[str, str],
+    chunksize: int,
+    dtypes: Optional[Dict[str, str]],
+    index_col: Optional[str],
+    parse_dates: Optional[List[str]],
+    read_options: Dict[str, Any],
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the result of a MySQL query in DataFrames of at most chunksize rows.
+
+    The mysql-connector dialect of SQLAlchemy has no server-side cursors, so
+    pandas would fetch the whole result before its first chunk. The rows are
+    fetched instead by an unbuffered cursor, chunksize rows at a time, on a
+    connection of its own, as a result which is not read until its end makes
+    the connection unusable.
+
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        chunksize (int): The number of rows of every chunk.
+        dtypes (Optional[Dict[str, str]]): The dtypes, see get_read_options.
+        index_col (Optional[str]): Name of the column to set as the index.
+        parse_dates (Optional[List[str]]): List of columns to parse as dates.
+        read_options (Dict[str, Any]): The other options, see get_read_options.
+
+    Yields:
+        pd.DataFrame: The rows of the next chunk.
+    """
+    connection = connect_to_database(connection_params, False)
+    try:
+        cursor = connection.cursor(buffered=False)
+        cursor.execute(query)
+        columns: List[str] = [column[0] for column in cursor.description]
+        while rows := cursor.fetchmany(chunksize):
+            yield rows_to_dataframe(
+                rows, columns, dtypes, index_col, parse_dates, read_options
+            )
+    finally:
+        close_quietly(connection)
+
+
+def iterate_dataframes_from_query(
+    query: str,
+    connection_params: Dict[str, str],
+    local: bool,
+    chunksize: int,
+    dtypes: Optional[Dict[str, str]] = None,
+    index_col: Optional[str] = None,
+    parse_dates: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the result of a query as DataFrames of at most chunksize rows, for
+    results which do not fit in memory at once. Every chunk already has the
+    dtypes, so only the rows of one chunk are held as Python objects.
+
+    The categories of a "category" column are the ones of each chunk, so the
+    chunks are best reduced (e.g. counted) one by one rather than concatenated.
+
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        chunksize (int): The number of rows of every chunk.
+        dtypes (Optional[Dict[str, str]], optional): Dictionary specifying column data types.
+            Defaults to None.
+        index_col (Optional[str], optional): Name of the column to set as the index.
+            Defaults to None.
+        parse_dates (Optional[List[str]], optional): List of columns to parse as dates.
+            Defaults to None.
+
+    Yields:
+        pd.DataFrame: The rows of the next chunk.
+    """
+    dtypes, read_options = get_read_options(dtypes, parse_dates)
+    get_chunks = iterate_sqlite_dataframes if local else iterate_mysql_dataframes
+    chunks: Iterator[pd.DataFrame] = get_chunks(
+        query,
+        connection_params,
+        chunksize,
+        dtypes,
+        index_col,
+        parse_dates,
+        read_options,
+    )
+    # Every chunk is measured on its own, without the time of the caller
+    while True:
+        started = start_measure()
+        df: Optional[pd.DataFrame] = next(chunks, None)
+        if df is None:
+            break
+        if started is not None:
+            record_measure(started, "read_chunk", query, len(df), df)
+        yield df
+
+
+def read_arrow_table(
+    query: str, connection_params: Dict[str, str], local: bool
+) -> "pa.Table":
+    """
+    Reads the result of a query into an Arrow table.
+
+    MySQL results are read by connectorx, and SQLite results by ADBC if
+    adbc-driver-sqlite is installed, straight into Arrow buffers.
+
+    ADBC infers the type of every column from its first batch of rows and
+    fails on a later value of another type (e.g. IDs which are NULL in the
+    whole first batch), and connectorx cannot parse the timestamps with a
+    time zone stored by SQLite, so the SQLite results are otherwise fetched
+    ARROW_FETCH_SIZE rows at a time and appended column by column to Arrow
+    arrays.
+
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+
+    Returns:
+        pa.Table: The result of the query.
+    """
+    check_arrow_reader(local)
+    if not local:
+        return import_optional("connectorx").read_sql(
+            form_mysql_url(connection_params), query, return_type="arrow"
+        )
+
+    # The Arrow reads from SQLite are faster with ADBC, if it is installed
+    adbc_sqlite = import_optional("adbc_driver_sqlite.dbapi")
+    if adbc_sqlite is not None:
+        try:
+            with adbc_sqlite.connect(connection_params["file_path"]) as connection:
+                with connection.cursor() as cursor:
+                    cursor.adbc_statement.set_options(
+                        **{"adbc.sqlite.query.batch_rows": str(ARROW_FETCH_SIZE)}
+                    )
+                    cursor.execute(query)
+                    return cursor.fetch_arrow_table()
+        # A type mismatch is raised by execute or by fetch_arrow_table, as a
+        # DB-API error, an OSError of the driver or an error of Arrow
+        except (adbc_sqlite.Error, OSError, pa.ArrowInvalid):
+            pass  # The result is fetched by sqlite3 below
+
+    with pooled_connection(connection_params, local) as connection:
+        cursor = connection.execute(query)
+        names: List[str] = [column[0] for column in cursor.description]
+        tables: List[pa.Table] = []
+        while rows := cursor.fetchmany(ARROW_FETCH_SIZE):
+            columns = zip(*rows)
+            del rows
+            tables.append(
+                pa.table(
+                    {name: pa.array(values) for name, values in zip(names, columns)}
+                )
+            )
+        cursor.close()
+    if not tables:
+        return pa.table({name: pa.array([]) for name in names})
+    # A column which is NULL in a whole chunk takes the type of the other chunks
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def arrow_column_to_series(
+    column: "pa.ChunkedArray", dtype: Optional[str], parse_date: bool
+) -> pd.Series:
+    """
+    Converts a column of an Arrow table to the dtype of pandas.read_sql_query.
+
+    The text columns stay in Arrow buffers, with the string[pyarrow] dtype of
+    pandas (also for the "object" dtype), which takes much less memory than
+    Python strings.
+
+    Args:
+        column (pa.ChunkedArray): The column.
+        dtype (Optional[str]): The dtype, None to keep the type of the column.
+        parse_date (bool): Whether to parse the column as dates.
+
+    Returns:
+        pd.Series: The column.
+    """
+    if parse_date:
+        return pd.to_datetime(column.to_pandas(), errors="coerce")
+    if dtype is None:
+        return column.to_pandas()
+    if dtype == "category":
+        return column.dictionary_encode().to_pandas()
+    pandas_dtype = (
+        pd.StringDtype("pyarrow")
+        if dtype in ("object", "str")
+        else pd.api.types.pandas_dtype(dtype)
+    )
+    if isinstance(pandas_dtype, pd.StringDtype):
+        # A text column which is NULL in every row has no type of its own
+        if not pa.types.is_string(column.type):
+            column = column.cast(pa.string())
+        return pd.Series(pandas_dtype.__from_arrow__(column))
+    if isinstance(pandas_dtype, pd.api.extensions.ExtensionDtype):
+        # The nullable types of pandas, built from the Arrow buffers without
+        # going through floats
+        arrow_type = pa.from_numpy_dtype(pandas_dtype.numpy_dtype)
+        return pd.Series(pandas_dtype.__from_arrow__(column.cast(arrow_type)))
+    if pandas_dtype.kind == "M":
+        return pd.to_datetime(column.to_pandas()).astype(pandas_dtype)
+    return pd.Series(column.cast(pa.from_numpy_dtype(pandas_dtype)).to_numpy())
+
+
+def get_arrow_dataframe_from_query(
+    query: str,
+    connection_params: Dict[str, str],
+    local: bool,
+    dtypes: Optional[Dict[str, str]] = None,
+    index_col: Optional[Union[str, List[str]]] = None,
+    parse_dates: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Like get_dataframe_from_query, but the result is built column by column
+    from Arrow buffers (see read_arrow_table) instead of object columns which
+    are then converted, which is faster and takes much less memory.
+
+    The text columns given a text dtype ("object", "str" or "string") have
+    the string[pyarrow] dtype of pandas.
+
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        dtypes (Optional[Dict[str, str]], optional): Dictionary specifying column data types.
+            Defaults to None.
+        index_col (Optional[Union[str, List[str]]], optional): Name of the
+            column(s) to set as the index. Defaults to None.
+        parse_dates (Optional[List[str]], optional): List of columns to parse as dates.
+            Defaults to None.
+
+    Returns:
+        pd.DataFrame: A pandas DataFrame containing the results of the query.
+
+    Raises:
+        ImportError: If connectorx is not installed, for MySQL.
+    """
+    started = start_measure()
+    table = read_arrow_table(query, connection_params, local)
+    dtypes, parse_dates = dtypes or {}, parse_dates or []
+    df = pd.DataFrame(
+        {
+            name: arrow_column_to_series(
+                table.column(name), dtypes.get(name), name in parse_dates
+            )
+            for name in table.column_names
+        }
+    )
+    del table
+    if started is not None:
+        record_measure(started, "read_arrow", query, len(df), df)
+    return df.set_index(index_col) if index_col is not None else df
+
+
+def get_table_dataframe(
+    table: str,
+    connection_params: Dict[str, str],
+    local: bool,
+    profile: str = "default",
+    exclude_columns: Optional[List[str]] = None,
+    arrow: bool = False,
+) -> pd.DataFrame:
+    """
+    Loads a whole table with the dtypes of a load profile of viz_constants
+    (LOAD_PROFILES), indexed by its primary key and with its dates parsed.
+
+    The "compact" profiles take a fraction of the memory of the "default"
+    ones, and leaving out the full_text column of the tweets saves most of
+    the rest (see report_memory_usage).
+
+    Args:
+        table (str): The table, e.g. "Tweets".
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        profile (str, optional): The load profile, e.g. "compact". Defaults to "default".
+        exclude_columns (Optional[List[str]], optional): The columns left out
+            of the load, e.g. ["full_text"]. Defaults to None.
+        arrow (bool, optional): Whether the table is read with
+            get_arrow_dataframe_from_query. Defaults to False.
+
+    Returns:
+        pd.DataFrame: A pandas DataFrame containing the table.
+
+    Raises:
+        ValueError: If the profile or the table is unknown.
+    """
+    if profile not in LOAD_PROFILES:
+        raise ValueError(
+            f"Unknown load profile {profile!r}, expected one of {list(LOAD_PROFILES)}"
         )
+    if table not in TABLE_COLUMNS:
+        raise ValueError(
+            f"Unknown table {table!r}, expected one of {list(TABLE_COLUMNS)}"
+        )
+
+    query: str = f"SELECT * FROM {table}"
+    dtypes: Dict[str, str] = LOAD_PROFILES[profile][table]
+    if exclude_columns:
+        columns: List[str] = [
+            column for column in TABLE_COLUMNS[table] if column not in exclude_columns
+        ]
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+        dtypes = {k: v for k, v in dtypes.items() if k in columns}
+
+    get_dataframe = (
+        get_arrow_dataframe_from_query if arrow else get_dataframe_from_query
+    )
+    return get_dataframe(
+        query,
+        connection_params,
+        local,
+        dtypes,
+        TABLE_INDEXES[table],
+        parse_dates=TABLE_DATES.get(table),
+    )
+
+
+def report_memory_usage(
+    connection_params: Dict[str, str],
+    local: bool,
+    tables: Optional[List[str]] = None,
+    profile: str = "compact",
+    exclude_columns: Optional[List[str]] = None,
+    arrow: bool = False,
+) -> pd.DataFrame:
+    """
+    Compares the memory of the tables loaded with the "default" profile and
+    with another one. The tables are loaded one at a time, so only one table
+    is in memory twice.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        tables (Optional[List[str]], optional): The tables. Defaults to None, for all of them.
+        profile (str, optional): The profile compared to the "default" one.
+            Defaults to "compact".
+        exclude_columns (Optional[List[str]], optional): The columns left out
+            of the loads with the profile. Defaults to None.
+        arrow (bool, optional): Whether the tables are read with
+            get_arrow_dataframe_from_query with the profile. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The memory in MB of every table with the "default" profile
+            (before_mb) and with the profile (after_mb), and the ratio between them.
+    """
+    report: Dict[str, Tuple[float, float]] = {}
+    for table in tables or list(TABLE_COLUMNS):
+        df = get_table_dataframe(table, connection_params, local)
+        before: float = df.memory_usage(deep=True).sum() / 1024**2
+        del df
+        df = get_table_dataframe(
+            table, connection_params, local, profile, exclude_columns, arrow
+        )
+        after: float = df.memory_usage(deep=True).sum() / 1024**2
+        del df
+        report[table] = (before, after)
+    df_report = pd.DataFrame.from_dict(
+        report, orient="index", columns=["before_mb", "after_mb"]
+    )
+    df_report["ratio"] = df_report["after_mb"] / df_report["before_mb"]
+    return df_report.round(2)
 
 
 def split_into_batches(lst: List[Any], batch_size: int) -> List[List[Any]]:
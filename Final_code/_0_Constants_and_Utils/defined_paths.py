@@ -7,6 +7,10 @@ import os
 folder_processed_name: str = "data_processed"
 local_database_name: str = "local_backup.db"
 processed_tweets_json_name: str = "cleaned_tweets_combined.json"
+processed_tweets_parquet_name: str = "cleaned_tweets_parquet"
+extraction_manifest_name: str = "extraction_manifest.json"
+extraction_tweet_ids_name: str = "extraction_tweet_ids.npy"
+extraction_report_name: str = "extraction_report.json"
 
 folder_path_processed: str = os.path.dirname(os.getcwd())
 folder_processed: str = os.path.join(folder_path_processed, folder_processed_name)
@@ -14,8 +18,40 @@ path_processed_tweets_json: str = os.path.join(
     folder_processed, processed_tweets_json_name
 )
 
+# Get a path to the Parquet dataset with processed tweets (folder with Users/ and Tweets/)
+path_processed_tweets_parquet: str = os.path.join(
+    folder_processed, processed_tweets_parquet_name
+)
+
+# Get paths to the manifest of the extracted raw files and their tweet IDs
+path_extraction_manifest: str = os.path.join(folder_processed, extraction_manifest_name)
+path_extraction_tweet_ids: str = os.path.join(
+    folder_processed, extraction_tweet_ids_name
+)
+# Get a path to the report with the rejection counts and timings of the extraction
+path_extraction_report: str = os.path.join(folder_processed, extraction_report_name)
+path_extraction_report_notebook: str = os.path.join(
+    os.path.dirname(folder_path_processed),
+    folder_processed_name,
+    extraction_report_name,
+)
+
 # Get a path to the local database
 path_local_database: str = os.path.join(folder_processed, local_database_name)
 path_local_database_notebook: str = os.path.join(
     os.path.dirname(folder_path_processed), folder_processed_name, local_database_name
 )
+
+# Get a path to the cache of the query results (folder of Parquet files)
+query_cache_name: str = "query_cache"
+path_query_cache: str = os.path.join(folder_processed, query_cache_name)
+path_query_cache_notebook: str = os.path.join(
+    os.path.dirname(folder_path_processed), folder_processed_name, query_cache_name
+)
+
+# Get a path to the metrics of the database queries (see query_metrics.py)
+query_metrics_name: str = "query_metrics.db"
+path_query_metrics: str = os.path.join(folder_processed, query_metrics_name)
+path_query_metrics_notebook: str = os.path.join(
+    os.path.dirname(folder_path_processed), folder_processed_name, query_metrics_name
+)
@@ -0,0 +1,117 @@
+import json
+import os
+from typing import Any, Callable, List, NamedTuple, Optional, Union
+
+# This is a file with the JSON codec used to decode and encode the tweets.
+# The fastest installed backend (orjson, then simdjson) is used, with the stdlib
+# json module as the fallback. To force a backend, set the DBL_JSON_BACKEND
+# environment variable to "orjson", "simdjson" or "json".
+
+BACKENDS: List[str] = ["orjson", "simdjson", "json"]
+
+
+class JsonCodec(NamedTuple):
+    """
+    Functions decoding and encoding JSON with a given backend.
+    """
+
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    dumps: Callable[[Any], str]
+
+
+def with_fallback(fast: Callable[[Any], Any], fallback: Callable[[Any], Any]):
+    """
+    Wraps a fast JSON function so that the stdlib function is used when it fails.
+
+    The fast backends are stricter than the json module (e.g. on lone
+    surrogates, NaN or integers larger than 64 bits), so the fallback keeps
+    the results identical to the stdlib ones.
+
+    Args:
+        fast (Callable[[Any], Any]): The function of the fast backend.
+        fallback (Callable[[Any], Any]): The equivalent function of the json module.
+
+    Returns:
+        Callable[[Any], Any]: The wrapped function.
+    """
+
+    def wrapped(data: Any) -> Any:
+        try:
+            return fast(data)
+        except (ValueError, TypeError):
+            return fallback(data)
+
+    return wrapped
+
+
+def get_codec(backend: Optional[str] = None) -> JsonCodec:
+    """
+    Returns the JSON codec of the given backend, or of the fastest installed one.
+
+    Args:
+        backend (Optional[str], optional): The name of the backend, one of BACKENDS.
+            Defaults to None, which picks the first installed backend.
+
+    Returns:
+        JsonCodec: The codec of the backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the requested backend is not installed.
+    """
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend '{backend}', expected one of {BACKENDS}"
+        )
+
+    if backend in (None, "orjson"):
+        try:
+            import orjson
+
+            return JsonCodec(
+                "orjson",
+                with_fallback(orjson.loads, json.loads),
+                with_fallback(
+                    lambda obj: orjson.dumps(obj).decode("utf-8"), json.dumps
+                ),
+            )
+        except ImportError:
+            if backend is not None:
+                raise
+
+    if backend in (None, "simdjson"):
+        try:
+            import simdjson
+
+            # simdjson only decodes, the encoding is done by the json module
+            return JsonCodec(
+                "simdjson", with_fallback(simdjson.loads, json.loads), json.dumps
+            )
+        except ImportError:
+            if backend is not None:
+                raise
+
+    return JsonCodec("json", json.loads, json.dumps)
+
+
+def available_backends() -> List[str]:
+    """
+    Returns the names of the installed JSON backends.
+
+    Returns:
+        List[str]: The installed backends, in the order of preference.
+    """
+    available: List[str] = []
+    for backend in BACKENDS:
+        try:
+            get_codec(backend)
+        except ImportError:
+            continue
+        available.append(backend)
+    return available
+
+
+codec: JsonCodec = get_codec(os.getenv("DBL_JSON_BACKEND"))
+loads: Callable[[Union[str, bytes]], Any] = codec.loads
+dumps: Callable[[Any], str] = codec.dumps
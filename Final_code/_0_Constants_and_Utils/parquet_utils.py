@@ -0,0 +1,410 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# This is a file with the Parquet format of the cleaned tweets.
+# A Parquet dataset is a folder with a 'Users' and a 'Tweets' subfolder, both
+# holding numbered part files ('part-00000.parquet', ...). The parts of both
+# tables with the same number have the same rows, in the same order, and
+# the columns are named like the columns of the database tables.
+
+TWITTER_TIME_FORMAT: str = "%a %b %d %H:%M:%S %z %Y"
+PARQUET_TABLES: Tuple[str, str] = ("Users", "Tweets")
+
+
+def get_schemas() -> Dict[str, "pa.Schema"]:
+    """
+    Returns the Arrow schemas of the Users and Tweets tables.
+
+    Returns:
+        Dict[str, pa.Schema]: The schemas by table name.
+    """
+    timestamp = pa.timestamp("s", tz="UTC")
+    return {
+        "Users": pa.schema(
+            [
+                ("user_id", pa.string()),
+                ("verified", pa.bool_()),
+                ("followers_count", pa.int64()),
+                ("friends_count", pa.int64()),
+                ("statuses_count", pa.int64()),
+                ("creation_time", timestamp),
+                ("default_profile", pa.bool_()),
+                ("default_profile_image", pa.bool_()),
+            ]
+        ),
+        "Tweets": pa.schema(
+            [
+                ("tweet_id", pa.string()),
+                ("user_id", pa.string()),
+                ("full_text", pa.string()),
+                ("lang", pa.string()),
+                ("creation_time", timestamp),
+                ("country_code", pa.string()),
+                ("favorite_count", pa.int64()),
+                ("retweet_count", pa.int64()),
+                ("possibly_sensitive", pa.bool_()),
+                ("replied_tweet_id", pa.string()),
+                ("reply_count", pa.int64()),
+                ("quoted_status_id", pa.string()),
+                ("quote_count", pa.int64()),
+            ]
+        ),
+    }
+
+
+def parse_timestamps(values: Union[List[Optional[str]], "pa.Array"]) -> "pa.Array":
+    """
+    Parses Twitter 'created_at' strings to an Arrow array of UTC timestamps.
+
+    Args:
+        values (Union[List[Optional[str]], pa.Array]): The timestamps, e.g.
+            'Wed Oct 10 20:19:24 +0000 2018', as a list or an Arrow string array.
+
+    Returns:
+        pa.Array: The parsed timestamps, with nulls for the missing ones.
+    """
+    strings = (
+        values if isinstance(values, pa.Array) else pa.array(values, type=pa.string())
+    )
+    try:
+        return pc.strptime(strings, format=TWITTER_TIME_FORMAT, unit="s")
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # The Arrow parser does not support every directive on every platform
+        return pa.array(
+            [
+                datetime.strptime(value, TWITTER_TIME_FORMAT) if value else None
+                for value in strings.to_pylist()
+            ],
+            type=pa.timestamp("s", tz="UTC"),
+        )
+
+
+def boolean_array(values: List[Any]) -> "pa.Array":
+    """
+    Converts flags to an Arrow boolean array.
+
+    The cleaned tweets store some flags as 0 or 1 (e.g. 'default_profile'),
+    which Arrow does not convert to booleans by itself.
+
+    Args:
+        values (List[Any]): The flags, as booleans, integers or None.
+
+    Returns:
+        pa.Array: The flags, with nulls for the missing ones.
+    """
+    return pa.array(
+        [None if value is None else bool(value) for value in values], pa.bool_()
+    )
+
+
+def optional_str(value: Any) -> Optional[str]:
+    """
+    Converts an ID to a string, keeping the missing IDs as None.
+
+    Args:
+        value (Any): The ID, e.g. 'quoted_status_id' is an integer in the raw tweets.
+
+    Returns:
+        Optional[str]: The ID as a string, or None.
+    """
+    return None if value is None else str(value)
+
+
+def cleaned_tweets_to_tables(
+    tweets: List[Dict[str, Dict[str, Any]]],
+) -> Tuple["pa.Table", "pa.Table"]:
+    """
+    Converts cleaned tweets (the output of start_cleaning) to Arrow tables.
+
+    Args:
+        tweets (List[Dict[str, Dict[str, Any]]]): The cleaned tweets.
+
+    Returns:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables, with one row per tweet.
+    """
+    schemas: Dict[str, pa.Schema] = get_schemas()
+    users: List[Dict[str, Any]] = [tweet["user"] for tweet in tweets]
+    tweets_: List[Dict[str, Any]] = [tweet["tweet"] for tweet in tweets]
+
+    users_table = pa.Table.from_arrays(
+        [
+            pa.array([user["user_id"] for user in users], pa.string()),
+            boolean_array([user["verified"] for user in users]),
+            pa.array([user["followers_count"] for user in users], pa.int64()),
+            pa.array([user["friends_count"] for user in users], pa.int64()),
+            pa.array([user["statuses_count"] for user in users], pa.int64()),
+            parse_timestamps([user["created_at"] for user in users]),
+            boolean_array([user["default_profile"] for user in users]),
+            boolean_array([user["default_profile_image"] for user in users]),
+        ],
+        schema=schemas["Users"],
+    )
+    tweets_table = pa.Table.from_arrays(
+        [
+            pa.array([tweet["tweet_id"] for tweet in tweets_], pa.string()),
+            pa.array([user["user_id"] for user in users], pa.string()),
+            pa.array([tweet["text"] for tweet in tweets_], pa.string()),
+            pa.array([tweet["lang"] for tweet in tweets_], pa.string()),
+            parse_timestamps([tweet["creation_time"] for tweet in tweets_]),
+            pa.array([tweet["country_code"] for tweet in tweets_], pa.string()),
+            pa.array([tweet["favorite_count"] for tweet in tweets_], pa.int64()),
+            pa.array([tweet["retweet_count"] for tweet in tweets_], pa.int64()),
+            boolean_array([tweet["possibly_sensitive"] for tweet in tweets_]),
+            pa.array(
+                [optional_str(tweet["replied_tweet_id"]) for tweet in tweets_],
+                pa.string(),
+            ),
+            pa.array([tweet["reply_count"] for tweet in tweets_], pa.int64()),
+            pa.array(
+                [optional_str(tweet["quoted_status_id"]) for tweet in tweets_],
+                pa.string(),
+            ),
+            pa.array([tweet["quote_count"] for tweet in tweets_], pa.int64()),
+        ],
+        schema=schemas["Tweets"],
+    )
+    return users_table, tweets_table
+
+
+def temporary_part_path(part_path: str) -> str:
+    """
+    Returns the path a part file is written to before it is complete. Its name
+    starts with an underscore, so the reads of the dataset folder ignore it,
+    e.g. after a crash.
+
+    Args:
+        part_path (str): The path to the part file.
+
+    Returns:
+        str: The path to the temporary part file.
+    """
+    folder, part_name = os.path.split(part_path)
+    return os.path.join(folder, f"_{part_name}.tmp")
+
+
+def list_parts(dataset_path: str, table: str = "Tweets") -> List[str]:
+    """
+    Lists the part files of a table of a Parquet dataset, in order.
+
+    Args:
+        dataset_path (str): The path to the dataset folder.
+        table (str, optional): The name of the table. Defaults to "Tweets".
+
+    Returns:
+        List[str]: The paths to the part files.
+    """
+    table_path: str = os.path.join(dataset_path, table)
+    if not os.path.isdir(table_path):
+        return []
+    return [
+        os.path.join(table_path, file)
+        for file in sorted(os.listdir(table_path))
+        if file.startswith("part-") and file.endswith(".parquet")
+    ]
+
+
+def remove_parts(dataset_path: str, first_part: int = 0) -> None:
+    """
+    Removes the part files of a Parquet dataset, starting from a given part
+    number, and the temporary part files left by an interrupted writer.
+
+    Args:
+        dataset_path (str): The path to the dataset folder.
+        first_part (int, optional): The number of the first removed part. Defaults to 0.
+
+    Returns:
+        None
+    """
+    for table in PARQUET_TABLES:
+        for part_path in list_parts(dataset_path, table)[first_part:]:
+            os.remove(part_path)
+        table_path: str = os.path.join(dataset_path, table)
+        if os.path.isdir(table_path):
+            for file in os.listdir(table_path):
+                if file.startswith("_part-") and file.endswith(".parquet.tmp"):
+                    os.remove(os.path.join(table_path, file))
+
+
+class ParquetTweetWriter:
+    """
+    Writes cleaned tweets to a new part of a Parquet dataset.
+
+    The tweets are buffered and written as compressed row groups. The part
+    files are written under temporary names (see temporary_part_path) and
+    only renamed when the writer is closed, so a crash never leaves a
+    partially written part.
+
+    Methods:
+        write(tweet): Adds a cleaned tweet to the part.
+        close(): Writes the remaining tweets and completes the part.
+    """
+
+    def __init__(
+        self,
+        dataset_path: str,
+        row_group_size: int = 100_000,
+        compression: str = "zstd",
+    ):
+        """
+        Args:
+            dataset_path (str): The path to the dataset folder.
+            row_group_size (int, optional): The number of tweets per row group.
+                Defaults to 100_000.
+            compression (str, optional): The Parquet compression codec.
+                Defaults to "zstd".
+        """
+        self.row_group_size: int = row_group_size
+        self._buffer: List[Dict[str, Dict[str, Any]]] = []
+        part_name: str = f"part-{len(list_parts(dataset_path)):05d}.parquet"
+        schemas: Dict[str, pa.Schema] = get_schemas()
+        self._paths: Dict[str, str] = {}
+        self._writers: Dict[str, pq.ParquetWriter] = {}
+        for table in PARQUET_TABLES:
+            os.makedirs(os.path.join(dataset_path, table), exist_ok=True)
+            self._paths[table] = os.path.join(dataset_path, table, part_name)
+            self._writers[table] = pq.ParquetWriter(
+                temporary_part_path(self._paths[table]),
+                schemas[table],
+                compression=compression,
+            )
+
+    def __enter__(self) -> "ParquetTweetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        for table, writer in self._writers.items():
+            writer.close()
+            os.remove(temporary_part_path(self._paths[table]))
+
+    def write(self, tweet: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Adds a cleaned tweet to the part.
+
+        Args:
+            tweet (Dict[str, Dict[str, Any]]): The cleaned tweet.
+        """
+        self._buffer.append(tweet)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def write_tables(self, users: "pa.Table", tweets: "pa.Table") -> None:
+        """
+        Adds tables of users and tweets to the part.
+
+        Args:
+            users (pa.Table): The Users table.
+            tweets (pa.Table): The Tweets table, with the same number of rows.
+        """
+        self._flush()
+        self._writers["Users"].write_table(users, row_group_size=self.row_group_size)
+        self._writers["Tweets"].write_table(tweets, row_group_size=self.row_group_size)
+
+    def close(self) -> None:
+        """
+        Writes the remaining tweets and completes the part.
+        """
+        self._flush()
+        for table, writer in self._writers.items():
+            writer.close()
+            os.replace(temporary_part_path(self._paths[table]), self._paths[table])
+
+    def _flush(self) -> None:
+        if self._buffer:
+            users, tweets = cleaned_tweets_to_tables(self._buffer)
+            self._buffer = []
+            self._writers["Users"].write_table(users)
+            self._writers["Tweets"].write_table(tweets)
+
+
+def read_cleaned_table(
+    dataset_path: str, table: str, columns: Optional[List[str]] = None
+) -> "pa.Table":
+    """
+    Reads a table of a Parquet dataset of cleaned tweets.
+
+    The result is an Arrow table, which converts to pandas without copies
+    with `table.to_pandas(types_mapper=pd.ArrowDtype)`.
+
+    Args:
+        dataset_path (str): The path to the dataset folder.
+        table (str): The name of the table, "Users" or "Tweets".
+        columns (Optional[List[str]], optional): The columns to read.
+            Defaults to None, which reads all of them.
+
+    Returns:
+        pa.Table: The table with the rows of all the parts.
+    """
+    return pq.read_table(
+        os.path.join(dataset_path, table),
+        columns=columns,
+        schema=get_schemas()[table],
+        memory_map=True,
+    )
+
+
+def iterate_parts(dataset_path: str) -> Iterator[Tuple["pa.Table", "pa.Table"]]:
+    """
+    Lazily reads the parts of a Parquet dataset of cleaned tweets, in order.
+
+    The part files are memory-mapped, so only one part is read at a time.
+
+    Args:
+        dataset_path (str): The path to the dataset folder.
+
+    Yields:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables of a part,
+            with the same number of rows.
+    """
+    schemas: Dict[str, pa.Schema] = get_schemas()
+    for users_path, tweets_path in zip(
+        list_parts(dataset_path, "Users"), list_parts(dataset_path, "Tweets")
+    ):
+        yield (
+            pq.read_table(users_path, schema=schemas["Users"], memory_map=True),
+            pq.read_table(tweets_path, schema=schemas["Tweets"], memory_map=True),
+        )
+
+
+def table_to_rows(table: "pa.Table") -> List[Tuple[Any, ...]]:
+    """
+    Converts an Arrow table to row tuples, e.g. for the database insertion.
+
+    Args:
+        table (pa.Table): The table to convert.
+
+    Returns:
+        List[Tuple[Any, ...]]: The rows, with the values in the order of the columns.
+    """
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+
+def read_cleaned_dataframe(
+    dataset_path: str, table: str, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Reads a table of a Parquet dataset of cleaned tweets into a DataFrame.
+
+    The columns are backed by the Arrow buffers (pd.ArrowDtype), so the
+    conversion does not copy or re-parse the data.
+
+    Args:
+        dataset_path (str): The path to the dataset folder.
+        table (str): The name of the table, "Users" or "Tweets".
+        columns (Optional[List[str]], optional): The columns to read.
+            Defaults to None, which reads all of them.
+
+    Returns:
+        pd.DataFrame: The table with the rows of all the parts.
+    """
+    return read_cleaned_table(dataset_path, table, columns).to_pandas(
+        types_mapper=pd.ArrowDtype
+    )
@@ -0,0 +1,330 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from database_utils import (
+    get_arrow_dataframe_from_query,
+    get_dataframe_from_query,
+    pooled_connection,
+)
+from defined_paths import path_query_cache_notebook
+
+# This is a file with the on-disk cache of the query results of the notebooks.
+# Every result is a Parquet file in the query_cache folder of data_processed,
+# named by a hash of the query, the database and the read arguments, with the
+# fingerprint of the tables it was read from in its metadata. A result whose
+# tables changed since is read from the database again and overwritten, and
+# the least recently used files are removed when the folder is too large.
+
+# Maximum size of the cache folder in bytes
+QUERY_CACHE_MAX_SIZE: int = 2 * 1024**3
+QUERY_CACHE_EXTENSION: str = ".parquet"
+# Key of the table fingerprint in the metadata of the Parquet files
+FINGERPRINT_METADATA_KEY: bytes = b"query_cache_fingerprint"
+# Key of the object columns, which pyarrow would read back as str columns
+OBJECT_COLUMNS_METADATA_KEY: bytes = b"query_cache_object_columns"
+
+# The tables a query reads from
+QUERY_TABLE_PATTERN: re.Pattern = re.compile(
+    r"\b(?:FROM|JOIN)\s+`?(\w+)", re.IGNORECASE
+)
+
+# MySQL 8 caches the statistics of information_schema.tables for a day by default
+SET_STATS_EXPIRY_MYSQL: str = "SET SESSION information_schema_stats_expiry = 0"
+SELECT_TABLE_VERSIONS_MYSQL: str = """
+SELECT table_name, create_time, update_time, table_rows
+FROM information_schema.tables
+WHERE table_schema = DATABASE()
+ORDER BY table_name;
+"""
+
+
+def get_database_name(connection_params: Dict[str, str], local: bool) -> str:
+    """
+    Returns the name of a database in the cache key, without the password.
+
+    Args:
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+
+    Returns:
+        str: The absolute path of a local database, or the user, host and
+            name of a MySQL database.
+    """
+    if local:
+        return os.path.abspath(connection_params["file_path"])
+    return f"{connection_params['user']}@{connection_params['host']}/{connection_params['database']}"
+
+
+def get_table_fingerprint(
+    query: str, connection_params: Dict[str, str], local: bool
+) -> str:
+    """
+    Returns a fingerprint of the tables a query reads from, which changes
+    whenever one of them changes.
+
+    A SQLite database is only fingerprinted as a whole, by the modification
+    time and size of its files, so a change of any table invalidates all its
+    results. MySQL tables are fingerprinted one by one from
+    information_schema.tables, by their creation and last update times and
+    their number of rows.
+
+    Args:
+        query (str): The SQL query.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+
+    Returns:
+        str: The fingerprint.
+    """
+    if local:
+        file_path: str = connection_params["file_path"]
+        # The write-ahead log holds the changes which are not in the database file yet
+        return json.dumps(
+            [
+                (os.stat(path).st_mtime_ns, os.stat(path).st_size)
+                for path in (file_path, f"{file_path}-wal")
+                if os.path.exists(path)
+            ]
+        )
+
+    from mysql.connector import Error
+
+    tables: Set[str] = {table.lower() for table in QUERY_TABLE_PATTERN.findall(query)}
+    with pooled_connection(connection_params, local) as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(SET_STATS_EXPIRY_MYSQL)
+        except Error:
+            pass  # MySQL 5.7 has no statistics cache
+        cursor.execute(SELECT_TABLE_VERSIONS_MYSQL)
+        versions: List[Tuple[Any, ...]] = [
+            row for row in cursor.fetchall() if not tables or row[0].lower() in tables
+        ]
+        cursor.close()
+    return json.dumps(versions, default=str)
+
+
+def get_cache_path(
+    query: str,
+    connection_params: Dict[str, str],
+    local: bool,
+    read_arguments: Dict[str, Any],
+    cache_folder: str,
+) -> str:
+    """
+    Returns the path of the cached result of a query.
+
+    Args:
+        query (str): The SQL query.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+        read_arguments (Dict[str, Any]): The other arguments of the read, e.g. the dtypes.
+        cache_folder (str): The folder of the cache.
+
+    Returns:
+        str: The path of the Parquet file.
+    """
+    key: str = json.dumps(
+        {
+            "query": query,
+            "database": get_database_name(connection_params, local),
+            **read_arguments,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    name: str = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_folder, name + QUERY_CACHE_EXTENSION)
+
+
+def read_cached_dataframe(path: str, fingerprint: str) -> Optional[pd.DataFrame]:
+    """
+    Reads a cached result if it was read from the same version of its tables,
+    and marks it as used for the eviction.
+
+    Args:
+        path (str): The path of the Parquet file.
+        fingerprint (str): The current fingerprint of the tables.
+
+    Returns:
+        Optional[pd.DataFrame]: The result, None if it is missing or outdated.
+    """
+    try:
+        metadata: Dict[bytes, bytes] = pq.read_schema(path).metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    if metadata.get(FINGERPRINT_METADATA_KEY) != fingerprint.encode("utf-8"):
+        return None
+    df: pd.DataFrame = pq.read_table(path).to_pandas()
+    object_columns: Dict[str, List[str]] = json.loads(
+        metadata[OBJECT_COLUMNS_METADATA_KEY]
+    )
+    df = df.astype({column: object for column in object_columns["columns"]})
+    if object_columns["index"]:
+        df.index = df.index.astype(object)
+    os.utime(path)
+    return df
+
+
+def write_cached_dataframe(df: pd.DataFrame, path: str, fingerprint: str) -> None:
+    """
+    Writes a result to the cache, with the fingerprint of its tables. The
+    file is replaced at once, so a notebook reading it never sees half of it.
+
+    Args:
+        df (pd.DataFrame): The result.
+        path (str): The path of the Parquet file.
+        fingerprint (str): The fingerprint of the tables before the result was read.
+
+    Returns:
+        None
+    """
+    table: pa.Table = pa.Table.from_pandas(df, preserve_index=True)
+    object_columns: Dict[str, Any] = {
+        "columns": [column for column in df.columns if df[column].dtype == object],
+        "index": df.index.nlevels == 1 and df.index.dtype == object,
+    }
+    table = table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            FINGERPRINT_METADATA_KEY: fingerprint.encode("utf-8"),
+            OBJECT_COLUMNS_METADATA_KEY: json.dumps(object_columns).encode("utf-8"),
+        }
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        suffix=".tmp", dir=os.path.dirname(path)
+    )
+    os.close(file_descriptor)
+    try:
+        pq.write_table(table, temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def evict_query_cache(cache_folder: str, max_size: int) -> None:
+    """
+    Removes the least recently used results until the cache is at most max_size bytes.
+
+    Args:
+        cache_folder (str): The folder of the cache.
+        max_size (int): The maximum size of the cache in bytes.
+
+    Returns:
+        None
+    """
+    files: List[Tuple[float, int, str]] = []
+    for entry in os.scandir(cache_folder):
+        if entry.name.endswith(QUERY_CACHE_EXTENSION):
+            files.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+    size: int = sum(file_size for _, file_size, _ in files)
+    for _, file_size, path in sorted(files):
+        if size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another notebook
+        size -= file_size
+
+
+def clear_query_cache(cache_folder: str = path_query_cache_notebook) -> None:
+    """
+    Removes every result of the cache.
+
+    Args:
+        cache_folder (str, optional): The folder of the cache. Defaults to the
+            one of the notebooks.
+
+    Returns:
+        None
+    """
+    if os.path.isdir(cache_folder):
+        evict_query_cache(cache_folder, max_size=0)
+
+
+def get_cached_dataframe_from_query(
+    query: str,
+    connection_params: Dict[str, str],
+    local: bool,
+    dtypes: Optional[Dict[str, str]] = None,
+    index_col: Optional[Union[str, List[str]]] = None,
+    parse_dates: Optional[List[str]] = None,
+    arrow: bool = False,
+    cache_folder: str = path_query_cache_notebook,
+    max_size: int = QUERY_CACHE_MAX_SIZE,
+) -> pd.DataFrame:
+    """
+    Like get_dataframe_from_query, but the result is kept in an on-disk cache
+    and read from it as long as the tables of the query do not change (see
+    get_table_fingerprint), e.g. after a restart of the kernel.
+
+    The cache is keyed by the query, the database and the other arguments,
+    and the least recently used results are removed when it grows larger than
+    max_size bytes.
+
+    Args:
+        query (str): The SQL query to execute.
+        connection_params (Dict[str, str]): The parameters required to establish the database connection.
+        local (bool): Flag indicating whether the connection is local (SQLite) or remote (MySQL).
+        dtypes (Optional[Dict[str, str]], optional): Dictionary specifying column data types.
+            Defaults to None.
+        index_col (Optional[Union[str, List[str]]], optional): Name of the
+            column(s) to set as the index. Defaults to None.
+        parse_dates (Optional[List[str]], optional): List of columns to parse as dates.
+            Defaults to None.
+        arrow (bool, optional): Whether a result missing from the cache is read
+            with get_arrow_dataframe_from_query. Defaults to False.
+        cache_folder (str, optional): The folder of the cache. Defaults to the
+            one of the notebooks.
+        max_size (int, optional): The maximum size of the cache in bytes.
+            Defaults to QUERY_CACHE_MAX_SIZE.
+
+    Returns:
+        pd.DataFrame: A pandas DataFrame containing the results of the query.
+    """
+    path: str = get_cache_path(
+        query,
+        connection_params,
+        local,
+        {
+            "dtypes": dtypes,
+            "index_col": index_col,
+            "parse_dates": parse_dates,
+            "arrow": arrow,
+        },
+        cache_folder,
+    )
+    # Taken before the query, so that a change during the query invalidates the result
+    fingerprint: str = get_table_fingerprint(query, connection_params, local)
+    df: Optional[pd.DataFrame] = read_cached_dataframe(path, fingerprint)
+    if df is not None:
+        return df
+
+    get_dataframe = (
+        get_arrow_dataframe_from_query if arrow else get_dataframe_from_query
+    )
+    df = get_dataframe(
+        query, connection_params, local, dtypes, index_col, parse_dates=parse_dates
+    )
+    write_cached_dataframe(df, path, fingerprint)
+    evict_query_cache(cache_folder, max_size)
+    return df
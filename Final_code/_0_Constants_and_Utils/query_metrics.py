@@ -0,0 +1,372 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from defined_paths import path_query_metrics
+
+# This is a file with the opt-in instrumentation of the database queries.
+# When it is enabled (by enable_query_metrics, or by setting the environment
+# variable DBL_QUERY_METRICS to 1 or to the path of the metrics), every query
+# of database_utils and of the database backends records the hash of its
+# statement, the rows it returned or changed, its wall and CPU time and the
+# bytes it sent or received, in the QueryMetrics table of a SQLite database
+# or in a JSON lines file. When it is disabled, a query only pays for one call
+# of start_measure.
+
+# Environment variable enabling the metrics for a whole run of a script
+QUERY_METRICS_ENV_VAR: str = "DBL_QUERY_METRICS"
+# Environment variable naming the run, e.g. to group the stages of a pipeline
+QUERY_METRICS_RUN_ENV_VAR: str = "DBL_QUERY_METRICS_RUN"
+# Files with this extension are written as JSON lines, other files as SQLite
+JSON_LINES_EXTENSION: str = ".jsonl"
+# Records kept in memory before they are written
+FLUSH_SIZE: int = 1000
+# Characters of every statement kept with its hash
+STATEMENT_PREVIEW_LENGTH: int = 200
+
+METRICS_COLUMNS: List[str] = [
+    "run_id",
+    "pipeline",
+    "started_at",
+    "operation",
+    "statement_hash",
+    "statement",
+    "rows",
+    "wall_time",
+    "cpu_time",
+    "bytes",
+]
+CREATE_QUERY_METRICS: str = """
+CREATE TABLE IF NOT EXISTS QueryMetrics(
+    run_id TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    started_at REAL NOT NULL,  -- Unix time
+    operation TEXT NOT NULL,
+    statement_hash TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    rows INTEGER,  -- NULL when the database does not report it
+    wall_time REAL NOT NULL,  -- seconds
+    cpu_time REAL NOT NULL,  -- seconds of the calling thread
+    bytes INTEGER NOT NULL
+);
+"""
+INSERT_QUERY_METRICS: str = (
+    f"INSERT INTO QueryMetrics ({', '.join(METRICS_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(METRICS_COLUMNS))})"
+)
+
+WHITESPACE_PATTERN: re.Pattern = re.compile(r"\s+")
+
+
+def get_statement_hash(statement: str) -> str:
+    """
+    Returns the hash of a statement, the same for every formatting of its whitespace.
+
+    Args:
+        statement (str): The SQL statement.
+
+    Returns:
+        str: The first 16 hexadecimal digits of its SHA-1.
+    """
+    normalised: str = WHITESPACE_PATTERN.sub(" ", statement).strip()
+    return hashlib.sha1(normalised.encode("utf-8")).hexdigest()[:16]
+
+
+def get_payload_size(payload: Any) -> int:
+    """
+    Estimates the bytes sent or received by a query: the memory of a result,
+    or the size of the values of the rows of parameters.
+
+    Args:
+        payload (Any): A DataFrame, an Arrow table, rows of parameters or None.
+
+    Returns:
+        int: The number of bytes.
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, pd.DataFrame):
+        return int(payload.memory_usage(deep=True).sum())
+    if hasattr(payload, "nbytes"):  # Arrow tables
+        return int(payload.nbytes)
+    size: int = 0
+    for row in payload:
+        for value in row if isinstance(row, (tuple, list)) else (row,):
+            if isinstance(value, str):
+                size += len(value.encode("utf-8"))
+            elif isinstance(value, bytes):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size
+
+
+class QueryMetrics:
+    """
+    The recorder of the metrics of the queries of one run, writing them to
+    path in batches of FLUSH_SIZE records and when the process exits.
+    """
+
+    def __init__(self, path: str, run_id: Optional[str] = None):
+        self.path = path
+        self.pipeline = os.path.basename(sys.argv[0]) or "interactive"
+        self.run_id = run_id or os.getenv(
+            QUERY_METRICS_RUN_ENV_VAR,
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}",
+        )
+        self.records: List[Tuple[Any, ...]] = []
+        self.lock = threading.Lock()
+
+    def record(
+        self,
+        operation: str,
+        statement: str,
+        rows: Optional[int],
+        started: Tuple[float, float, float],
+        payload: Any = None,
+    ) -> None:
+        """
+        Records a query which has just finished.
+
+        Args:
+            operation (str): The function which ran the query, e.g. "read".
+            statement (str): The SQL statement.
+            rows (Optional[int]): The rows returned or changed, None or -1 if unknown.
+            started (Tuple[float, float, float]): The value of start_measure
+                before the query.
+            payload (Any, optional): The result or the rows of parameters, for
+                get_payload_size. Defaults to None.
+
+        Returns:
+            None
+        """
+        wall_time: float = time.perf_counter() - started[1]
+        cpu_time: float = time.thread_time() - started[2]
+        record: Tuple[Any, ...] = (
+            self.run_id,
+            self.pipeline,
+            started[0],
+            operation,
+            get_statement_hash(statement),
+            statement.strip()[:STATEMENT_PREVIEW_LENGTH],
+            rows if rows is not None and rows >= 0 else None,
+            wall_time,
+            cpu_time,
+            get_payload_size(payload),
+        )
+        with self.lock:
+            self.records.append(record)
+            if len(self.records) >= FLUSH_SIZE:
+                self.flush_locked()
+
+    def flush(self) -> None:
+        """
+        Writes the records kept in memory.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self) -> None:
+        """
+        Writes the records kept in memory, with the lock already held.
+
+        Returns:
+            None
+        """
+        if not self.records:
+            return
+        folder: str = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        if self.path.endswith(JSON_LINES_EXTENSION):
+            with open(self.path, "a", encoding="utf-8") as file:
+                for record in self.records:
+                    file.write(json.dumps(dict(zip(METRICS_COLUMNS, record))) + "\n")
+        else:
+            connection = sqlite3.connect(self.path, timeout=30)
+            try:
+                connection.execute(CREATE_QUERY_METRICS)
+                connection.executemany(INSERT_QUERY_METRICS, self.records)
+                connection.commit()
+            finally:
+                connection.close()
+        self.records = []
+
+
+# The recorder of the current process, None when the metrics are disabled
+recorder: Optional[QueryMetrics] = None
+
+
+def enable_query_metrics(
+    path: str = path_query_metrics, run_id: Optional[str] = None
+) -> QueryMetrics:
+    """
+    Starts recording the metrics of the queries of this process.
+
+    Args:
+        path (str, optional): The SQLite database, or the JSON lines file if it
+            ends with JSON_LINES_EXTENSION. Defaults to path_query_metrics.
+        run_id (Optional[str], optional): The name of the run. Defaults to
+            DBL_QUERY_METRICS_RUN, or the start time and the process ID.
+
+    Returns:
+        QueryMetrics: The recorder.
+    """
+    global recorder
+    disable_query_metrics()
+    recorder = QueryMetrics(path, run_id)
+    return recorder
+
+
+def disable_query_metrics() -> None:
+    """
+    Stops recording the metrics of the queries, writing the remaining records.
+
+    Returns:
+        None
+    """
+    global recorder
+    if recorder is not None:
+        recorder.flush()
+        recorder = None
+
+
+def start_measure() -> Optional[Tuple[float, float, float]]:
+    """
+    Starts the measure of a query.
+
+    Returns:
+        Optional[Tuple[float, float, float]]: The Unix time, the wall clock and
+            the CPU time of the thread, None when the metrics are disabled.
+    """
+    if recorder is None:
+        return None
+    return time.time(), time.perf_counter(), time.thread_time()
+
+
+def record_measure(
+    started: Tuple[float, float, float],
+    operation: str,
+    statement: str,
+    rows: Optional[int],
+    payload: Any = None,
+) -> None:
+    """
+    Records a query measured since start_measure, see QueryMetrics.record.
+
+    Args:
+        started (Tuple[float, float, float]): The value of start_measure.
+        operation (str): The function which ran the query, e.g. "read".
+        statement (str): The SQL statement.
+        rows (Optional[int]): The rows returned or changed, None or -1 if unknown.
+        payload (Any, optional): The result or the rows of parameters. Defaults to None.
+
+    Returns:
+        None
+    """
+    if recorder is not None:
+        recorder.record(operation, statement, rows, started, payload)
+
+
+def read_query_metrics(path: str = path_query_metrics) -> pd.DataFrame:
+    """
+    Reads the recorded metrics.
+
+    Args:
+        path (str, optional): The SQLite database or the JSON lines file.
+            Defaults to path_query_metrics.
+
+    Returns:
+        pd.DataFrame: One row per query, with the columns of METRICS_COLUMNS.
+    """
+    if recorder is not None and recorder.path == path:
+        recorder.flush()
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=METRICS_COLUMNS)
+    if path.endswith(JSON_LINES_EXTENSION):
+        return pd.read_json(path, lines=True)
+    connection = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query("SELECT * FROM QueryMetrics", connection)
+    finally:
+        connection.close()
+
+
+def report_slowest_queries(
+    path: str = path_query_metrics, run_id: Optional[str] = None, top: int = 10
+) -> pd.DataFrame:
+    """
+    Reports the slowest queries of a run, with the statements run several
+    times grouped together.
+
+    Args:
+        path (str, optional): The SQLite database or the JSON lines file.
+            Defaults to path_query_metrics.
+        run_id (Optional[str], optional): The run. Defaults to None, for the
+            latest one.
+        top (int, optional): The number of statements. Defaults to 10.
+
+    Returns:
+        pd.DataFrame: The top statements by total wall time, with their
+            number of calls, rows, wall and CPU time and bytes.
+    """
+    metrics: pd.DataFrame = read_query_metrics(path)
+    if metrics.empty:
+        return metrics
+    if run_id is None:
+        run_id = metrics.loc[metrics["started_at"].idxmax(), "run_id"]
+    metrics = metrics[metrics["run_id"] == run_id]
+    report: pd.DataFrame = metrics.groupby(
+        ["operation", "statement_hash"], as_index=False
+    ).agg(
+        statement=("statement", "first"),
+        calls=("wall_time", "size"),
+        rows=("rows", "sum"),
+        wall_time=("wall_time", "sum"),
+        max_wall_time=("wall_time", "max"),
+        cpu_time=("cpu_time", "sum"),
+        bytes=("bytes", "sum"),
+    )
+    report.insert(0, "run_id", run_id)
+    return report.nlargest(top, "wall_time").reset_index(drop=True)
+
+
+# Enabled from the environment for every script of the run
+if os.getenv(QUERY_METRICS_ENV_VAR, "0") not in ("", "0"):
+    enable_query_metrics(
+        path_query_metrics
+        if os.environ[QUERY_METRICS_ENV_VAR] == "1"
+        else os.environ[QUERY_METRICS_ENV_VAR]
+    )
+atexit.register(disable_query_metrics)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Reports the slowest database queries of a run."
+    )
+    parser.add_argument("--path", default=path_query_metrics)
+    parser.add_argument("--run-id", default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(report_slowest_queries(args.path, args.run_id, args.top))
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Union
 
 # This is a file with constants used for visualizations
 
@@ -49,6 +49,7 @@ DTYPES_USERS: Dict[str, str] = {
     "statuses_count": "int32",
     "default_profile": "bool",
     "default_profile_image": "bool",
+    "snapshot_time": "datetime64[ns]",
 }
 
 DTYPES_CONVERSATIONS: Dict[str, str] = {
@@ -62,6 +63,139 @@ DTYPES_CONVERSATIONS_CATEGORY: Dict[str, str] = {
     "category": "category",
 }
 
+# Dtypes of the tables with integer IDs (see the Integer IDs queries). The IDs
+# which may be NULL are nullable UInt64, so database_utils.get_dataframe_from_query
+# reads them with the nullable types of pandas, which is also why
+# possibly_sensitive is a nullable boolean.
+DTYPES_TWEETS_INTEGER_IDS: Dict[str, str] = {
+    **DTYPES_TWEETS,
+    "tweet_id": "uint64",
+    "user_id": "uint64",
+    "possibly_sensitive": "boolean",
+    "replied_tweet_id": "UInt64",
+    "quoted_status_id": "UInt64",
+}
+
+DTYPES_USERS_INTEGER_IDS: Dict[str, str] = {**DTYPES_USERS, "user_id": "uint64"}
+
+DTYPES_CONVERSATIONS_INTEGER_IDS: Dict[str, str] = {
+    **DTYPES_CONVERSATIONS,
+    "tweet_id": "uint64",
+}
+
+DTYPES_REPLY_INTEGER_IDS: Dict[str, str] = {
+    "tweet_id": "uint64",
+    "user_id": "uint64",
+    "original_tweet_id": "uint64",
+    "original_user_id": "uint64",
+}
+
+# Compact dtypes, for the loads which do not fit in memory with the dtypes
+# above (see database_utils.get_table_dataframe): the texts and IDs are
+# Arrow-backed strings instead of Python strings, the user IDs of the tweets
+# are categorical, as most users have several tweets, and the columns which may
+# be NULL have the nullable types of pandas. The integer IDs are kept as
+# integers, which already take 8 bytes per ID.
+DTYPES_TWEETS_COMPACT: Dict[str, str] = {
+    **DTYPES_TWEETS,
+    "tweet_id": "string[pyarrow]",
+    "user_id": "category",
+    "full_text": "string[pyarrow]",
+    "possibly_sensitive": "boolean",
+    "replied_tweet_id": "string[pyarrow]",
+    "quoted_status_id": "string[pyarrow]",
+    "sentiment_score": "Float32",
+}
+
+DTYPES_USERS_COMPACT: Dict[str, str] = {
+    **DTYPES_USERS,
+    "user_id": "string[pyarrow]",
+}
+
+DTYPES_CONVERSATIONS_COMPACT: Dict[str, str] = {
+    **DTYPES_CONVERSATIONS,
+    "tweet_id": "string[pyarrow]",
+}
+
+DTYPES_TWEETS_COMPACT_INTEGER_IDS: Dict[str, str] = {
+    **DTYPES_TWEETS_INTEGER_IDS,
+    "full_text": "string[pyarrow]",
+    "sentiment_score": "Float32",
+}
+
+DTYPES_USERS_COMPACT_INTEGER_IDS: Dict[str, str] = DTYPES_USERS_INTEGER_IDS
+
+# The columns of the tables, for the loads which leave some of them out
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "Tweets": [
+        "tweet_id",
+        "user_id",
+        "full_text",
+        "lang",
+        "creation_time",
+        "country_code",
+        "favorite_count",
+        "retweet_count",
+        "possibly_sensitive",
+        "replied_tweet_id",
+        "reply_count",
+        "quoted_status_id",
+        "quote_count",
+        "sentiment_score",
+    ],
+    "Users": [
+        "user_id",
+        "verified",
+        "followers_count",
+        "friends_count",
+        "statuses_count",
+        "creation_time",
+        "default_profile",
+        "default_profile_image",
+        "snapshot_time",
+    ],
+    "Conversations": ["conversation_id", "tweet_order", "tweet_id"],
+    "ConversationsCategory": ["conversation_id", "category"],
+}
+TABLE_INDEXES: Dict[str, Union[str, List[str]]] = {
+    "Tweets": "tweet_id",
+    "Users": "user_id",
+    "Conversations": ["conversation_id", "tweet_order"],
+    "ConversationsCategory": "conversation_id",
+}
+TABLE_DATES: Dict[str, List[str]] = {
+    "Tweets": ["creation_time"],
+    "Users": ["creation_time", "snapshot_time"],
+}
+
+# The dtypes of every table for each load profile
+LOAD_PROFILES: Dict[str, Dict[str, Dict[str, str]]] = {
+    "default": {
+        "Tweets": DTYPES_TWEETS,
+        "Users": DTYPES_USERS,
+        "Conversations": DTYPES_CONVERSATIONS,
+        "ConversationsCategory": DTYPES_CONVERSATIONS_CATEGORY,
+    },
+    "compact": {
+        "Tweets": DTYPES_TWEETS_COMPACT,
+        "Users": DTYPES_USERS_COMPACT,
+        "Conversations": DTYPES_CONVERSATIONS_COMPACT,
+        "ConversationsCategory": DTYPES_CONVERSATIONS_CATEGORY,
+    },
+    "integer_ids": {
+        "Tweets": DTYPES_TWEETS_INTEGER_IDS,
+        "Users": DTYPES_USERS_INTEGER_IDS,
+        "Conversations": DTYPES_CONVERSATIONS_INTEGER_IDS,
+        "ConversationsCategory": DTYPES_CONVERSATIONS_CATEGORY,
+    },
+    "compact_integer_ids": {
+        "Tweets": DTYPES_TWEETS_COMPACT_INTEGER_IDS,
+        "Users": DTYPES_USERS_COMPACT_INTEGER_IDS,
+        "Conversations": DTYPES_CONVERSATIONS_INTEGER_IDS,
+        "ConversationsCategory": DTYPES_CONVERSATIONS_CATEGORY,
+    },
+}
+
 # Airline specific info
 COMPANY_NAME_TO_ID: Dict[str, str] = {
     "Klm": "56377143",
@@ -80,3 +214,6 @@ COMPANY_NAME_TO_ID: Dict[str, str] = {
 }
 
 COMPANY_ID_TO_NAME: Dict[str, str] = {v: k for k, v in COMPANY_NAME_TO_ID.items()}
+COMPANY_INTEGER_ID_TO_NAME: Dict[int, str] = {
+    int(v): k for k, v in COMPANY_NAME_TO_ID.items()
+}
@@ -0,0 +1,400 @@
+import io
+import os
+import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+from data_extraction_helpers import parse_json_lines, start_cleaning
+from extraction_stats import ExtractionStats
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from parquet_utils import cleaned_tweets_to_tables, get_schemas, parse_timestamps
+
+# This is a file with the Arrow engine of the cleaning (data_extraction.py
+# --engine arrow): a chunk of raw JSON lines is parsed by Arrow into columns,
+# keeping only the fields used by start_cleaning, the cleaned fields are
+# computed on whole columns and converted to the Users and Tweets tables of the
+# Parquet output, without building a dictionary per tweet.
+# It gives the same rows as cleaned_tweets_to_tables(clean_tweets(...)), in the
+# same order. Arrow reads an explicit JSON null like a missing field, while
+# start_cleaning only gives the default to a missing one, so the lines with a
+# null (or an empty object) where start_cleaning has a default are cleaned by
+# start_cleaning instead.
+
+# The cleaned fields, as (sub-record, key), in the order of start_cleaning
+CLEANED_FIELDS: List[Tuple[str, str]] = [
+    ("user", "user_id"),
+    ("user", "verified"),
+    ("user", "followers_count"),
+    ("user", "friends_count"),
+    ("user", "statuses_count"),
+    ("user", "created_at"),
+    ("user", "default_profile"),
+    ("user", "default_profile_image"),
+    ("tweet", "tweet_id"),
+    ("tweet", "text"),
+    ("tweet", "lang"),
+    ("tweet", "creation_time"),
+    ("tweet", "country_code"),
+    ("tweet", "favorite_count"),
+    ("tweet", "retweet_count"),
+    ("tweet", "reply_count"),
+    ("tweet", "possibly_sensitive"),
+    ("tweet", "replied_tweet_id"),
+    ("tweet", "replied_count"),
+    ("tweet", "quoted_status_id"),
+    ("tweet", "quote_count"),
+]
+
+# The fields which start_cleaning reads with a default other than None, with an
+# explicit null, and the objects which start_cleaning skips when they are empty
+EXPLICIT_NULL_PATTERN: str = (
+    r'"(?:user|verified|followers_count|friends_count|statuses_count'
+    r"|default_profile|default_profile_image|text|full_text|lang|favorite_count"
+    r'|retweet_count|reply_count|possibly_sensitive|replied_count|quote_count)"'
+    r'\s*:\s*null|"(?:place|quoted_status|retweeted_status)"\s*:\s*\{\s*\}'
+)
+
+
+def get_raw_schema() -> "pa.Schema":
+    """
+    Returns the Arrow schema of the raw tweet fields used by start_cleaning.
+
+    Returns:
+        pa.Schema: The schema, with the quoted and retweeted tweets as nested structs.
+    """
+    user = pa.struct(
+        [
+            ("id_str", pa.string()),
+            ("verified", pa.bool_()),
+            ("followers_count", pa.int64()),
+            ("friends_count", pa.int64()),
+            ("statuses_count", pa.int64()),
+            ("created_at", pa.string()),
+            ("default_profile", pa.bool_()),
+            ("default_profile_image", pa.bool_()),
+        ]
+    )
+    tweet_fields: List[Tuple[str, pa.DataType]] = [
+        ("id_str", pa.string()),
+        ("text", pa.string()),
+        ("extended_tweet", pa.struct([("full_text", pa.string())])),
+        ("lang", pa.string()),
+        ("created_at", pa.string()),
+        ("place", pa.struct([("country_code", pa.string())])),
+        ("favorite_count", pa.int64()),
+        ("retweet_count", pa.int64()),
+        ("reply_count", pa.int64()),
+        ("possibly_sensitive", pa.bool_()),
+        ("in_reply_to_status_id_str", pa.string()),
+        ("replied_count", pa.int64()),
+        ("quoted_status_id", pa.int64()),
+        ("quote_count", pa.int64()),
+        ("user", user),
+    ]
+    return pa.schema(
+        tweet_fields
+        + [
+            ("quoted_status", pa.struct(tweet_fields)),
+            ("retweeted_status", pa.struct(tweet_fields)),
+        ]
+    )
+
+
+def read_raw_batch(lines: List[Union[str, bytes]]) -> "pa.StructArray":
+    """
+    Parses raw JSON lines into columns, keeping only the fields of get_raw_schema.
+
+    Args:
+        lines (List[Union[str, bytes]]): The JSON lines, one tweet per line.
+
+    Returns:
+        pa.StructArray: The raw tweets, one row per line.
+
+    Raises:
+        pa.ArrowInvalid: If a line is not valid JSON or a field has another type.
+    """
+    data: bytes = b"\n".join(
+        line.encode("utf-8") if isinstance(line, str) else line for line in lines
+    )
+    table: pa.Table = pa_json.read_json(
+        io.BytesIO(data),
+        # A single block, so that no line is longer than the block size
+        read_options=pa_json.ReadOptions(block_size=max(len(data) + 1, 1 << 16)),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=get_raw_schema(), unexpected_field_behavior="ignore"
+        ),
+    )
+    return pa.StructArray.from_arrays(
+        [column.combine_chunks() for column in table.columns],
+        names=table.column_names,
+    )
+
+
+def clean_columns(tweets: "pa.StructArray") -> "pa.Table":
+    """
+    Computes the cleaned fields of raw tweets on whole columns, like start_cleaning.
+
+    A null field is given the default of a missing one, so the tweets must not
+    have explicit nulls (see has_explicit_null).
+
+    Args:
+        tweets (pa.StructArray): The raw tweets.
+
+    Returns:
+        pa.Table: The cleaned tweets, with a '{sub-record}.{key}' column per CLEANED_FIELDS.
+    """
+
+    def field(*path: str) -> pa.Array:
+        array: pa.Array = tweets
+        for name in path:
+            array = pc.struct_field(array, name)
+        return array
+
+    def count(*path: str) -> pa.Array:
+        return pc.fill_null(field(*path), 0)
+
+    def non_negative_count(*path: str) -> pa.Array:
+        return pc.max_element_wise(count(*path), 0)
+
+    def flag(*path: str) -> pa.Array:
+        return pc.cast(pc.fill_null(field(*path), True), pa.int64())
+
+    columns: Dict[str, pa.Array] = {
+        "user.user_id": field("user", "id_str"),
+        "user.verified": pc.fill_null(field("user", "verified"), False),
+        "user.followers_count": non_negative_count("user", "followers_count"),
+        "user.friends_count": non_negative_count("user", "friends_count"),
+        "user.statuses_count": non_negative_count("user", "statuses_count"),
+        "user.created_at": field("user", "created_at"),
+        "user.default_profile": flag("user", "default_profile"),
+        "user.default_profile_image": flag("user", "default_profile_image"),
+        "tweet.tweet_id": field("id_str"),
+        # The full text of the extended tweet if there is one, the text otherwise
+        "tweet.text": pc.coalesce(
+            field("extended_tweet", "full_text"), field("text"), ""
+        ),
+        "tweet.lang": pc.coalesce(field("lang"), "un"),
+        "tweet.creation_time": field("created_at"),
+        "tweet.country_code": pc.if_else(
+            pc.is_valid(field("place")),
+            field("place", "country_code"),
+            pa.scalar("un", pa.string()),
+        ),
+        "tweet.favorite_count": count("favorite_count"),
+        "tweet.retweet_count": count("retweet_count"),
+        "tweet.reply_count": count("reply_count"),
+        "tweet.possibly_sensitive": pc.fill_null(field("possibly_sensitive"), False),
+        "tweet.replied_tweet_id": field("in_reply_to_status_id_str"),
+        "tweet.replied_count": count("replied_count"),
+        "tweet.quoted_status_id": field("quoted_status_id"),
+        "tweet.quote_count": count("quote_count"),
+    }
+    return pa.table(columns)
+
+
+def clean_batch(tweets: "pa.StructArray") -> "pa.Table":
+    """
+    Cleans raw tweets, also extracting the quoted and retweeted tweets they contain.
+
+    The rows are in the order of clean_tweets: for every raw tweet, its quoted
+    tweet, its retweeted tweet, and then the tweet itself.
+
+    Args:
+        tweets (pa.StructArray): The raw tweets.
+
+    Returns:
+        pa.Table: The cleaned tweets (see clean_columns).
+    """
+    n_tweets: int = len(tweets)
+    parts: List[pa.Table] = []
+    rows: List[np.ndarray] = []
+    slots: List[np.ndarray] = []
+    for slot, name in enumerate(["quoted_status", "retweeted_status"]):
+        present: pa.Array = pc.is_valid(pc.struct_field(tweets, name))
+        embedded: pa.StructArray = pc.struct_field(tweets, name).filter(present)
+        parts.append(clean_columns(embedded))
+        rows.append(np.flatnonzero(present.to_numpy(zero_copy_only=False)))
+        slots.append(np.full(len(embedded), slot))
+    parts.append(clean_columns(tweets))
+    rows.append(np.arange(n_tweets))
+    slots.append(np.full(n_tweets, 2))
+
+    order: np.ndarray = np.lexsort((np.concatenate(slots), np.concatenate(rows)))
+    return pa.concat_tables(parts).take(pa.array(order))
+
+
+def cleaned_columns_to_tables(table: "pa.Table") -> Tuple["pa.Table", "pa.Table"]:
+    """
+    Converts cleaned tweets from columns to the tables of the Parquet output,
+    like cleaned_tweets_to_tables does for the dictionaries of start_cleaning.
+
+    Args:
+        table (pa.Table): The cleaned tweets (see clean_columns).
+
+    Returns:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables, with one row per tweet.
+    """
+    schemas: Dict[str, pa.Schema] = get_schemas()
+
+    def column(name: str) -> pa.Array:
+        return table.column(name).combine_chunks()
+
+    users = pa.Table.from_arrays(
+        [
+            column("user.user_id"),
+            column("user.verified"),
+            column("user.followers_count"),
+            column("user.friends_count"),
+            column("user.statuses_count"),
+            parse_timestamps(column("user.created_at")),
+            pc.cast(column("user.default_profile"), pa.bool_()),
+            pc.cast(column("user.default_profile_image"), pa.bool_()),
+        ],
+        schema=schemas["Users"],
+    )
+    tweets = pa.Table.from_arrays(
+        [
+            column("tweet.tweet_id"),
+            column("user.user_id"),
+            column("tweet.text"),
+            column("tweet.lang"),
+            parse_timestamps(column("tweet.creation_time")),
+            column("tweet.country_code"),
+            column("tweet.favorite_count"),
+            column("tweet.retweet_count"),
+            column("tweet.possibly_sensitive"),
+            column("tweet.replied_tweet_id"),
+            column("tweet.reply_count"),
+            pc.cast(column("tweet.quoted_status_id"), pa.string()),
+            column("tweet.quote_count"),
+        ],
+        schema=schemas["Tweets"],
+    )
+    return users, tweets
+
+
+def has_explicit_null(lines: List[Union[str, bytes]]) -> np.ndarray:
+    """
+    Checks which raw JSON lines have a null or an empty object which
+    start_cleaning does not clean like a missing field (see EXPLICIT_NULL_PATTERN).
+
+    The pattern is matched by Arrow on all the lines at once, which is a few
+    times faster than a Python regex search per line.
+
+    Args:
+        lines (List[Union[str, bytes]]): The JSON lines.
+
+    Returns:
+        np.ndarray: A boolean array, True for the lines which must be cleaned
+            by start_cleaning.
+    """
+    return pc.match_substring_regex(pa.array(lines), EXPLICIT_NULL_PATTERN).to_numpy(
+        zero_copy_only=False
+    )
+
+
+def clean_lines_one_by_one(
+    lines: List[Union[str, bytes]], stats: ExtractionStats
+) -> Tuple["pa.Table", "pa.Table"]:
+    """
+    Cleans raw JSON lines one at a time with start_cleaning, like clean_tweets.
+
+    Args:
+        lines (List[Union[str, bytes]]): The JSON lines, one tweet per line.
+        stats (ExtractionStats): The statistics of the extraction.
+
+    Returns:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables of the cleaned tweets.
+    """
+    cleaned: List[Dict[str, Dict[str, Any]]] = []
+    for tweet in parse_json_lines(lines, stats):
+        cleaning: float = time.perf_counter()
+        for embedded in ("quoted_status", "retweeted_status"):
+            if embedded_tweet := tweet.get(embedded):
+                cleaned.append(start_cleaning(embedded_tweet))
+                stats.count("embedded")
+        cleaned.append(start_cleaning(tweet))
+        stats.add_time("clean", time.perf_counter() - cleaning)
+    return cleaned_tweets_to_tables(cleaned)
+
+
+def clean_lines_on_columns(
+    lines: List[Union[str, bytes]], stats: ExtractionStats
+) -> Tuple["pa.Table", "pa.Table"]:
+    """
+    Cleans raw JSON lines on columns, or with start_cleaning if Arrow can not
+    parse them (e.g. a field with an unexpected type).
+
+    Args:
+        lines (List[Union[str, bytes]]): The JSON lines, without explicit nulls
+            (see has_explicit_null).
+        stats (ExtractionStats): The statistics of the extraction.
+
+    Returns:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables of the cleaned tweets.
+    """
+    parsing: float = time.perf_counter()
+    try:
+        raw_tweets: pa.StructArray = read_raw_batch(lines)
+    except pa.ArrowInvalid:
+        stats.add_time("parse", time.perf_counter() - parsing)
+        return clean_lines_one_by_one(lines, stats)
+
+    cleaning: float = time.perf_counter()
+    stats.add_time("parse", cleaning - parsing)
+    stats.count("parsed", len(raw_tweets))
+    users, tweets = cleaned_columns_to_tables(clean_batch(raw_tweets))
+    stats.count("embedded", len(tweets) - len(raw_tweets))
+    stats.add_time("clean", time.perf_counter() - cleaning)
+    return users, tweets
+
+
+def clean_lines_to_tables(
+    lines: Iterable[Union[str, bytes]],
+    batch_size: int = 10_000,
+    stats: Optional[ExtractionStats] = None,
+) -> Iterator[Tuple["pa.Table", "pa.Table"]]:
+    """
+    Lazily cleans raw JSON lines in batches, yielding the same rows as
+    cleaned_tweets_to_tables(clean_tweets(parse_json_lines(lines))).
+
+    The lines with an explicit null (see has_explicit_null), and the batches
+    which Arrow can not parse, are cleaned by start_cleaning instead.
+
+    Args:
+        lines (Iterable[Union[str, bytes]]): The raw JSON lines, e.g. from iterate_json_lines.
+        batch_size (int, optional): The number of lines per batch. Defaults to 10_000.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            parsed and embedded tweets and the parse/clean times. Defaults to None.
+
+    Yields:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables of a batch,
+            with the same number of rows.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    lines = iter(lines)
+    while batch := list(islice(lines, batch_size)):
+        # The lines between two lines with an explicit null are cleaned on columns
+        parts: List[Tuple[pa.Table, pa.Table]] = []
+        start: int = 0
+        for i in np.flatnonzero(has_explicit_null(batch)):
+            if start < i:
+                parts.append(clean_lines_on_columns(batch[start:i], stats))
+            parts.append(clean_lines_one_by_one([batch[i]], stats))
+            start = i + 1
+        if start < len(batch):
+            parts.append(clean_lines_on_columns(batch[start:], stats))
+        users, tweets = zip(*parts)
+        yield pa.concat_tables(users), pa.concat_tables(tweets)
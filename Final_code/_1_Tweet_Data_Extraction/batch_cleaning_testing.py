@@ -0,0 +1,273 @@
+import json
+import os
+import sys
+import tempfile
+
+import data_extraction
+import pyarrow as pa
+import pyarrow.parquet as pq
+from batch_cleaning import clean_lines_to_tables
+from data_extraction import clean_tweets
+from data_extraction_helpers import start_cleaning
+from extraction_stats import REJECTION_REASONS, ExtractionStats
+from tweet_id_index import TweetIdIndex
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "_0_Constants_and_Utils"
+    )
+)
+
+from parquet_utils import (
+    ParquetTweetWriter,
+    cleaned_tweets_to_tables,
+    read_cleaned_table,
+    remove_parts,
+)
+
+# Checks that the batch cleaning gives the same tables as start_cleaning.
+
+
+def clean_to_tables(lines, batch_size=10_000):
+    batches = list(clean_lines_to_tables(lines, batch_size))
+    return tuple(pa.concat_tables([batch[i] for batch in batches]) for i in range(2))
+
+
+def raw_tweet(tweet_id, **fields):
+    tweet = {
+        "created_at": "Wed Oct 10 20:19:24 +0000 2018",
+        "id": int(tweet_id),
+        "id_str": tweet_id,
+        "text": f"@Lufthansa tweet {tweet_id}",
+        "lang": "en",
+        "user": {
+            "id_str": "100",
+            "screen_name": "flyer",
+            "verified": False,
+            "followers_count": 10,
+            "friends_count": 20,
+            "statuses_count": 30,
+            "created_at": "Mon Jan 02 10:00:00 +0000 2012",
+            "default_profile": False,
+            "default_profile_image": True,
+        },
+        "favorite_count": 1,
+        "retweet_count": 2,
+        "reply_count": 3,
+        "quote_count": 4,
+        "entities": {"hashtags": [], "user_mentions": []},
+    }
+    tweet.update(fields)
+    return tweet
+
+
+test_cases = [
+    {
+        "name": "1. Simple tweet",
+        "tweets": [raw_tweet("1")],
+    },
+    {
+        "name": "2. Missing fields use the defaults",
+        "tweets": [
+            {"id_str": "2", "user": {"id_str": "200"}},
+            {"id_str": "3"},
+            {},
+        ],
+    },
+    {
+        "name": "3. Negative user counts are clamped to 0",
+        "tweets": [
+            raw_tweet(
+                "4",
+                user={
+                    "id_str": "400",
+                    "followers_count": -1,
+                    "friends_count": -5,
+                    "statuses_count": 0,
+                },
+            )
+        ],
+    },
+    {
+        "name": "4. Extended tweet with and without full text",
+        "tweets": [
+            raw_tweet("5", extended_tweet={"full_text": "the long version"}),
+            raw_tweet("6", extended_tweet={"display_text_range": [0, 10]}),
+            raw_tweet("7", extended_tweet=None),
+            {"id_str": "8", "extended_tweet": {"full_text": "no text"}},
+        ],
+    },
+    {
+        "name": "5. Place with and without country code",
+        "tweets": [
+            raw_tweet("9", place={"country_code": "DE", "full_name": "Berlin"}),
+            raw_tweet("10", place={"full_name": "Nowhere"}),
+            raw_tweet("11", place=None),
+        ],
+    },
+    {
+        "name": "6. Replies, quotes and sensitive tweets",
+        "tweets": [
+            raw_tweet("12", in_reply_to_status_id_str="11", possibly_sensitive=True),
+            raw_tweet("13", quoted_status_id=12, replied_count=7),
+        ],
+    },
+    {
+        "name": "7. Quoted and retweeted tweets are extracted in order",
+        "tweets": [
+            raw_tweet("14", quoted_status=raw_tweet("15", lang="de")),
+            raw_tweet("16", retweeted_status=raw_tweet("17", text="original")),
+            raw_tweet(
+                "18",
+                quoted_status=raw_tweet("19"),
+                retweeted_status=raw_tweet(
+                    "20", quoted_status=raw_tweet("21"), place={"country_code": "NL"}
+                ),
+            ),
+            raw_tweet("22", quoted_status=None, retweeted_status=None),
+        ],
+    },
+    {
+        "name": "8. Unicode text",
+        "tweets": [raw_tweet("23", text="Flug verspätet 😡   ok")],
+    },
+    {
+        "name": "9. Explicit nulls are kept, only missing fields use the defaults",
+        "tweets": [
+            raw_tweet(
+                "24",
+                lang=None,
+                possibly_sensitive=None,
+                favorite_count=None,
+                retweet_count=None,
+                reply_count=None,
+                replied_count=None,
+                quote_count=None,
+                in_reply_to_status_id_str=None,
+                quoted_status_id=None,
+            ),
+            raw_tweet("25", text=None),
+            raw_tweet("26", extended_tweet={"full_text": None}),
+            raw_tweet(
+                "27",
+                user={"id_str": None, "verified": None, "created_at": None},
+            ),
+            raw_tweet("28", place={"country_code": None}),
+            raw_tweet("29"),
+            raw_tweet("30", retweeted_status=raw_tweet("31", possibly_sensitive=None)),
+            raw_tweet("32", possibly_sensitive=True),
+        ],
+    },
+    {
+        "name": "10. Empty place and embedded tweets",
+        "tweets": [
+            raw_tweet("33", place={}),
+            raw_tweet("34", quoted_status={}, retweeted_status={}),
+            raw_tweet("35", user={}),
+        ],
+    },
+]
+
+for test_case in test_cases:
+    print(f"Starting: {test_case['name']}")
+    expected = cleaned_tweets_to_tables(list(clean_tweets(test_case["tweets"])))
+    lines = [json.dumps(tweet) for tweet in test_case["tweets"]]
+    for batch_size in (1, 2, 100):
+        result = clean_to_tables(lines, batch_size)
+        for name, result_table, expected_table in zip(
+            ("Users", "Tweets"), result, expected
+        ):
+            assert result_table.equals(
+                expected_table, check_metadata=True
+            ), f"'{test_case['name']}' failed with batches of {batch_size}: expected {expected_table.to_pylist()} in {name}, got {result_table.to_pylist()}"
+    print(f"'{test_case['name']}' passed.")
+    print()
+
+print("Starting: 11. Batches with unexpected types use start_cleaning")
+tweets = [raw_tweet("36"), raw_tweet("37", quoted_status_id="not a number")]
+lines = [json.dumps(tweet) for tweet in tweets]
+assert clean_to_tables(lines) == cleaned_tweets_to_tables(
+    [start_cleaning(tweet) for tweet in tweets]
+), "'11. Batches with unexpected types use start_cleaning' failed"
+print("'11. Batches with unexpected types use start_cleaning' passed.")
+print()
+
+print("Starting: 12. Explicit nulls rejected by start_cleaning are rejected too")
+for user in [{"followers_count": None}, {"default_profile": None}]:
+    line = json.dumps(raw_tweet("38", user=user))
+    for clean in (
+        lambda: list(clean_tweets([json.loads(line)])),
+        lambda: clean_to_tables([line]),
+    ):
+        try:
+            clean()
+        except TypeError:
+            continue
+        raise AssertionError(
+            f"'12. Explicit nulls rejected by start_cleaning are rejected too' failed for {user}: expected a TypeError"
+        )
+print("'12. Explicit nulls rejected by start_cleaning are rejected too' passed.")
+print()
+
+print("Starting: 13. The Arrow engine rejects the same tweets as the dict engine")
+tweets = [
+    raw_tweet("39"),
+    {"user": {"id_str": "100"}},
+    raw_tweet("39", text="duplicate"),
+    raw_tweet("40", user={"id_str": "400", "followers_count": -1}),
+    raw_tweet("41", user={"id_str": None}),
+    raw_tweet("41", text="valid after an invalid user"),
+    raw_tweet("41", text="duplicate after an invalid user"),
+    raw_tweet("42", quoted_status=raw_tweet("39"), retweeted_status=raw_tweet("43")),
+    raw_tweet("44"),
+]
+lines = [json.dumps(tweet) for tweet in tweets]
+outputs = {}
+for engine in ("dict", "arrow"):
+    data_extraction.all_tweet_id = TweetIdIndex()
+    data_extraction.all_tweet_id.add("44")
+    data_extraction.extraction_stats = ExtractionStats()
+    data_extraction.extraction_stats.start_file("tweets.json")
+    with tempfile.TemporaryDirectory() as folder:
+        if engine == "dict":
+            ids = data_extraction.append_to_parquet(clean_tweets(tweets), folder)
+        else:
+            ids = (
+                data_extraction.append_tables_to_parquet(
+                    clean_lines_to_tables(lines, 3), folder
+                )
+                .astype(str)
+                .tolist()
+            )
+        totals = data_extraction.extraction_stats.totals()
+        outputs[engine] = (
+            ids,
+            {key: totals[key] for key in REJECTION_REASONS + ["written"]},
+            pq.read_table(os.path.join(folder, "Tweets")).to_pylist(),
+        )
+assert (
+    outputs["arrow"] == outputs["dict"]
+), f"'13. The Arrow engine rejects the same tweets as the dict engine' failed: expected {outputs['dict']}, got {outputs['arrow']}"
+print("'13. The Arrow engine rejects the same tweets as the dict engine' passed.")
+print()
+
+print("Starting: 14. Parts left by an interrupted writer are not read and are removed")
+with tempfile.TemporaryDirectory() as folder:
+    with ParquetTweetWriter(folder) as writer:
+        writer.write_tables(*clean_to_tables(lines[:1]))
+    # A writer killed before it was closed
+    interrupted = ParquetTweetWriter(folder)
+    interrupted.write_tables(*clean_to_tables(lines[1:]))
+    for table in ("Users", "Tweets"):
+        assert (
+            len(read_cleaned_table(folder, table)) == 1
+        ), f"'14. Parts left by an interrupted writer are not read and are removed' failed: the temporary part of {table} was read"
+    remove_parts(folder, 1)
+    files = sorted(os.listdir(os.path.join(folder, "Tweets")))
+    assert files == [
+        "part-00000.parquet"
+    ], f"'14. Parts left by an interrupted writer are not read and are removed' failed: expected only the first part, got {files}"
+print("'14. Parts left by an interrupted writer are not read and are removed' passed.")
+print()
+
+print("All tests passed!")
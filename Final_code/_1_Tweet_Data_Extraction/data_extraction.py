@@ -1,10 +1,35 @@
-import json
+import argparse
+import math
 import os
+import shutil
 import sys
-from typing import Any, Dict, List, Set
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from data_extraction_helpers import delete_existing_file, read_from_file, start_cleaning
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from batch_cleaning import clean_lines_to_tables
+from data_extraction_helpers import (
+    delete_existing_file,
+    find_line_ranges,
+    is_compressed,
+    iterate_json_lines,
+    iterate_json_lines_from_range,
+    parse_json_lines,
+    start_cleaning,
+)
+from extraction_manifest import (
+    file_fingerprint,
+    is_processed,
+    load_manifest,
+    new_manifest,
+    save_manifest,
+)
+from extraction_stats import ExtractionStats
 from tqdm.auto import tqdm
+from tweet_id_index import TweetIdIndex, ids_to_array
 
 sys.path.append(
     os.path.join(
@@ -13,26 +38,292 @@ sys.path.append(
     )
 )
 
-from defined_paths import folder_path_processed, path_processed_tweets_json
+from defined_paths import (
+    folder_path_processed,
+    path_extraction_manifest,
+    path_extraction_report,
+    path_extraction_tweet_ids,
+    path_processed_tweets_json,
+    path_processed_tweets_parquet,
+)
+from json_codec import dumps, loads
+from parquet_utils import (
+    ParquetTweetWriter,
+    iterate_parts,
+    list_parts,
+    read_cleaned_table,
+    remove_parts,
+)
+
+# IDs of all the tweets that were already written to the output file
+all_tweet_id: TweetIdIndex = TweetIdIndex()
+# Rejection counters and stage timings of the files extracted by this process
+extraction_stats: ExtractionStats = ExtractionStats()
+
+OUTPUT_FORMATS: List[str] = ["json", "parquet"]
+# "dict" cleans one tweet at a time with start_cleaning, "arrow" cleans batches
+# of tweets on columns and writes them to the Parquet output without building
+# a dictionary per tweet (see batch_cleaning.py)
+ENGINES: List[str] = ["dict", "arrow"]
+
+# A byte range of a raw file: (path, start, end)
+FilePiece = Tuple[str, int, int]
+
+PROGRESS_BAR_FORMAT: str = (
+    "Processing files: {n_fmt}/{total_fmt} ({percentage:.0f}%) "
+    "[Elapsed: {elapsed}, Remaining: {remaining}, {rate_fmt}]"
+)
 
 
-def append_to_file(tweets_list: List[Dict[str, Any]], output_file_path: str) -> None:
+def append_to_file(
+    tweets_list: Iterable[Dict[str, Any]], output_file_path: str
+) -> List[str]:
     """
-    Appends a list of tweet dictionaries to a file in JSON format.
+    Appends tweet dictionaries to a file in JSON format.
+
+    The tweets are written one at a time, so they can be given lazily by a generator.
 
     Args:
-        tweets_list (List[Dict[str, Any]]): The list of tweet dictionaries to append to the file.
+        tweets_list (Iterable[Dict[str, Any]]): The tweet dictionaries to append to the file.
         output_file_path (str): The path to the output file.
 
     Returns:
-        None
+        List[str]: The IDs of the written tweets, in the order they were written.
     """
+    written_ids: List[str] = []
     with open(output_file_path, "a", encoding="utf-8") as file:
         for tweet in tweets_list:
-            if not valid_tweet(tweet):
-                continue
-            file.write(json.dumps(tweet) + ",\n")
-            all_tweet_id.add(tweet["tweet"]["tweet_id"])
+            writing: float = time.perf_counter()
+            if reason := rejection_reason(tweet):
+                extraction_stats.count(reason)
+            else:
+                file.write(dumps(tweet) + ",\n")
+                all_tweet_id.add(tweet["tweet"]["tweet_id"])
+                written_ids.append(tweet["tweet"]["tweet_id"])
+                extraction_stats.count("written")
+            extraction_stats.add_time("write", time.perf_counter() - writing)
+    return written_ids
+
+
+def append_to_parquet(
+    tweets_list: Iterable[Dict[str, Any]], dataset_path: str
+) -> List[str]:
+    """
+    Appends tweet dictionaries to a Parquet dataset, as a new part.
+
+    The users and tweets are written to typed and compressed row groups, and
+    their 'created_at' timestamps are parsed, so the later stages do not have to.
+
+    Args:
+        tweets_list (Iterable[Dict[str, Any]]): The tweet dictionaries to append to the dataset.
+        dataset_path (str): The path to the Parquet dataset folder.
+
+    Returns:
+        List[str]: The IDs of the written tweets, in the order they were written.
+    """
+    written_ids: List[str] = []
+    with ParquetTweetWriter(dataset_path) as writer:
+        for tweet in tweets_list:
+            writing: float = time.perf_counter()
+            if reason := rejection_reason(tweet):
+                extraction_stats.count(reason)
+            else:
+                writer.write(tweet)
+                all_tweet_id.add(tweet["tweet"]["tweet_id"])
+                written_ids.append(tweet["tweet"]["tweet_id"])
+                extraction_stats.count("written")
+            extraction_stats.add_time("write", time.perf_counter() - writing)
+    return written_ids
+
+
+def written_mask(users: "pa.Table", tweets: "pa.Table") -> np.ndarray:
+    """
+    Selects the cleaned tweets of a batch which can be written to the output,
+    like rejection_reason applied to every tweet in order, and counts the
+    rejected ones.
+
+    Args:
+        users (pa.Table): The Users table of the batch.
+        tweets (pa.Table): The Tweets table of the batch, with the same number of rows.
+
+    Returns:
+        np.ndarray: A boolean array, True for the tweets to write.
+    """
+    n_tweets: int = len(tweets)
+    tweet_ids: pa.ChunkedArray = tweets.column("tweet_id")
+    has_id: np.ndarray = pc.fill_null(pc.not_equal(tweet_ids, ""), False).to_numpy()
+    ids: np.ndarray = np.zeros(n_tweets, dtype=np.uint64)
+    ids[has_id] = pc.cast(tweet_ids.filter(has_id), pa.uint64()).to_numpy()
+    user_ids: pa.ChunkedArray = users.column("user_id")
+    valid_user: np.ndarray = pc.fill_null(
+        pc.and_(
+            pc.not_equal(user_ids, ""),
+            pc.greater_equal(
+                pc.min_element_wise(
+                    users.column("followers_count"),
+                    users.column("friends_count"),
+                    users.column("statuses_count"),
+                ),
+                0,
+            ),
+        ),
+        False,
+    ).to_numpy()
+
+    written_before: np.ndarray = has_id & all_tweet_id.contains_many(ids)
+    candidate: np.ndarray = has_id & ~written_before
+    # The first valid tweet of every ID is written, the later ones are duplicates
+    valid_rows: np.ndarray = np.flatnonzero(candidate & valid_user)
+    unique_ids, first = np.unique(ids[valid_rows], return_index=True)
+    first_written: np.ndarray = np.full(n_tweets, n_tweets)
+    position: np.ndarray = np.minimum(
+        np.searchsorted(unique_ids, ids), max(len(unique_ids) - 1, 0)
+    )
+    if len(unique_ids):
+        matched: np.ndarray = unique_ids[position] == ids
+        first_written[matched] = valid_rows[first][position[matched]]
+    written: np.ndarray = candidate & (first_written == np.arange(n_tweets))
+    duplicate: np.ndarray = written_before | (
+        candidate & (first_written < np.arange(n_tweets))
+    )
+
+    extraction_stats.count("no_tweet_id", int(np.count_nonzero(~has_id)))
+    extraction_stats.count("duplicate", int(np.count_nonzero(duplicate)))
+    extraction_stats.count(
+        "invalid_user", int(np.count_nonzero(candidate & ~written & ~duplicate))
+    )
+    return written
+
+
+def append_tables_to_parquet(
+    batches: Iterable[Tuple["pa.Table", "pa.Table"]], dataset_path: str
+) -> np.ndarray:
+    """
+    Appends batches of cleaned users and tweets to a Parquet dataset, as a new
+    part, skipping the rejected tweets like append_to_parquet.
+
+    Args:
+        batches (Iterable[Tuple[pa.Table, pa.Table]]): The Users and Tweets
+            tables of the batches, e.g. from read_and_clean_tables.
+        dataset_path (str): The path to the Parquet dataset folder.
+
+    Returns:
+        np.ndarray: The IDs of the written tweets (as uint64), in the order
+            they were written.
+    """
+    written_ids: List[np.ndarray] = []
+    with ParquetTweetWriter(dataset_path) as writer:
+        for users, tweets in batches:
+            writing: float = time.perf_counter()
+            written: np.ndarray = written_mask(users, tweets)
+            tweets = tweets.filter(written)
+            writer.write_tables(users.filter(written), tweets)
+            ids: np.ndarray = pc.cast(tweets.column("tweet_id"), pa.uint64()).to_numpy()
+            all_tweet_id.update(ids)
+            written_ids.append(ids)
+            extraction_stats.count("written", len(ids))
+            extraction_stats.add_time("write", time.perf_counter() - writing)
+    return np.concatenate(written_ids) if written_ids else np.empty(0, np.uint64)
+
+
+def append_to_output(
+    tweets_list: Iterable[Dict[str, Any]], output_path: str, output_format: str
+) -> List[str]:
+    """
+    Appends tweet dictionaries to the output in the given format.
+
+    Args:
+        tweets_list (Iterable[Dict[str, Any]]): The tweet dictionaries to append.
+        output_path (str): The path to the output file or dataset folder.
+        output_format (str): The output format, one of OUTPUT_FORMATS.
+
+    Returns:
+        List[str]: The IDs of the written tweets, in the order they were written.
+    """
+    if output_format == "parquet":
+        return append_to_parquet(tweets_list, output_path)
+    return append_to_file(tweets_list, output_path)
+
+
+def remove_output(output_path: str, output_format: str) -> None:
+    """
+    Silently deletes an output file or dataset folder if it exists, e.g. the
+    temporary output of a shard.
+
+    Args:
+        output_path (str): The path to the output file or dataset folder.
+        output_format (str): The output format, one of OUTPUT_FORMATS.
+
+    Returns:
+        None
+    """
+    if output_format == "parquet":
+        shutil.rmtree(output_path, ignore_errors=True)
+    elif os.path.exists(output_path):
+        os.remove(output_path)
+
+
+def delete_output(output_path: str, output_format: str) -> None:
+    """
+    Deletes the output file or dataset folder if it exists, when the
+    extraction starts from scratch.
+
+    Args:
+        output_path (str): The path to the output file or dataset folder.
+        output_format (str): The output format, one of OUTPUT_FORMATS.
+
+    Returns:
+        None
+    """
+    if output_format == "parquet":
+        if os.path.exists(output_path):
+            shutil.rmtree(output_path)
+    else:
+        delete_existing_file(output_path)
+
+
+def get_output_size(output_path: str, output_format: str) -> int:
+    """
+    Returns the size of the output, used to truncate it back to a checkpoint.
+
+    Args:
+        output_path (str): The path to the output file or dataset folder.
+        output_format (str): The output format, one of OUTPUT_FORMATS.
+
+    Returns:
+        int: The size of the output file in bytes, or the number of parts of the dataset.
+    """
+    if output_format == "parquet":
+        return len(list_parts(output_path))
+    return os.path.getsize(output_path) if os.path.exists(output_path) else 0
+
+
+def rejection_reason(tweet: Dict[str, Any]) -> Optional[str]:
+    """
+    Returns the reason why a tweet can not be written to the output.
+
+    Args:
+        tweet (Dict[str, Any]): A dictionary containing tweet and user information.
+
+    Returns:
+        Optional[str]: One of the REJECTION_REASONS of extraction_stats,
+            or None if the tweet is valid.
+    """
+    if not tweet["tweet"]["tweet_id"]:
+        return "no_tweet_id"
+    if tweet["tweet"]["tweet_id"] in all_tweet_id:
+        return "duplicate"
+    if (
+        not tweet["user"]["user_id"]
+        or min(
+            tweet["user"]["followers_count"],
+            tweet["user"]["friends_count"],
+            tweet["user"]["statuses_count"],
+        )
+        < 0
+    ):
+        return "invalid_user"
+    return None
 
 
 def valid_tweet(tweet: Dict[str, Any]) -> bool:
@@ -45,69 +336,541 @@ def valid_tweet(tweet: Dict[str, Any]) -> bool:
     Returns:
         bool: True if the tweet is valid, False otherwise.
     """
-    return all(
-        [
-            tweet["tweet"]["tweet_id"],
-            tweet["tweet"]["tweet_id"] not in all_tweet_id,
-            tweet["user"]["user_id"],
-            tweet["user"]["followers_count"] >= 0,
-            tweet["user"]["friends_count"] >= 0,
-            tweet["user"]["statuses_count"] >= 0,
-        ]
+    return rejection_reason(tweet) is None
+
+
+def clean_tweets(
+    tweets: Iterable[Dict[str, Any]],
+) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """
+    Lazily cleans raw tweets, also extracting the quoted and retweeted tweets they contain.
+
+    Args:
+        tweets (Iterable[Dict[str, Any]]): The raw tweets read from a file.
+
+    Yields:
+        Dict[str, Dict[str, Any]]: The cleaned tweets.
+    """
+    for tweet in tweets:
+        cleaning: float = time.perf_counter()
+        cleaned: List[Dict[str, Dict[str, Any]]] = []
+        if quote := tweet.get("quoted_status"):
+            cleaned.append(start_cleaning(quote))
+        if original_tweet := tweet.get("retweeted_status"):
+            cleaned.append(start_cleaning(original_tweet))
+        cleaned.append(start_cleaning(tweet))
+        extraction_stats.add_time("clean", time.perf_counter() - cleaning)
+        extraction_stats.count("embedded", len(cleaned) - 1)
+        yield from cleaned
+
+
+def read_and_clean(
+    file_path: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """
+    Lazily reads and cleans the tweets of a raw file, or of a byte range of it.
+
+    Args:
+        file_path (str): The path to the raw file.
+        start (Optional[int], optional): The offset of the first byte of the range.
+            Defaults to None, which reads the whole file.
+        end (Optional[int], optional): The offset after the last byte of the range.
+            Defaults to None.
+
+    Yields:
+        Dict[str, Dict[str, Any]]: The cleaned tweets.
+    """
+    if start is None or is_compressed(file_path):
+        lines: Iterator = iterate_json_lines(file_path, extraction_stats)
+    else:
+        lines = iterate_json_lines_from_range(file_path, start, end, extraction_stats)
+    return clean_tweets(parse_json_lines(lines, extraction_stats))
+
+
+def read_and_clean_tables(
+    file_path: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> Iterator[Tuple["pa.Table", "pa.Table"]]:
+    """
+    Lazily reads and cleans the tweets of a raw file, or of a byte range of it,
+    in batches cleaned on columns (see batch_cleaning.clean_lines_to_tables).
+
+    Args:
+        file_path (str): The path to the raw file.
+        start (Optional[int], optional): The offset of the first byte of the range.
+            Defaults to None, which reads the whole file.
+        end (Optional[int], optional): The offset after the last byte of the range.
+            Defaults to None.
+
+    Yields:
+        Tuple[pa.Table, pa.Table]: The Users and Tweets tables of a batch.
+    """
+    if start is None or is_compressed(file_path):
+        lines: Iterator = iterate_json_lines(file_path, extraction_stats)
+    else:
+        lines = iterate_json_lines_from_range(file_path, start, end, extraction_stats)
+    return clean_lines_to_tables(lines, stats=extraction_stats)
+
+
+def extract_file(
+    file_path: str,
+    output_path: str,
+    output_format: str = "json",
+    engine: str = "dict",
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Extracts and cleans the tweets of a raw file, or of a byte range of it,
+    and appends them to the output.
+
+    Args:
+        file_path (str): The path to the raw file.
+        output_path (str): The path to the output file or dataset folder.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+        engine (str, optional): The cleaning engine, one of ENGINES. "arrow"
+            requires the Parquet output. Defaults to "dict".
+        start (Optional[int], optional): The offset of the first byte of the range.
+            Defaults to None, which reads the whole file.
+        end (Optional[int], optional): The offset after the last byte of the range.
+            Defaults to None.
+
+    Returns:
+        np.ndarray: The IDs of the written tweets (as uint64), in the order
+            they were written.
+    """
+    if engine == "arrow":
+        return append_tables_to_parquet(
+            read_and_clean_tables(file_path, start, end), output_path
+        )
+    return ids_to_array(
+        append_to_output(
+            read_and_clean(file_path, start, end), output_path, output_format
+        )
     )
 
 
-def start_general_extraction() -> None:
+def split_large_files(file_paths: List[str], target_size: float) -> List[FilePiece]:
+    """
+    Splits the uncompressed files larger than the target size into line-aligned byte ranges.
+
+    Compressed files can not be read from an offset, so they are kept whole.
+
+    Args:
+        file_paths (List[str]): The paths of the files to split.
+        target_size (float): The size in bytes above which a file is split.
+
+    Returns:
+        List[FilePiece]: The pieces of the files, in order.
+    """
+    pieces: List[FilePiece] = []
+    for path in file_paths:
+        size: int = os.path.getsize(path)
+        if is_compressed(path) or size <= target_size:
+            pieces.append((path, 0, size))
+            continue
+        pieces.extend(
+            (path, start, end)
+            for start, end in find_line_ranges(path, math.ceil(size / target_size))
+        )
+    return pieces
+
+
+def split_into_shards(file_paths: List[str], n_shards: int) -> List[List[FilePiece]]:
+    """
+    Splits the files into contiguous shards of roughly equal size in bytes.
+
+    Files larger than a shard are split into byte ranges aligned to lines,
+    so that a single large file is also extracted by several workers.
+
+    The shards keep the order of the given files, so that concatenating the
+    shard outputs gives the same order as processing the files one by one.
+
+    Args:
+        file_paths (List[str]): The paths of the files to split.
+        n_shards (int): The maximum number of shards.
+
+    Returns:
+        List[List[FilePiece]]: A list of non-empty shards.
+    """
+    target_size: float = sum(map(os.path.getsize, file_paths)) / max(n_shards, 1)
+    shards: List[List[FilePiece]] = [[]]
+    shard_size: int = 0
+    for piece in split_large_files(file_paths, target_size):
+        size: int = piece[2] - piece[1]
+        if (
+            shards[-1]
+            and shard_size + size / 2 > target_size
+            and len(shards) < n_shards
+        ):
+            shards.append([])
+            shard_size = 0
+        shards[-1].append(piece)
+        shard_size += size
+    return [shard for shard in shards if shard]
+
+
+def completed_files(shard: List[FilePiece]) -> List[str]:
+    """
+    Returns the files whose last piece is in the shard.
+
+    Since the shards are merged in order, these files are completely
+    extracted once the shard is merged.
+
+    Args:
+        shard (List[FilePiece]): The pieces of the shard.
+
+    Returns:
+        List[str]: The paths of the completed files.
+    """
+    return [path for path, _, end in shard if end == os.path.getsize(path)]
+
+
+def extract_shard(
+    shard: List[FilePiece],
+    shard_output_path: str,
+    output_format: str = "json",
+    engine: str = "dict",
+) -> Tuple[str, np.ndarray, ExtractionStats]:
+    """
+    Extracts and cleans all the tweets from a shard of raw files.
+
+    Runs in a worker process. Duplicates are only removed within the shard,
+    the duplicates across shards are removed by merge_shard_output.
+
+    Args:
+        shard (List[FilePiece]): The pieces of the raw files of the shard.
+        shard_output_path (str): The path to the output file of the shard.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+        engine (str, optional): The cleaning engine, one of ENGINES. Defaults to "dict".
+
+    Returns:
+        Tuple[str, np.ndarray, ExtractionStats]: The path to the shard output,
+            the IDs of the tweets written to it (as uint64), in the order they
+            were written, and the statistics of the shard.
+    """
+    all_tweet_id.clear()
+    extraction_stats.clear()
+    remove_output(shard_output_path, output_format)
+    written_ids: List[np.ndarray] = [np.empty(0, np.uint64)]
+    for file_path, start, end in shard:
+        extraction_stats.start_file(file_path)
+        extraction_stats.count("bytes", end - start)
+        written_ids.append(
+            extract_file(
+                file_path, shard_output_path, output_format, engine, start, end
+            )
+        )
+    return shard_output_path, np.concatenate(written_ids), extraction_stats
+
+
+def merge_shard_output(
+    shard_output_path: str,
+    tweet_ids: np.ndarray,
+    shard_stats: ExtractionStats,
+    output_file_path: str,
+    output_format: str = "json",
+) -> None:
+    """
+    Appends a shard output to the output file, skipping duplicate tweets.
+
+    Args:
+        shard_output_path (str): The path to the output file of the shard.
+        tweet_ids (np.ndarray): The IDs of the tweets of the shard output.
+        shard_stats (ExtractionStats): The statistics of the shard, which are
+            corrected for the duplicates and added to extraction_stats.
+        output_file_path (str): The path to the output file.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+
+    Returns:
+        None
+    """
+    merging: float = time.perf_counter()
+    # The tweets of a shard are unique, only the previous shards are checked
+    is_new: np.ndarray = ~all_tweet_id.contains_many(tweet_ids)
+    if output_format == "parquet":
+        # The parts of the shard are merged into a single part of the output
+        start: int = 0
+        with ParquetTweetWriter(output_file_path) as writer:
+            for users, tweets in iterate_parts(shard_output_path):
+                mask: np.ndarray = is_new[start : start + len(tweets)]
+                writer.write_tables(users.filter(mask), tweets.filter(mask))
+                start += len(tweets)
+    else:
+        with open(output_file_path, "a", encoding="utf-8") as output_file:
+            with open(shard_output_path, "r", encoding="utf-8") as shard_file:
+                for line, new in zip(shard_file, is_new):
+                    if new:
+                        output_file.write(line)
+    all_tweet_id.update(tweet_ids[is_new])
+    remove_output(shard_output_path, output_format)
+
+    # The tweets of the shard output are grouped by file, in the order of the files
+    start = 0
+    merge_seconds: float = time.perf_counter() - merging
+    for counter in shard_stats.files.values():
+        written: int = counter["written"]
+        duplicates: int = written - int(
+            np.count_nonzero(is_new[start : start + written])
+        )
+        counter["written"] -= duplicates
+        counter["duplicate"] += duplicates
+        if len(tweet_ids):
+            counter["merge_seconds"] += merge_seconds * written / len(tweet_ids)
+        start += written
+    extraction_stats.merge(shard_stats)
+
+
+def restore_checkpoint(
+    manifest: Dict[str, Any], output_file_path: str, output_format: str = "json"
+) -> bool:
+    """
+    Restores the state of the extraction after the last completed file.
+
+    The output file is truncated to its size after the last completed file
+    (for Parquet, the parts written after it are removed), which removes the
+    tweets of a file whose extraction crashed, and the deduplication index is
+    loaded. If the saved index does not match the manifest, it is rebuilt
+    from the output.
+
+    Args:
+        manifest (Dict[str, Any]): The manifest of the previous extraction.
+        output_file_path (str): The path to the output file.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+
+    Returns:
+        bool: True if the checkpoint was restored, False if the extraction
+            must start from scratch.
+    """
+    if not manifest:
+        return False
+    if manifest.get("output_format", "json") != output_format:
+        print("The output format changed, starting from scratch.")
+        return False
+    if (
+        not os.path.exists(output_file_path)
+        or get_output_size(output_file_path, output_format) < manifest["output_size"]
+    ):
+        print("The output file does not match the manifest, starting from scratch.")
+        return False
+
+    if output_format == "parquet":
+        remove_parts(output_file_path, manifest["output_size"])
+    else:
+        os.truncate(output_file_path, manifest["output_size"])
+    all_tweet_id.clear()
+    if os.path.exists(path_extraction_tweet_ids):
+        all_tweet_id.update(np.load(path_extraction_tweet_ids))
+    if len(all_tweet_id) != manifest["tweet_ids"]:
+        print("Rebuilding the tweet IDs from the output file.")
+        all_tweet_id.clear()
+        if output_format == "parquet":
+            if manifest["output_size"]:
+                tweet_ids = read_cleaned_table(
+                    output_file_path, "Tweets", ["tweet_id"]
+                ).column("tweet_id")
+                all_tweet_id.update(ids_to_array(tweet_ids.to_pylist()))
+        else:
+            with open(output_file_path, "r", encoding="utf-8") as file:
+                all_tweet_id.update(
+                    ids_to_array(loads(line[:-2])["tweet"]["tweet_id"] for line in file)
+                )
+    return True
+
+
+def save_checkpoint(
+    manifest: Dict[str, Any],
+    file_paths: List[str],
+    output_file_path: str,
+    output_format: str = "json",
+) -> None:
+    """
+    Records completely extracted raw files in the manifest, with the deduplication index.
+
+    The index is saved before the manifest, and the manifest records the
+    number of IDs of the index, so a crash in between is detected on restore.
+
+    Args:
+        manifest (Dict[str, Any]): The manifest of the extraction.
+        file_paths (List[str]): The paths to the extracted raw files.
+        output_file_path (str): The path to the output file.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+
+    Returns:
+        None
+    """
+    for file_path in file_paths:
+        manifest["files"][os.path.basename(file_path)] = file_fingerprint(file_path)
+    manifest["output_format"] = output_format
+    manifest["output_size"] = get_output_size(output_file_path, output_format)
+    manifest["tweet_ids"] = len(all_tweet_id)
+
+    temporary_path: str = path_extraction_tweet_ids.replace(".npy", ".tmp.npy")
+    all_tweet_id.save(temporary_path)
+    os.replace(temporary_path, path_extraction_tweet_ids)
+    save_manifest(manifest, path_extraction_manifest)
+
+
+def start_general_extraction(
+    workers: int = 1,
+    reset: bool = False,
+    output_format: str = "json",
+    report_path: str = path_extraction_report,
+    engine: str = "dict",
+) -> None:
     """
     Initializes the tweet extraction and cleaning process.
 
     This function performs the following tasks:
-    1. Resets the output file where the cleaned tweets will be stored.
-    2. Iterates through all raw JSON tweet files in the specified directory.
+    1. Restores the previous extraction from its manifest, or resets the
+       output file where the cleaned tweets will be stored.
+    2. Iterates through the raw JSON tweet files in the specified directory
+       which were not extracted yet, or changed since.
     3. Reads tweets from each file, processes them, and cleans them.
     4. Appends the cleaned tweets to the output file.
+    5. Records the extracted files and the tweet IDs in the manifest.
+    6. Saves a report with the rejected records per reason and the time
+       spent in every stage, for each extracted file.
+
+    The tweets are streamed from the raw files to the output file one at a
+    time, so the memory usage does not depend on the size of the raw files.
+
+    With more than one worker, the files are split into shards that are
+    extracted in parallel processes, and the shard outputs are merged into
+    the output file in order. Large uncompressed files are split into byte
+    ranges, so that even a single file is extracted in parallel.
+
+    The manifest is saved after every file (or shard), so a crashed extraction
+    resumes from the last completed one.
 
     The folder with the JSON files to be cleaned must be in the same
     directory as this file, under the name 'data_raw'.
 
     The cleaned data will be in the directory of this project, under
-    /data_processed/cleaned_tweets_combined.json.
+    /data_processed/cleaned_tweets_combined.json, or under
+    /data_processed/cleaned_tweets_parquet/ with the Parquet output format.
+
+    Args:
+        workers (int, optional): The number of worker processes. Defaults to 1.
+        reset (bool, optional): Whether to extract all the files again,
+            ignoring the manifest. Defaults to False.
+        output_format (str, optional): The output format, one of OUTPUT_FORMATS.
+            Defaults to "json".
+        report_path (str, optional): The path to the report, saved as CSV if it
+            ends with .csv and as JSON otherwise.
+            Defaults to /data_processed/extraction_report.json.
+        engine (str, optional): The cleaning engine, one of ENGINES. "arrow"
+            requires the Parquet output. Defaults to "dict".
+
+    Raises:
+        ValueError: If the Arrow engine is used with the JSON output.
     """
+    if engine == "arrow" and output_format != "parquet":
+        raise ValueError("The Arrow engine requires the Parquet output format")
     output_file_path: str = path_processed_tweets_json
+    if output_format == "parquet":
+        output_file_path = path_processed_tweets_parquet
 
     # Create the output directory if it does not exist
     os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
 
-    # Resets output file
-    delete_existing_file(output_file_path)
+    manifest: Dict[str, Any] = {} if reset else load_manifest(path_extraction_manifest)
+    if not restore_checkpoint(manifest, output_file_path, output_format):
+        # Resets output file
+        delete_output(output_file_path, output_format)
+        all_tweet_id.clear()
+        manifest = new_manifest()
 
-    # Extract all tweets from files, append them to the output file
+    # Extract the new tweets from files, append them to the output file
     path_to_all_json_files: str = os.path.join(folder_path_processed, "data_raw")
 
-    all_raw_json_files: List[str] = os.listdir(path_to_all_json_files)
-    for file in tqdm(
-        all_raw_json_files,
-        bar_format="Processing files: {n_fmt}/{total_fmt} ({percentage:.0f}%) [Elapsed: {elapsed}, Remaining: {remaining}, {rate_fmt}]",
-    ):
-        tweets_from_file: List[Dict[str, Any]] = read_from_file(
-            os.path.join(path_to_all_json_files, file)
-        )
-        cleaned_tweets_list: List[Dict[str, Dict[str, Any]]] = []
-        for tweet in tweets_from_file:
-            if quote := tweet.get("quoted_status"):
-                cleaned_tweets_list.append(start_cleaning(quote))
-            if original_tweet := tweet.get("retweeted_status"):
-                cleaned_tweets_list.extend(
-                    (
-                        start_cleaning(original_tweet),
-                        start_cleaning(tweet),
-                    )
+    raw_json_files: List[str] = [
+        os.path.join(path_to_all_json_files, file)
+        for file in sorted(os.listdir(path_to_all_json_files))
+    ]
+    raw_json_files = [
+        file for file in raw_json_files if not is_processed(manifest, file)
+    ]
+    if not raw_json_files:
+        print("All the raw files were already extracted.")
+        return
+
+    extraction_stats.clear()
+    if workers <= 1:
+        for file in tqdm(raw_json_files, bar_format=PROGRESS_BAR_FORMAT):
+            extraction_stats.start_file(file)
+            extraction_stats.count("bytes", os.path.getsize(file))
+            extract_file(file, output_file_path, output_format, engine)
+            save_checkpoint(manifest, [file], output_file_path, output_format)
+    else:
+        shards: List[List[FilePiece]] = split_into_shards(raw_json_files, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    extract_shard,
+                    shard,
+                    f"{output_file_path}.shard_{i}",
+                    output_format,
+                    engine,
                 )
-            else:
-                cleaned_tweets_list.append(start_cleaning(tweet))
-        append_to_file(cleaned_tweets_list, output_file_path)
+                for i, shard in enumerate(shards)
+            ]
+            # The shards are merged in order, while the next ones are still extracted
+            for shard, future in tqdm(
+                zip(shards, futures), total=len(shards), desc="Extracting shards: "
+            ):
+                merge_shard_output(*future.result(), output_file_path, output_format)
+                save_checkpoint(
+                    manifest, completed_files(shard), output_file_path, output_format
+                )
+
+    extraction_stats.save(report_path)
+    print(extraction_stats.summary())
+    print(f"The extraction report was saved to {report_path}")
 
 
 if __name__ == "__main__":
-    all_tweet_id: Set[str] = set()
-    start_general_extraction()
+    parser = argparse.ArgumentParser(description="Extract and clean raw tweets.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes extracting the raw files in parallel.",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Extract all the raw files again instead of only the new or changed ones.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Write the cleaned tweets as JSON lines or as a Parquet dataset.",
+    )
+    parser.add_argument(
+        "--report",
+        default=path_extraction_report,
+        help="Path to the extraction report (.json or .csv).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="dict",
+        help="Clean one tweet at a time, or batches of tweets on columns with "
+        "Arrow (requires --output-format parquet).",
+    )
+    args = parser.parse_args()
+    if args.engine == "arrow" and args.output_format != "parquet":
+        parser.error("--engine arrow requires --output-format parquet")
+    start_general_extraction(
+        args.workers, args.reset, args.output_format, args.report, args.engine
+    )
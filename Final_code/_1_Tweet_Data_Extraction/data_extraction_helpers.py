@@ -1,6 +1,41 @@
-import json
+import bz2
+import gzip
+import io
+import lzma
+import mmap
 import os
-from typing import Any, Dict, List
+import queue
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed to read .zst files
+    zstandard = None
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from extraction_stats import ExtractionStats
+from json_codec import loads
 
 
 def could_be_json(string: str) -> bool:
@@ -31,6 +66,363 @@ def delete_existing_file(file_path: str) -> None:
         print(f"{file_path.split('/')[-1]}' was deleted.")
 
 
+def open_zstd(file_name: str) -> BinaryIO:
+    """
+    Opens a zstd-compressed file for streaming decompression.
+
+    Args:
+        file_name (str): The name of the .zst file.
+
+    Returns:
+        BinaryIO: A binary stream of the decompressed data.
+
+    Raises:
+        ImportError: If zstandard is not installed.
+    """
+    if zstandard is None:
+        raise ImportError(
+            "Reading .zst files requires zstandard, install it with `pip install zstandard`"
+        )
+    return zstandard.ZstdDecompressor().stream_reader(open(file_name, "rb"))
+
+
+# Functions opening the compressed raw files by extension, as binary streams
+DECOMPRESSORS: Dict[str, Callable[[str], BinaryIO]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".zst": open_zstd,
+}
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Reads a binary stream in a background thread, ahead of the consumer.
+
+    The decompressors of the standard library and zstandard release the GIL
+    while decompressing, so the decompression of the next chunks runs in
+    parallel with the JSON parsing of the current one. At most `max_chunks`
+    chunks are kept in memory.
+    """
+
+    def __init__(
+        self, source: BinaryIO, chunk_size: int = 1 << 20, max_chunks: int = 8
+    ):
+        """
+        Args:
+            source (BinaryIO): The stream to read, closed with the reader.
+            chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
+            max_chunks (int, optional): The maximum number of chunks read ahead. Defaults to 8.
+        """
+        super().__init__()
+        self._source: BinaryIO = source
+        self._chunk_size: int = chunk_size
+        self._chunks: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._chunk: memoryview = memoryview(b"")
+        self._finished: bool = False
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._read_ahead, daemon=True
+        )
+        self._thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._chunk and not self._finished:
+            chunk = self._chunks.get()
+            if isinstance(chunk, BaseException):
+                self._finished = True
+                raise chunk
+            self._finished = not chunk
+            self._chunk = memoryview(chunk)
+        size: int = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Unblocks the background thread if it waits for a free slot
+            while self._thread.is_alive():
+                try:
+                    self._chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._source.close()
+        super().close()
+
+    def _read_ahead(self) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk: bytes = self._source.read(self._chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:
+            self._put(error)
+
+    def _put(self, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def open_raw_file(file_name: str, prefetch: bool = True) -> TextIO:
+    """
+    Opens a raw file for reading text, decompressing it if needed.
+
+    Files ending with .gz, .bz2, .xz or .zst are decompressed while they
+    are read, without writing the decompressed data to the disk.
+
+    Args:
+        file_name (str): The name of the file.
+        prefetch (bool, optional): Whether to decompress in a background thread,
+            overlapping with the processing of the lines. Defaults to True.
+
+    Returns:
+        TextIO: The file, as a text stream.
+    """
+    decompressor: Optional[Callable[[str], BinaryIO]] = DECOMPRESSORS.get(
+        os.path.splitext(file_name)[1].lower()
+    )
+    if decompressor is None:
+        return open(file_name, "r", encoding="utf-8")
+    stream: BinaryIO = decompressor(file_name)
+    if prefetch:
+        stream = io.BufferedReader(PrefetchReader(stream))
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def iterate_json_lines(
+    file_name: str, stats: Optional[ExtractionStats] = None
+) -> Iterator[str]:
+    """
+    Lazily reads the lines of a file that could be JSON tweets.
+
+    The lines are stripped and their trailing comma removed. Compressed files
+    are decompressed on the fly (see open_raw_file).
+
+    Args:
+        file_name (str): The name of the file to read.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            lines, rejections and read time. Defaults to None.
+
+    Yields:
+        str: The lines that could be JSON.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    clock = time.perf_counter
+    with open_raw_file(file_name) as file:
+        started: float = clock()
+        for line in file:
+            stats.count("lines")
+            line: str = line.strip().removesuffix(",")
+            # do not consider anything that is not json
+            if not could_be_json(line):
+                stats.count("not_json" if line else "empty_line")
+                continue
+            stats.add_time("read", clock() - started)
+            yield line
+            started = clock()
+
+
+def parse_json_lines(
+    lines: Iterable[Union[str, bytes]], stats: Optional[ExtractionStats] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily parses JSON lines, yielding one tweet at a time.
+
+    Args:
+        lines (Iterable[Union[str, bytes]]): The JSON lines.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            parsed tweets and the parse time. Defaults to None.
+
+    Yields:
+        Dict[str, Any]: A dictionary representing a tweet.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    clock = time.perf_counter
+    for line in lines:
+        parsing: float = clock()
+        tweet: Dict[str, Any] = loads(line)
+        stats.add_time("parse", clock() - parsing)
+        stats.count("parsed")
+        yield tweet
+
+
+def iterate_tweets_from_file(
+    file_name: str, stats: Optional[ExtractionStats] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily reads JSON data from a file, yielding one tweet at a time.
+
+    Only one line of the file is kept in memory at a time, so the memory
+    usage does not depend on the size of the file. Compressed files are
+    decompressed on the fly (see open_raw_file).
+
+    Args:
+        file_name (str): The name of the file to read JSON data from.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            lines, rejections and read/parse times. Defaults to None.
+
+    Yields:
+        Dict[str, Any]: A dictionary representing a tweet read from the file.
+    """
+    return parse_json_lines(iterate_json_lines(file_name, stats), stats)
+
+
+# The ASCII bytes removed by str.strip() at the ends of a line
+WHITESPACE_BYTES: bytes = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+def is_compressed(file_name: str) -> bool:
+    """
+    Checks if a raw file is compressed, based on its extension.
+
+    Args:
+        file_name (str): The name of the file.
+
+    Returns:
+        bool: True if the file is decompressed when it is read, False otherwise.
+    """
+    return os.path.splitext(file_name)[1].lower() in DECOMPRESSORS
+
+
+def find_line_ranges(file_name: str, n_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Splits an uncompressed file into byte ranges that start and end at line boundaries.
+
+    The ranges cover the whole file, have roughly equal sizes, and each line
+    belongs to exactly one range, so they can be parsed by separate workers.
+
+    Args:
+        file_name (str): The name of the file to split.
+        n_ranges (int): The maximum number of ranges.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, end) byte offsets of the non-empty ranges,
+            or a single empty range for an empty file.
+    """
+    size: int = os.path.getsize(file_name)
+    if size == 0:
+        return [(0, 0)]
+    boundaries: List[int] = [0]
+    with open(file_name, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        for i in range(1, max(n_ranges, 1)):
+            # Every range ends right after the first newline past its target size
+            newline: int = data.find(b"\n", max(size * i // n_ranges, boundaries[-1]))
+            if newline == -1:
+                break
+            if newline + 1 > boundaries[-1]:
+                boundaries.append(newline + 1)
+    boundaries.append(size)
+    return [
+        (start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start
+    ]
+
+
+def iterate_json_lines_from_range(
+    file_name: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> Iterator[bytes]:
+    """
+    Lazily reads the lines in a byte range of an uncompressed file that could be JSON tweets.
+
+    The range should be aligned to line boundaries (see find_line_ranges).
+    The file is read through mmap and gives the same lines as
+    iterate_json_lines: the lines are stripped and their trailing comma
+    removed, and only the ones that could be JSON are kept. This is done on
+    the offsets in the mapped bytes, so the only copy of a line is the
+    yielded one.
+
+    Args:
+        file_name (str): The name of the file to read.
+        start (int, optional): The offset of the first byte of the range. Defaults to 0.
+        end (Optional[int], optional): The offset after the last byte of the range.
+            Defaults to None, which reads until the end of the file.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            lines, rejections and read time. Defaults to None.
+
+    Yields:
+        bytes: The lines that could be JSON, UTF-8 encoded.
+    """
+    if end is None:
+        end = os.path.getsize(file_name)
+    if end <= start:
+        return
+    stats = stats if stats is not None else ExtractionStats()
+    clock = time.perf_counter
+    with open(file_name, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        started: float = clock()
+        position: int = start
+        while position < end:
+            stats.count("lines")
+            line_end: int = data.find(b"\n", position, end)
+            if line_end == -1:
+                line_end = end
+            first, last = position, line_end
+            position = line_end + 1
+
+            # line.strip().removesuffix(","), on the offsets instead of copies
+            while first < last and data[first] in WHITESPACE_BYTES:
+                first += 1
+            while last > first and data[last - 1] in WHITESPACE_BYTES:
+                last -= 1
+            if last > first and data[last - 1] == ord(","):
+                last -= 1
+            if last == first:
+                stats.count("empty_line")
+                continue
+            # do not consider anything that is not json, like could_be_json
+            if not (data[first] == ord("{") and data[last - 1] == ord("}")):
+                stats.count("not_json")
+                continue
+            line: bytes = data[first:last]
+            stats.add_time("read", clock() - started)
+            yield line
+            started = clock()
+
+
+def iterate_tweets_from_range(
+    file_name: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily reads the tweets in a byte range of an uncompressed file, through mmap.
+
+    It yields the same tweets as iterate_tweets_from_file on the same lines
+    (see iterate_json_lines_from_range).
+
+    Args:
+        file_name (str): The name of the file to read JSON data from.
+        start (int, optional): The offset of the first byte of the range. Defaults to 0.
+        end (Optional[int], optional): The offset after the last byte of the range.
+            Defaults to None, which reads until the end of the file.
+        stats (Optional[ExtractionStats], optional): The statistics counting the
+            lines, rejections and read/parse times. Defaults to None.
+
+    Yields:
+        Dict[str, Any]: A dictionary representing a tweet read from the file.
+    """
+    return parse_json_lines(
+        iterate_json_lines_from_range(file_name, start, end, stats), stats
+    )
+
+
 def read_from_file(file_name: str) -> List[Dict[str, Any]]:
     """
     Reads JSON data from a file and returns a list of dictionaries representing the tweets.
@@ -41,15 +433,7 @@ def read_from_file(file_name: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: A list of dictionaries representing the tweets read from the file.
     """
-    with open(file_name, "r", encoding="utf-8") as file:
-        tweets_in_file: List[Dict[str, Any]] = []
-        for line in file:
-            line: str = line.strip().removesuffix(",")
-            # do not consider anything that is not json
-            if could_be_json(line):
-                tweet: Dict[str, Any] = json.loads(line)
-                tweets_in_file.append(tweet)
-        return tweets_in_file
+    return list(iterate_tweets_from_file(file_name))
 
 
 def start_cleaning(dictionary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
@@ -0,0 +1,529 @@
+import argparse
+import bz2
+import gzip
+import json
+import lzma
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+import data_extraction
+from batch_cleaning import clean_lines_to_tables
+from data_extraction import append_to_file, clean_tweets, extract_file
+from data_extraction_helpers import (
+    could_be_json,
+    find_line_ranges,
+    iterate_tweets_from_file,
+    iterate_tweets_from_range,
+    open_raw_file,
+    read_from_file,
+    start_cleaning,
+    zstandard,
+)
+from json_codec import available_backends, get_codec, loads
+from parquet_utils import cleaned_tweets_to_tables
+from tweet_id_index import TweetIdIndex
+
+# This is a script benchmarking the extraction on synthetic raw tweets:
+# - `python extraction_benchmark.py memory --size-gb 2` compares the peak memory
+#   of reading whole files against the streaming pipeline (Unix only).
+# - `python extraction_benchmark.py codec --size-mb 200` reports the MB/s of the
+#   JSON decoding and encoding stages for every installed JSON backend.
+# - `python extraction_benchmark.py dedup --millions 5` compares the memory per
+#   million IDs and the time of the tweet ID deduplication structures.
+# - `python extraction_benchmark.py compression --size-mb 200` compares the read
+#   and parse throughput of compressed raw files against an uncompressed one.
+# - `python extraction_benchmark.py mmap --size-mb 500 --workers 4` compares the
+#   line-by-line reading of one large file against the mmap reader, sequential
+#   and split into line-aligned ranges parsed by several processes.
+# - `python extraction_benchmark.py cleaning --size-mb 200` compares the parsing
+#   and cleaning throughput of the dict engine (start_cleaning, then the
+#   conversion to the Parquet tables) against the Arrow engine, alone and in the
+#   whole extraction to a Parquet dataset.
+
+
+def synthetic_tweet(i: int) -> Dict[str, Any]:
+    """
+    Creates a raw tweet resembling the ones from the Twitter API.
+
+    Args:
+        i (int): The number of the tweet, used to make the IDs unique.
+
+    Returns:
+        Dict[str, Any]: A dictionary representing a raw tweet.
+    """
+    tweet: Dict[str, Any] = {
+        "created_at": "Wed May 22 14:15:03 +0000 2019",
+        "id": 1_131_000_000_000_000_000 + i,
+        "id_str": str(1_131_000_000_000_000_000 + i),
+        "text": f"@Lufthansa my flight number {i} was delayed again " * 3,
+        "source": '<a href="http://twitter.com/download/iphone">Twitter for iPhone</a>',
+        "in_reply_to_status_id_str": str(1_130_000_000_000_000_000 + i),
+        "user": {
+            "id": 10_000 + i % 100_000,
+            "id_str": str(10_000 + i % 100_000),
+            "name": "Frequent Flyer",
+            "screen_name": f"flyer_{i % 100_000}",
+            "description": "Travelling around the world, one delay at a time. " * 2,
+            "verified": False,
+            "followers_count": i % 5_000,
+            "friends_count": i % 700,
+            "statuses_count": i % 20_000,
+            "created_at": "Mon Jan 02 10:00:00 +0000 2012",
+            "default_profile": True,
+            "default_profile_image": False,
+        },
+        "entities": {
+            "hashtags": [{"text": "Lufthansa", "indices": [0, 10]}],
+            "user_mentions": [{"screen_name": "lufthansa", "id_str": "124476322"}],
+        },
+        "lang": "en",
+        "favorite_count": i % 13,
+        "retweet_count": i % 7,
+        "reply_count": i % 3,
+        "quote_count": 0,
+        "timestamp_ms": "1558534503000",
+    }
+    if i % 5 == 0:
+        tweet["retweeted_status"] = dict(
+            tweet, id_str=str(1_120_000_000_000_000_000 + i)
+        )
+    return tweet
+
+
+def write_synthetic_file(file_path: str, size_bytes: int) -> int:
+    """
+    Writes raw tweets to a file until it reaches the given size.
+
+    Args:
+        file_path (str): The path to the file to write.
+        size_bytes (int): The size of the file in bytes.
+
+    Returns:
+        int: The number of tweets written.
+    """
+    written: int = 0
+    with open(file_path, "w", encoding="utf-8") as file:
+        while file.tell() < size_bytes:
+            file.write(json.dumps(synthetic_tweet(written)) + "\n")
+            written += 1
+    return written
+
+
+def run_pipeline(
+    mode: str, raw_file_path: str, output_file_path: str
+) -> Tuple[float, int]:
+    """
+    Runs an extraction pipeline on a raw file. Meant to run in a fresh process.
+
+    Args:
+        mode (str): Either "list" (read the whole file before cleaning)
+            or "stream" (read, clean and write one tweet at a time).
+        raw_file_path (str): The path to the raw file.
+        output_file_path (str): The path to the output file.
+
+    Returns:
+        Tuple[float, int]: The elapsed time in seconds and the peak RSS in bytes.
+    """
+    data_extraction.all_tweet_id.clear()
+    start: float = time.perf_counter()
+    if mode == "list":
+        append_to_file(
+            list(clean_tweets(read_from_file(raw_file_path))), output_file_path
+        )
+    else:
+        append_to_file(
+            clean_tweets(iterate_tweets_from_file(raw_file_path)), output_file_path
+        )
+    elapsed: float = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def benchmark_memory(size_gb: float) -> None:
+    """
+    Prints the time and peak memory of the list and streaming pipelines.
+
+    Args:
+        size_gb (float): The size of the synthetic raw file in GB.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        raw_file_path: str = os.path.join(temp_dir, "synthetic_raw.json")
+        n_tweets: int = write_synthetic_file(raw_file_path, int(size_gb * 1024**3))
+        print(
+            f"Synthetic file: {os.path.getsize(raw_file_path) / 1024**2:.0f} MB, {n_tweets:,} tweets"
+        )
+        for mode in ("list", "stream"):
+            output_file_path: str = os.path.join(temp_dir, f"output_{mode}.json")
+            # Every pipeline runs in its own process, so that the peak memory is not shared
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=get_context("spawn")
+            ) as executor:
+                elapsed, peak_rss = executor.submit(
+                    run_pipeline, mode, raw_file_path, output_file_path
+                ).result()
+            print(f"{mode:>6}: {elapsed:8.1f} s, peak RSS {peak_rss / 1024**2:8.0f} MB")
+            os.remove(output_file_path)
+
+
+def benchmark_codec(size_mb: float) -> None:
+    """
+    Prints the throughput of every JSON stage of the pipeline for each JSON backend.
+
+    The stages are decoding the raw lines (read_from_file), encoding the
+    cleaned tweets (append_to_file) and decoding the cleaned lines (database_fill).
+
+    Args:
+        size_mb (float): The size of the synthetic raw data in MB.
+
+    Returns:
+        None
+    """
+    raw_lines: List[str] = []
+    raw_size: int = 0
+    while raw_size < size_mb * 1024**2:
+        raw_lines.append(json.dumps(synthetic_tweet(len(raw_lines))))
+        raw_size += len(raw_lines[-1])
+    cleaned_tweets: List[Dict[str, Any]] = [
+        start_cleaning(json.loads(line)) for line in raw_lines
+    ]
+    print(f"Synthetic data: {raw_size / 1024**2:.0f} MB, {len(raw_lines):,} tweets")
+    print(
+        f"{'backend':>10} {'decode raw':>12} {'encode clean':>14} {'decode clean':>14}"
+    )
+
+    for backend in available_backends():
+        codec = get_codec(backend)
+
+        start: float = time.perf_counter()
+        for line in raw_lines:
+            codec.loads(line)
+        decode_raw: float = raw_size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        cleaned_lines: List[str] = [
+            codec.dumps(tweet) + ",\n" for tweet in cleaned_tweets
+        ]
+        cleaned_size: int = sum(len(line) for line in cleaned_lines)
+        encode_cleaned: float = cleaned_size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for line in cleaned_lines:
+            codec.loads(line[:-2])
+        decode_cleaned: float = cleaned_size / (time.perf_counter() - start)
+
+        print(
+            f"{backend:>10} {decode_raw / 1024**2:>7.1f} MB/s {encode_cleaned / 1024**2:>9.1f} MB/s"
+            f" {decode_cleaned / 1024**2:>9.1f} MB/s"
+        )
+
+
+def deduplicate_synthetic_ids(seen: Set[str], n_ids: int) -> Set[str]:
+    """
+    Adds synthetic tweet IDs to a deduplication structure, checking them first.
+
+    About 10% of the synthetic IDs are looked up again, like the duplicates in the raw data.
+
+    Args:
+        seen (Set[str]): The empty deduplication structure.
+        n_ids (int): The number of IDs.
+
+    Returns:
+        Set[str]: The filled deduplication structure.
+    """
+    random: Random = Random(42)
+    for _ in range(n_ids):
+        # The strings are created inside the loop, like when they are read from JSON
+        tweet_id: str = str(1_131_000_000_000_000_000 + random.getrandbits(40))
+        if tweet_id not in seen:
+            seen.add(tweet_id)
+        if random.random() < 0.1:
+            tweet_id in seen
+    return seen
+
+
+def benchmark_dedup(millions: float) -> None:
+    """
+    Prints the time and memory per million IDs of the deduplication structures.
+
+    Args:
+        millions (float): The number of IDs in millions.
+
+    Returns:
+        None
+    """
+    n_ids: int = int(millions * 1_000_000)
+    print(f"Deduplicating {n_ids:,} tweet IDs")
+    structures = {
+        "set of str": set,
+        "TweetIdIndex": TweetIdIndex,
+        "TweetIdIndex + Bloom": lambda: TweetIdIndex(bloom_bits=10 * n_ids),
+    }
+    for name, create in structures.items():
+        start: float = time.perf_counter()
+        deduplicate_synthetic_ids(create(), n_ids)
+        elapsed: float = time.perf_counter() - start
+
+        # The memory is measured in a second run, since tracing slows it down
+        tracemalloc.start()
+        seen: Set[str] = deduplicate_synthetic_ids(create(), n_ids)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del seen
+        print(
+            f"{name:>20}: {elapsed:6.1f} s, {memory / 1024**2 / millions:6.1f} MB per million IDs"
+        )
+
+
+def compress_file(file_path: str) -> List[str]:
+    """
+    Writes compressed copies of a file in every supported format.
+
+    Args:
+        file_path (str): The path to the file to compress.
+
+    Returns:
+        List[str]: The paths to the compressed copies.
+    """
+    compressors: Dict[str, Callable] = {
+        ".gz": lambda path: gzip.open(path, "wb", compresslevel=6),
+        ".bz2": lambda path: bz2.open(path, "wb"),
+        ".xz": lambda path: lzma.open(path, "wb", preset=1),
+    }
+    if zstandard is not None:
+        compressors[".zst"] = lambda path: zstandard.ZstdCompressor().stream_writer(
+            open(path, "wb")
+        )
+    compressed_paths: List[str] = []
+    for extension, open_compressed in compressors.items():
+        with (
+            open(file_path, "rb") as source,
+            open_compressed(file_path + extension) as target,
+        ):
+            while chunk := source.read(1 << 20):
+                target.write(chunk)
+        compressed_paths.append(file_path + extension)
+    return compressed_paths
+
+
+def parse_raw_file(file_path: str, prefetch: bool) -> int:
+    """
+    Reads and parses all the tweets of a raw file, like iterate_tweets_from_file.
+
+    Args:
+        file_path (str): The path to the raw file.
+        prefetch (bool): Whether to decompress in a background thread.
+
+    Returns:
+        int: The number of parsed tweets.
+    """
+    n_tweets: int = 0
+    with open_raw_file(file_path, prefetch=prefetch) as file:
+        for line in file:
+            line = line.strip().removesuffix(",")
+            if could_be_json(line):
+                loads(line)
+                n_tweets += 1
+    return n_tweets
+
+
+def benchmark_compression(size_mb: float) -> None:
+    """
+    Prints the throughput of reading and parsing raw files in every compression format.
+
+    The throughput is in MB/s of uncompressed data, with and without the
+    decompression running in a background thread.
+
+    Args:
+        size_mb (float): The size of the uncompressed synthetic file in MB.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        raw_file_path: str = os.path.join(temp_dir, "synthetic_raw.json")
+        n_tweets: int = write_synthetic_file(raw_file_path, int(size_mb * 1024**2))
+        raw_size: int = os.path.getsize(raw_file_path)
+        print(f"Synthetic file: {raw_size / 1024**2:.0f} MB, {n_tweets:,} tweets")
+        print(f"{'file':>22} {'size':>8} {'prefetch':>12} {'no prefetch':>12}")
+        for file_path in [raw_file_path] + compress_file(raw_file_path):
+            throughputs: List[float] = []
+            for prefetch in (True, False):
+                start: float = time.perf_counter()
+                assert parse_raw_file(file_path, prefetch) == n_tweets
+                throughputs.append(raw_size / (time.perf_counter() - start))
+            print(
+                f"{os.path.basename(file_path):>22} {os.path.getsize(file_path) / 1024**2:>5.0f} MB"
+                f" {throughputs[0] / 1024**2:>7.1f} MB/s {throughputs[1] / 1024**2:>7.1f} MB/s"
+            )
+
+
+def count_tweets_in_range(file_path: str, start: int, end: int) -> int:
+    """
+    Counts the tweets parsed from a byte range of a file. Meant to run in a worker process.
+
+    Args:
+        file_path (str): The path to the raw file.
+        start (int): The offset of the first byte of the range.
+        end (int): The offset after the last byte of the range.
+
+    Returns:
+        int: The number of parsed tweets.
+    """
+    return sum(1 for _ in iterate_tweets_from_range(file_path, start, end))
+
+
+def benchmark_mmap(size_mb: float, workers: int) -> None:
+    """
+    Prints the throughput of reading one large raw file with the different readers.
+
+    Args:
+        size_mb (float): The size of the synthetic file in MB.
+        workers (int): The number of processes of the parallel reader.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        raw_file_path: str = os.path.join(temp_dir, "synthetic_raw.json")
+        n_tweets: int = write_synthetic_file(raw_file_path, int(size_mb * 1024**2))
+        raw_size: int = os.path.getsize(raw_file_path)
+        print(f"Synthetic file: {raw_size / 1024**2:.0f} MB, {n_tweets:,} tweets")
+
+        start: float = time.perf_counter()
+        assert sum(1 for _ in iterate_tweets_from_file(raw_file_path)) == n_tweets
+        elapsed: float = time.perf_counter() - start
+        print(f"{'line by line':>20}: {raw_size / 1024**2 / elapsed:7.1f} MB/s")
+
+        start = time.perf_counter()
+        assert count_tweets_in_range(raw_file_path, 0, raw_size) == n_tweets
+        elapsed = time.perf_counter() - start
+        print(f"{'mmap':>20}: {raw_size / 1024**2 / elapsed:7.1f} MB/s")
+
+        start = time.perf_counter()
+        ranges: List[Tuple[int, int]] = find_line_ranges(raw_file_path, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = executor.map(
+                count_tweets_in_range,
+                [raw_file_path] * len(ranges),
+                *zip(*ranges),
+            )
+            assert sum(counts) == n_tweets
+        elapsed = time.perf_counter() - start
+        print(
+            f"{f'mmap, {workers} workers':>20}: {raw_size / 1024**2 / elapsed:7.1f} MB/s"
+        )
+
+
+def benchmark_cleaning(size_mb: float) -> None:
+    """
+    Prints the throughput of parsing and cleaning raw lines into the Users and
+    Tweets tables of the Parquet output with both cleaning engines, and of the
+    whole extraction of a raw file to a Parquet dataset (with the rejection of
+    the duplicates and the writing).
+
+    Args:
+        size_mb (float): The size of the synthetic raw data in MB.
+
+    Returns:
+        None
+    """
+    raw_lines: List[str] = []
+    raw_size: int = 0
+    while raw_size < size_mb * 1024**2:
+        raw_lines.append(json.dumps(synthetic_tweet(len(raw_lines))))
+        raw_size += len(raw_lines[-1])
+    print(f"Synthetic data: {raw_size / 1024**2:.0f} MB, {len(raw_lines):,} tweets")
+
+    batch_size: int = 10_000
+
+    def dict_engine() -> Iterator[Tuple[Any, Any]]:
+        cleaned: Iterator[Dict[str, Any]] = clean_tweets(
+            loads(line) for line in raw_lines
+        )
+        while batch := list(islice(cleaned, batch_size)):
+            yield cleaned_tweets_to_tables(batch)
+
+    engines: Dict[str, Callable] = {
+        "dict": dict_engine,
+        "arrow": lambda: clean_lines_to_tables(raw_lines, batch_size),
+    }
+    for name, clean in engines.items():
+        start: float = time.perf_counter()
+        n_cleaned: int = sum(len(tweets) for _, tweets in clean())
+        elapsed: float = time.perf_counter() - start
+        print(
+            f"{name:>6}: {raw_size / 1024**2 / elapsed:7.1f} MB/s, "
+            f"{n_cleaned / elapsed:10,.0f} cleaned tweets/s"
+        )
+
+    with tempfile.TemporaryDirectory() as folder:
+        raw_file_path: str = os.path.join(folder, "raw.json")
+        with open(raw_file_path, "w", encoding="utf-8") as file:
+            file.writelines(line + "\n" for line in raw_lines)
+        for name in engines:
+            data_extraction.all_tweet_id.clear()
+            start = time.perf_counter()
+            n_written: int = len(
+                extract_file(raw_file_path, os.path.join(folder, name), "parquet", name)
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>6} extraction: {raw_size / 1024**2 / elapsed:7.1f} MB/s, "
+                f"{n_written / elapsed:10,.0f} written tweets/s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tweet extraction.")
+    parser.add_argument(
+        "benchmark",
+        choices=["memory", "codec", "dedup", "compression", "mmap", "cleaning"],
+    )
+    parser.add_argument(
+        "--size-gb", type=float, default=2.0, help="Size of the memory benchmark file."
+    )
+    parser.add_argument(
+        "--size-mb",
+        type=float,
+        default=200.0,
+        help="Size of the codec, compression, mmap and cleaning benchmark data.",
+    )
+    parser.add_argument(
+        "--millions",
+        type=float,
+        default=5.0,
+        help="Number of IDs of the dedup benchmark.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of processes of the mmap benchmark.",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark == "memory":
+        benchmark_memory(args.size_gb)
+    elif args.benchmark == "codec":
+        benchmark_codec(args.size_mb)
+    elif args.benchmark == "dedup":
+        benchmark_dedup(args.millions)
+    elif args.benchmark == "compression":
+        benchmark_compression(args.size_mb)
+    elif args.benchmark == "mmap":
+        benchmark_mmap(args.size_mb, args.workers)
+    else:
+        benchmark_cleaning(args.size_mb)
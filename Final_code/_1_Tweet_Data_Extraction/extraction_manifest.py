@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+# This is a file with the helpers of the extraction manifest, which records the
+# raw files that were already extracted, so that a rerun only extracts the new
+# or changed files. The manifest looks like:
+# {
+#     "output_format": format of the output, "json" or "parquet",
+#     "output_size": size of the output file after the last completed file
+#                    (number of parts of the dataset for Parquet),
+#     "tweet_ids": number of tweet IDs in the saved deduplication index,
+#     "files": {file name in data_raw: {"size", "mtime_ns", "hash"}},
+# }
+
+
+def new_manifest() -> Dict[str, Any]:
+    """
+    Creates an empty manifest, for an extraction starting from scratch.
+
+    Returns:
+        Dict[str, Any]: The empty manifest.
+    """
+    return {"output_size": 0, "tweet_ids": 0, "files": {}}
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Any]:
+    """
+    Loads the manifest from a file.
+
+    Args:
+        manifest_path (str): The path to the manifest file.
+
+    Returns:
+        Dict[str, Any]: The manifest, or an empty dictionary if the file does not exist.
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_manifest(manifest: Dict[str, Any], manifest_path: str) -> None:
+    """
+    Atomically saves the manifest to a file.
+
+    The manifest is written to a temporary file which then replaces the old
+    one, so a crash never leaves a partially written manifest.
+
+    Args:
+        manifest (Dict[str, Any]): The manifest to save.
+        manifest_path (str): The path to the manifest file.
+
+    Returns:
+        None
+    """
+    temporary_path: str = f"{manifest_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temporary_path, manifest_path)
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the BLAKE2b hash of a file, reading it in chunks.
+
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
+
+    Returns:
+        str: The hexadecimal digest of the file.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path: str) -> Dict[str, Any]:
+    """
+    Creates the manifest entry of a raw file.
+
+    Args:
+        file_path (str): The path to the raw file.
+
+    Returns:
+        Dict[str, Any]: The size, modification time and hash of the file.
+    """
+    stat: os.stat_result = os.stat(file_path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": hash_file(file_path),
+    }
+
+
+def is_processed(manifest: Dict[str, Any], file_path: str) -> bool:
+    """
+    Checks if a raw file was already extracted and did not change since.
+
+    The file is only hashed when its size or modification time changed, in
+    which case an identical hash (e.g. the file was copied) updates the entry.
+
+    Args:
+        manifest (Dict[str, Any]): The manifest of the extraction.
+        file_path (str): The path to the raw file.
+
+    Returns:
+        bool: True if the file does not need to be extracted again, False otherwise.
+    """
+    entry: Dict[str, Any] = manifest["files"].get(os.path.basename(file_path))
+    if entry is None:
+        return False
+    stat: os.stat_result = os.stat(file_path)
+    if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+        return True
+    if stat.st_size == entry["size"] and hash_file(file_path) == entry["hash"]:
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+    return False
@@ -0,0 +1,152 @@
+import csv
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, List
+
+# This is a file with the statistics of the extraction: for every raw file,
+# the number of lines read, tweets parsed, extracted and written, the number of
+# rejected records per reason and the seconds spent in every stage.
+
+# Reasons for which a line or a cleaned tweet is not written to the output
+REJECTION_REASONS: List[str] = [
+    "empty_line",  # blank line between the tweets
+    "not_json",  # line rejected by could_be_json
+    "no_tweet_id",  # tweet without 'id_str'
+    "duplicate",  # tweet already written to the output
+    "invalid_user",  # tweet without user ID or with negative user counts
+]
+STAGES: List[str] = ["read", "parse", "clean", "write", "merge"]
+COUNTERS: List[str] = [
+    "bytes",  # size of the raw file (compressed size for compressed files)
+    "lines",  # lines read from the raw file
+    "parsed",  # raw tweets parsed from the lines
+    "embedded",  # quoted and retweeted tweets extracted from the raw tweets
+    "written",  # cleaned tweets written to the output
+]
+
+
+class ExtractionStats:
+    """
+    Counters and stage timings of the extraction, per raw file.
+
+    The statistics of every file are kept in a Counter, so the statistics
+    of the worker processes are merged by adding them up.
+
+    Methods:
+        start_file(file_name): Selects the file the next counts belong to.
+        count(key, n): Increments a counter of the current file.
+        add_time(stage, seconds): Adds time to a stage of the current file.
+        merge(other): Adds the statistics of another extraction.
+        totals(): The statistics summed over all the files.
+        save(report_path): Saves the report as JSON or CSV.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Counter] = {}
+        self.current: Counter = Counter()
+
+    def start_file(self, file_name: str) -> None:
+        """
+        Selects the file the next counts and timings belong to.
+
+        Args:
+            file_name (str): The path or name of the raw file.
+        """
+        self.current = self.files.setdefault(os.path.basename(file_name), Counter())
+
+    def count(self, key: str, n: int = 1) -> None:
+        """
+        Increments a counter of the current file.
+
+        Args:
+            key (str): A counter, one of COUNTERS or REJECTION_REASONS.
+            n (int, optional): The increment. Defaults to 1.
+        """
+        self.current[key] += n
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """
+        Adds time to a stage of the current file.
+
+        Args:
+            stage (str): The stage, one of STAGES.
+            seconds (float): The elapsed time in seconds.
+        """
+        self.current[f"{stage}_seconds"] += seconds
+
+    def merge(self, other: "ExtractionStats") -> None:
+        """
+        Adds the statistics of another extraction, e.g. of a worker process.
+
+        Args:
+            other (ExtractionStats): The statistics to add.
+        """
+        for file_name, counter in other.files.items():
+            self.files.setdefault(file_name, Counter()).update(counter)
+
+    def clear(self) -> None:
+        """
+        Removes all the statistics.
+        """
+        self.files = {}
+        self.current = Counter()
+
+    def totals(self) -> Counter:
+        """
+        Returns the statistics summed over all the files.
+
+        Returns:
+            Counter: The total counters and timings.
+        """
+        return sum(self.files.values(), Counter())
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        Returns the statistics as one row per file, followed by the totals.
+
+        Returns:
+            List[Dict[str, Any]]: The rows, with every counter and timing as a column.
+        """
+        columns: List[str] = (
+            COUNTERS + REJECTION_REASONS + [f"{stage}_seconds" for stage in STAGES]
+        )
+        return [
+            {"file": file_name, **{column: counter[column] for column in columns}}
+            for file_name, counter in [*self.files.items(), ("total", self.totals())]
+        ]
+
+    def save(self, report_path: str) -> None:
+        """
+        Saves the report, as CSV if the path ends with .csv, and as JSON otherwise.
+
+        Args:
+            report_path (str): The path to the report file.
+        """
+        rows: List[Dict[str, Any]] = self.rows()
+        with open(report_path, "w", encoding="utf-8", newline="") as file:
+            if report_path.endswith(".csv"):
+                writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump({"files": rows[:-1], "total": rows[-1]}, file, indent=2)
+
+    def summary(self) -> str:
+        """
+        Returns a short text summary of the rejections and of the time per stage.
+
+        Returns:
+            str: The summary.
+        """
+        totals: Counter = self.totals()
+        rejections: str = ", ".join(
+            f"{reason}: {totals[reason]:,}" for reason in REJECTION_REASONS
+        )
+        timings: str = ", ".join(
+            f"{stage}: {totals[f'{stage}_seconds']:.1f} s" for stage in STAGES
+        )
+        return (
+            f"Written {totals['written']:,} of {totals['parsed'] + totals['embedded']:,} tweets. "
+            f"Rejected: {rejections}. Time per stage: {timings}."
+        )
@@ -0,0 +1,285 @@
+from array import array
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+# Odd 64-bit constants used for the multiplicative (Fibonacci) hashing
+HASH_MULTIPLIER: int = 0x9E3779B97F4A7C15
+BLOOM_MULTIPLIERS = (
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD,
+)
+MASK_64: int = (1 << 64) - 1
+# The table grows when it is more than 2/3 full, to keep the probe sequences short
+MAX_LOAD_NUMERATOR, MAX_LOAD_DENOMINATOR = 2, 3
+
+
+def ids_to_array(ids: Iterable[Union[str, int]]) -> np.ndarray:
+    """
+    Converts tweet IDs (the 'id_str' strings or integers) to an array of uint64.
+
+    Args:
+        ids (Iterable[Union[str, int]]): The tweet IDs to convert.
+
+    Returns:
+        np.ndarray: The IDs as an array of uint64.
+    """
+    return np.fromiter((int(tweet_id) for tweet_id in ids), dtype=np.uint64)
+
+
+def fibonacci_hash(ids: np.ndarray, multiplier: int, shift: int) -> np.ndarray:
+    """
+    Vectorised multiplicative hashing of uint64 IDs to (64 - shift) bits.
+
+    Args:
+        ids (np.ndarray): The IDs, as an array of uint64.
+        multiplier (int): An odd 64-bit constant.
+        shift (int): The number of low bits of the product to drop.
+
+    Returns:
+        np.ndarray: The hashes, as an array of uint64.
+    """
+    # The uint64 multiplication wraps around, like the masking of the scalar version
+    return (ids * np.uint64(multiplier)) >> np.uint64(shift)
+
+
+class TweetIdIndex:
+    """
+    Memory-compact set of tweet IDs, used to remove duplicate tweets.
+
+    The IDs are parsed to integers and kept in an open-addressing hash table
+    with linear probing, stored in a flat array of uint64. The slots hold the
+    IDs plus one, as 0 marks an empty slot, so the ID 0 is supported as well.
+    It takes 12 to 24 bytes per ID, instead of roughly 100 bytes per string in
+    a Python set. An optional Bloom filter in front of the table answers most
+    lookups of unseen IDs without probing the table.
+
+    It supports the set operations used by the extraction (add, in, clear, len),
+    so it can replace a set of 'id_str' strings. The bulk operations (update,
+    contains_many) are vectorised with NumPy.
+
+    Methods:
+        add(tweet_id): Adds an ID to the index.
+        update(ids): Adds an array of IDs to the index.
+        contains_many(ids): Vectorised membership check of an array of IDs.
+        save(file_path): Saves the IDs to a .npy file.
+        load(file_path): Creates an index from a .npy file.
+    """
+
+    def __init__(
+        self,
+        ids: Optional[np.ndarray] = None,
+        capacity: int = 1 << 16,
+        bloom_bits: int = 0,
+    ):
+        """
+        Args:
+            ids (Optional[np.ndarray], optional): Initial IDs. Defaults to None.
+            capacity (int, optional): Initial number of slots of the table,
+                rounded up to a power of two. Defaults to 65536.
+            bloom_bits (int, optional): Size of the Bloom filter in bits, rounded
+                up to a power of two. About 10 bits per expected ID give a false
+                positive rate of around 1%. Defaults to 0, which disables the filter.
+        """
+        self._count: int = 0
+        self._allocate(max(int(capacity - 1).bit_length(), 3))
+        self._bloom: Optional[bytearray] = None
+        self._bloom_shift: int = 0
+        if bloom_bits > 0:
+            log_bits: int = max(int(bloom_bits - 1).bit_length(), 3)
+            self._bloom = bytearray(1 << (log_bits - 3))
+            self._bloom_shift = 64 - log_bits
+        if ids is not None:
+            self.update(ids)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, tweet_id: Union[str, int, None]) -> bool:
+        if tweet_id is None or tweet_id == "":
+            return False
+        key: int = int(tweet_id) + 1
+        if self._bloom is not None and not self._bloom_contains(key):
+            return False
+        table: array = self._table
+        slot: int = ((key * HASH_MULTIPLIER) & MASK_64) >> self._shift
+        while True:
+            current: int = table[slot]
+            if current == key:
+                return True
+            if not current:
+                return False
+            slot = (slot + 1) & self._mask
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The memory used by the index in bytes.
+        """
+        bloom_bytes: int = 0 if self._bloom is None else len(self._bloom)
+        return len(self._table) * self._table.itemsize + bloom_bytes
+
+    def add(self, tweet_id: Union[str, int]) -> None:
+        """
+        Adds an ID to the index.
+
+        Args:
+            tweet_id (Union[str, int]): The ID to add.
+        """
+        key: int = int(tweet_id) + 1
+        table: array = self._table
+        slot: int = ((key * HASH_MULTIPLIER) & MASK_64) >> self._shift
+        while current := table[slot]:
+            if current == key:
+                return
+            slot = (slot + 1) & self._mask
+        table[slot] = key
+        self._count += 1
+        if self._bloom is not None:
+            self._bloom_add(key)
+        if self._count * MAX_LOAD_DENOMINATOR > len(table) * MAX_LOAD_NUMERATOR:
+            self._grow(self._count)
+
+    def update(self, ids: np.ndarray) -> None:
+        """
+        Adds an array of IDs to the index.
+
+        Args:
+            ids (np.ndarray): The IDs to add, as an array of uint64.
+        """
+        keys: np.ndarray = np.unique(np.asarray(ids, dtype=np.uint64)) + np.uint64(1)
+        self._grow(self._count + len(keys))
+        if self._bloom is not None:
+            self._bloom_add_many(keys)
+        self._insert_many(keys)
+
+    def contains_many(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Vectorised membership check of an array of IDs.
+
+        Args:
+            ids (np.ndarray): The IDs to check, as an array of uint64.
+
+        Returns:
+            np.ndarray: A boolean array, True where the ID is in the index.
+        """
+        keys: np.ndarray = np.asarray(ids, dtype=np.uint64) + np.uint64(1)
+        table: np.ndarray = np.frombuffer(self._table, dtype=np.uint64)
+        found: np.ndarray = np.zeros(len(keys), dtype=bool)
+        pending: np.ndarray = np.arange(len(keys))
+        slots: np.ndarray = fibonacci_hash(keys, HASH_MULTIPLIER, self._shift)
+        while len(pending):
+            current: np.ndarray = table[slots]
+            hit: np.ndarray = current == keys[pending]
+            found[pending[hit]] = True
+            probing: np.ndarray = ~hit & (current != 0)
+            pending = pending[probing]
+            slots = (slots[probing] + np.uint64(1)) & np.uint64(self._mask)
+        return found
+
+    def clear(self) -> None:
+        """
+        Removes all the IDs from the index.
+        """
+        self._count = 0
+        self._allocate(3)
+        if self._bloom is not None:
+            self._bloom[:] = bytes(len(self._bloom))
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns all the IDs of the index.
+
+        Returns:
+            np.ndarray: The sorted IDs as an array of uint64.
+        """
+        table: np.ndarray = np.frombuffer(self._table, dtype=np.uint64)
+        return np.sort(table[table != 0]) - np.uint64(1)
+
+    def save(self, file_path: str) -> None:
+        """
+        Saves the IDs of the index to a .npy file (8 bytes per ID).
+
+        Args:
+            file_path (str): The path to the file.
+        """
+        np.save(file_path, self.to_array())
+
+    @classmethod
+    def load(cls, file_path: str, **kwargs) -> "TweetIdIndex":
+        """
+        Creates an index with the IDs saved in a .npy file.
+
+        Args:
+            file_path (str): The path to the file.
+            **kwargs: The arguments of the TweetIdIndex constructor.
+
+        Returns:
+            TweetIdIndex: The loaded index.
+        """
+        return cls(np.load(file_path), **kwargs)
+
+    def _allocate(self, log_size: int) -> None:
+        self._table: array = array("Q", bytes(8 << log_size))
+        self._mask: int = (1 << log_size) - 1
+        self._shift: int = 64 - log_size
+
+    def _grow(self, count: int) -> None:
+        log_size: int = 64 - self._shift
+        while count * MAX_LOAD_DENOMINATOR > (1 << log_size) * MAX_LOAD_NUMERATOR:
+            log_size += 1
+        if log_size == 64 - self._shift:
+            return
+        keys: np.ndarray = np.frombuffer(self._table, dtype=np.uint64)
+        keys = keys[keys != 0].copy()
+        self._allocate(log_size)
+        self._count = 0
+        self._insert_many(keys)
+
+    def _insert_many(self, ids: np.ndarray) -> None:
+        # Inserts unique keys (IDs plus one) in rounds: every round, each key either
+        # finds itself, claims its empty slot (one key per slot), or probes the next slot
+        table: np.ndarray = np.frombuffer(self._table, dtype=np.uint64)
+        slots: np.ndarray = fibonacci_hash(ids, HASH_MULTIPLIER, self._shift)
+        while len(ids):
+            current: np.ndarray = table[slots]
+            empty: np.ndarray = np.flatnonzero(current == 0)
+            _, first = np.unique(slots[empty], return_index=True)
+            winners: np.ndarray = empty[first]
+            table[slots[winners]] = ids[winners]
+            self._count += len(winners)
+
+            done: np.ndarray = current == ids
+            done[winners] = True
+            # IDs which lost an empty slot to another ID check it again next round
+            taken: np.ndarray = (current != 0) & ~done
+            slots = np.where(
+                taken, (slots + np.uint64(1)) & np.uint64(self._mask), slots
+            )
+            ids, slots = ids[~done], slots[~done]
+
+    def _bloom_positions(self, tweet_id: int):
+        for multiplier in BLOOM_MULTIPLIERS:
+            yield ((tweet_id * multiplier) & MASK_64) >> self._bloom_shift
+
+    def _bloom_contains(self, tweet_id: int) -> bool:
+        return all(
+            self._bloom[bit >> 3] & (1 << (bit & 7))
+            for bit in self._bloom_positions(tweet_id)
+        )
+
+    def _bloom_add(self, tweet_id: int) -> None:
+        for bit in self._bloom_positions(tweet_id):
+            self._bloom[bit >> 3] |= 1 << (bit & 7)
+
+    def _bloom_add_many(self, ids: np.ndarray) -> None:
+        bloom: np.ndarray = np.frombuffer(self._bloom, dtype=np.uint8)
+        for multiplier in BLOOM_MULTIPLIERS:
+            bits: np.ndarray = fibonacci_hash(ids, multiplier, self._bloom_shift)
+            np.bitwise_or.at(
+                bloom,
+                (bits >> np.uint64(3)).astype(np.intp),
+                np.left_shift(1, bits & np.uint64(7)).astype(np.uint8),
+            )
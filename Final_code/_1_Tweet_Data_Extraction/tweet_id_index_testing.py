@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+import numpy as np
+from tweet_id_index import TweetIdIndex
+
+# Checks that TweetIdIndex behaves like a set of tweet IDs, with the scalar
+# and the vectorised operations, including the ID 0.
+
+rng = np.random.default_rng(0)
+ids = np.unique(rng.integers(0, 2**63, 50_000, dtype=np.uint64))
+ids = np.concatenate([np.array([0, 1], dtype=np.uint64), ids])
+
+for bloom_bits in (0, 1 << 20):
+    print(f"Starting: 1. Membership like a set (Bloom filter of {bloom_bits} bits)")
+    scalar = TweetIdIndex(bloom_bits=bloom_bits, capacity=8)
+    for tweet_id in ids[::2]:
+        scalar.add(str(tweet_id))
+    vectorised = TweetIdIndex(ids[::2], bloom_bits=bloom_bits)
+    expected = np.zeros(len(ids), dtype=bool)
+    expected[::2] = True
+    for index in (scalar, vectorised):
+        assert len(index) == len(ids[::2]), (
+            f"'1. Membership like a set' failed: expected {len(ids[::2])} IDs, "
+            f"got {len(index)}"
+        )
+        assert np.array_equal(
+            index.contains_many(ids), expected
+        ), "'1. Membership like a set' failed with contains_many"
+        assert [str(tweet_id) in index for tweet_id in ids[:100]] == list(
+            expected[:100]
+        ), "'1. Membership like a set' failed with in"
+        assert np.array_equal(
+            index.to_array(), np.sort(ids[::2])
+        ), "'1. Membership like a set' failed with to_array"
+    print("'1. Membership like a set' passed.")
+    print()
+
+print("Starting: 2. The ID 0")
+index = TweetIdIndex()
+assert "0" not in index and 0 not in index, "'2. The ID 0' failed: 0 in an empty index"
+assert not index.contains_many(
+    np.zeros(3, dtype=np.uint64)
+).any(), "'2. The ID 0' failed: 0 in an empty index with contains_many"
+index.add("0")
+index.add(0)
+index.update(np.zeros(2, dtype=np.uint64))
+assert len(index) == 1, f"'2. The ID 0' failed: expected 1 ID, got {len(index)}"
+assert (
+    "0" in index and index.contains_many(np.array([0], dtype=np.uint64))[0]
+), "'2. The ID 0' failed: 0 not found once added"
+assert (
+    None not in index and "" not in index
+), "'2. The ID 0' failed: a missing ID was found"
+print("'2. The ID 0' passed.")
+print()
+
+print("Starting: 3. Saved and loaded indexes")
+with tempfile.TemporaryDirectory() as folder:
+    file_path = os.path.join(folder, "tweet_ids.npy")
+    TweetIdIndex(ids).save(file_path)
+    loaded = TweetIdIndex.load(file_path)
+assert (
+    len(loaded) == len(ids) and loaded.contains_many(ids).all()
+), "'3. Saved and loaded indexes' failed: the loaded index misses IDs"
+assert np.array_equal(
+    loaded.to_array(), np.sort(ids)
+), "'3. Saved and loaded indexes' failed: the IDs changed"
+print("'3. Saved and loaded indexes' passed.")
+print()
+
+print("All tests passed!")
@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from typing import Any, List, Optional, Tuple
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+import database_utils
+from database_backends import open_backend
+from database_utils import (
+    ARROW_FETCH_SIZE,
+    get_table_dataframe,
+    iterate_dataframes_from_query,
+)
+from viz_constants import DTYPES_TWEETS, QUERY_TWEETS
+
+# Checks that the Arrow reads of SQLite give the same tables as the reads of
+# pandas, with ADBC and with its sqlite3 fallback, on columns which are NULL in
+# the whole first batch of rows, like the sentiment scores before the scoring,
+# and that the chunks of MySQL are streamed, with a stand-in for the server.
+
+
+def tweet_row(i: int, null: bool) -> Tuple[Any, ...]:
+    """
+    Creates a row of the Tweets table, with the nullable columns NULL or not.
+    """
+    return (
+        str(1_000_000 + i),
+        "1",
+        f"text {i}",
+        "en",
+        "2019-05-22 14:15:03+00:00",
+        None if null else "NL",
+        i % 7,
+        i % 5,
+        None if null else i % 2,
+        None if null else str(999_000 + i),
+        0,
+        None if null else str(998_000 + i),
+        0,
+        None if null else 0.25,
+    )
+
+
+def without_adbc(module_name: str) -> Optional[Any]:
+    """
+    import_optional without the ADBC driver, for the sqlite3 fallback.
+    """
+    if module_name == "adbc_driver_sqlite.dbapi":
+        return None
+    return database_utils.import_optional.__wrapped__(module_name)
+
+
+class StreamingCursor:
+    """
+    A stand-in for an unbuffered mysql-connector cursor, reading a SQLite table.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.cursor = connection.cursor()
+        self.fetched: List[int] = []
+
+    @property
+    def description(self) -> Any:
+        return self.cursor.description
+
+    def execute(self, query: str) -> None:
+        self.cursor.execute(query)
+
+    def fetchmany(self, size: int) -> List[Tuple[Any, ...]]:
+        rows: List[Tuple[Any, ...]] = self.cursor.fetchmany(size)
+        self.fetched.append(len(rows))
+        return rows
+
+
+class StreamingConnection:
+    """
+    A stand-in for a MySQL connection, which only has unbuffered cursors.
+    """
+
+    def __init__(self, file_path: str):
+        self.connection = sqlite3.connect(file_path)
+        self.cursors: List[StreamingCursor] = []
+        self.closed: bool = False
+
+    def cursor(self, buffered: bool = True) -> StreamingCursor:
+        assert not buffered, "the MySQL chunks are read by a buffered cursor"
+        self.cursors.append(StreamingCursor(self.connection))
+        return self.cursors[-1]
+
+    def close(self) -> None:
+        self.connection.close()
+        self.closed = True
+
+
+with tempfile.TemporaryDirectory() as directory:
+    connection_params = {"file_path": os.path.join(directory, "arrow.db")}
+    with open_backend(connection_params, True) as backend:
+        backend.create_tables()
+    rows: List[Tuple[Any, ...]] = [
+        tweet_row(i, null=i < ARROW_FETCH_SIZE) for i in range(ARROW_FETCH_SIZE + 10)
+    ]
+    with sqlite3.connect(connection_params["file_path"]) as connection:
+        connection.execute(
+            "INSERT INTO Users VALUES ('1', 0, 1, 1, 1, '2012-01-02 10:00:00+00:00', 1, 0, NULL)"
+        )
+        connection.executemany(
+            f"INSERT INTO Tweets VALUES ({', '.join('?' * len(rows[0]))})", rows
+        )
+
+    print("1. Columns which are NULL in the whole first batch")
+    for profile in ["default", "compact"]:
+        expected: pd.DataFrame = get_table_dataframe(
+            "Tweets", connection_params, True, profile
+        )
+        for reader, patch in [
+            (
+                "ADBC",
+                mock.patch.object(
+                    database_utils,
+                    "import_optional",
+                    wraps=database_utils.import_optional,
+                ),
+            ),
+            (
+                "sqlite3",
+                mock.patch.object(database_utils, "import_optional", without_adbc),
+            ),
+        ]:
+            with patch:
+                result: pd.DataFrame = get_table_dataframe(
+                    "Tweets", connection_params, True, profile, arrow=True
+                )
+            # The Arrow reads have the string[pyarrow] dtype for the "object"
+            # text columns and index, and the "bool" dtype of the default
+            # profile turns NULL into True with pandas only, so the default
+            # profile is compared without it
+            columns: List[str] = [
+                column
+                for column in expected.columns
+                if profile != "default" or column != "possibly_sensitive"
+            ]
+            expected_values = (
+                expected[columns]
+                .astype(object)
+                .where(expected[columns].notna(), None)
+                .set_axis(expected.index.astype(object))
+            )
+            result_values = (
+                result[columns]
+                .astype(object)
+                .where(result[columns].notna(), None)
+                .set_axis(result.index.astype(object))
+            )
+            assert result_values.equals(
+                expected_values
+            ), f"'1. Columns which are NULL in the whole first batch' failed for {profile} with {reader}: expected {expected.tail()}, got {result.tail()}"
+            assert (
+                result["sentiment_score"].iloc[-1] == 0.25
+                and result["country_code"].iloc[-1] == "NL"
+            ), f"'1. Columns which are NULL in the whole first batch' failed for {profile} with {reader}: the values after the first batch are lost"
+    print("'1. Columns which are NULL in the whole first batch' passed.")
+    print()
+
+    print("2. Chunks streamed from MySQL")
+    chunksize: int = ARROW_FETCH_SIZE // 3
+    expected_chunks: List[pd.DataFrame] = list(
+        iterate_dataframes_from_query(
+            QUERY_TWEETS,
+            connection_params,
+            True,
+            chunksize,
+            DTYPES_TWEETS,
+            "tweet_id",
+            ["creation_time"],
+        )
+    )
+    connection = StreamingConnection(connection_params["file_path"])
+    with mock.patch.object(
+        database_utils, "connect_to_database", return_value=connection
+    ):
+        chunks = iterate_dataframes_from_query(
+            QUERY_TWEETS,
+            connection_params,
+            False,
+            chunksize,
+            DTYPES_TWEETS,
+            "tweet_id",
+            ["creation_time"],
+        )
+        first_chunk: pd.DataFrame = next(chunks)
+        assert connection.cursors[0].fetched == [
+            chunksize
+        ], f"'2. Chunks streamed from MySQL' failed: expected one fetch of {chunksize} rows before the first chunk, got {connection.cursors[0].fetched}"
+        result_chunks: List[pd.DataFrame] = [first_chunk, *chunks]
+    assert (
+        connection.closed
+    ), "'2. Chunks streamed from MySQL' failed: the connection is not closed"
+    assert len(result_chunks) == len(
+        expected_chunks
+    ), f"'2. Chunks streamed from MySQL' failed: expected {len(expected_chunks)} chunks, got {len(result_chunks)}"
+    for result, expected in zip(result_chunks, expected_chunks):
+        assert result.dtypes.equals(expected.dtypes) and result.equals(
+            expected
+        ), f"'2. Chunks streamed from MySQL' failed: expected {expected.dtypes} {expected.head()}, got {result.dtypes} {result.head()}"
+    print("'2. Chunks streamed from MySQL' passed.")
+    print()
+
+print("All tests passed!")
@@ -1,9 +1,179 @@
-from datetime import datetime
-from typing import Any, Dict, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The format of the 'created_at' timestamps of the Twitter API,
+# e.g. "Wed Oct 10 20:19:24 +0000 2018"
+TWITTER_TIME_FORMAT: str = "%a %b %d %H:%M:%S %z %Y"
+TWITTER_TIME_LENGTH: int = 30
+WEEKDAYS: Tuple[str, ...] = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTHS: Dict[str, int] = {
+    month: number
+    for number, month in enumerate(
+        "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split(), start=1
+    )
+}
+# Number of distinct user creation timestamps kept by parse_twitter_time_cached
+USER_TIME_CACHE_SIZE: int = 1 << 16
+
+
+def parse_twitter_time(value: str) -> datetime:
+    """
+    Parses a timestamp of the Twitter API, like datetime.strptime with
+    TWITTER_TIME_FORMAT but by slicing the fixed positions of the fields.
+
+    Anything else than the exact Twitter format (e.g. a single-digit day or a
+    lowercase month) is left to datetime.strptime, so the result and the
+    errors are always the ones of datetime.strptime.
+
+    Args:
+        value (str): The timestamp, e.g. "Wed Oct 10 20:19:24 +0000 2018".
+
+    Returns:
+        datetime: The timestamp, with the time zone of the offset.
+
+    Raises:
+        ValueError: If the value does not match TWITTER_TIME_FORMAT.
+    """
+    if (
+        len(value) == TWITTER_TIME_LENGTH
+        and value.isascii()
+        and value[3] == value[7] == value[10] == value[19] == value[25] == " "
+        and value[13] == value[16] == ":"
+        and value[20] in "+-"
+        and value[23] in "012345"
+        and value[:3] in WEEKDAYS
+        and value[4:7] in MONTHS
+        and (
+            value[8:10] + value[11:13] + value[14:16] + value[17:19] + value[21:25]
+        ).isdigit()
+        and value[26:30].isdigit()
+    ):
+        offset: int = int(value[21:23]) * 60 + int(value[23:25])
+        try:
+            return datetime(
+                int(value[26:30]),
+                MONTHS[value[4:7]],
+                int(value[8:10]),
+                int(value[11:13]),
+                int(value[14:16]),
+                int(value[17:19]),
+                tzinfo=(
+                    timezone.utc
+                    if offset == 0
+                    else timezone(
+                        timedelta(minutes=-offset if value[20] == "-" else offset)
+                    )
+                ),
+            )
+        except ValueError:  # e.g. February 30, with the error of strptime below
+            pass
+    return datetime.strptime(value, TWITTER_TIME_FORMAT)
+
+
+@lru_cache(maxsize=USER_TIME_CACHE_SIZE)
+def parse_twitter_time_cached(value: str) -> datetime:
+    """
+    Memoised parse_twitter_time, for the user creation timestamps which are
+    repeated for every tweet of the user.
+
+    Args:
+        value (str): The timestamp, e.g. "Wed Oct 10 20:19:24 +0000 2018".
+
+    Returns:
+        datetime: The timestamp, with the time zone of the offset.
+    """
+    return parse_twitter_time(value)
+
+
+def parse_twitter_time_column(values: Sequence[Optional[str]]) -> np.ndarray:
+    """
+    Parses a whole column of Twitter timestamps at once, on the bytes of the
+    fixed positions of the fields.
+
+    Values which are not exactly in the Twitter format are parsed one by one
+    with parse_twitter_time.
+
+    Args:
+        values (Sequence[Optional[str]]): The timestamps, None or "" for missing ones.
+
+    Returns:
+        np.ndarray: The timestamps in UTC as datetime64[s], NaT for the missing ones.
+
+    Raises:
+        ValueError: If a value does not match TWITTER_TIME_FORMAT.
+    """
+    strings: np.ndarray = np.asarray(values, dtype=object)
+    result: np.ndarray = np.full(len(strings), np.datetime64("NaT"), "datetime64[s]")
+    present: np.ndarray = np.flatnonzero(strings.astype(bool))
+    if len(present) == 0:
+        return result
+
+    # One row of bytes per timestamp, one byte longer to detect longer values
+    encoded: np.ndarray = np.char.encode(strings[present].astype(str), "utf-8")
+    chars: np.ndarray = (
+        encoded.astype(f"S{TWITTER_TIME_LENGTH + 1}")
+        .view(np.uint8)
+        .reshape(len(present), -1)
+        .astype(np.int64)
+    )
+
+    def number(start: int, end: int) -> np.ndarray:
+        return (chars[:, start:end] - ord("0")) @ 10 ** np.arange(end - start)[::-1]
+
+    def name_code(start: int) -> np.ndarray:
+        return chars[:, start] << 16 | chars[:, start + 1] << 8 | chars[:, start + 2]
+
+    def name_codes(names: Sequence[str]) -> np.ndarray:
+        return np.array([int.from_bytes(name.encode(), "big") for name in names])
+
+    is_month: np.ndarray = name_code(4)[:, None] == name_codes(list(MONTHS))
+    year, month, day = number(26, 30), np.argmax(is_month, axis=1) + 1, number(8, 10)
+    hour, minute, second = number(11, 13), number(14, 16), number(17, 19)
+    offset: np.ndarray = (number(21, 23) * 60 + number(23, 25)) * np.where(
+        chars[:, 20] == ord("-"), -1, 1
+    )
+    months: np.ndarray = (year - 1970).astype("datetime64[Y]").astype(
+        "datetime64[M]"
+    ) + (month - 1)
+    dates: np.ndarray = months.astype("datetime64[D]") + (day - 1)
+    digits: np.ndarray = chars[
+        :, [8, 9, 11, 12, 14, 15, 17, 18, *range(21, 25), *range(26, 30)]
+    ]
+    valid: np.ndarray = (
+        (chars[:, TWITTER_TIME_LENGTH - 1] != 0)
+        & (chars[:, TWITTER_TIME_LENGTH] == 0)
+        & np.all(chars[:, [3, 7, 10, 19, 25]] == ord(" "), axis=1)
+        & np.all(chars[:, [13, 16]] == ord(":"), axis=1)
+        & np.isin(chars[:, 20], [ord("+"), ord("-")])
+        & np.all((digits >= ord("0")) & (digits <= ord("9")), axis=1)
+        & np.isin(name_code(0), name_codes(WEEKDAYS))
+        & np.any(is_month, axis=1)
+        & (year >= 1)
+        & (day >= 1)
+        # No day after the end of the month, e.g. February 30
+        & (dates.astype("datetime64[M]") == months)
+        & (hour < 24)
+        & (minute < 60)
+        & (second < 60)
+        & (chars[:, 23] <= ord("5"))
+        & (np.abs(offset) < 24 * 60)
+    )
+    result[present] = dates.astype("datetime64[s]") + (
+        hour * 3600 + minute * 60 + second - offset * 60
+    )
+    for row in present[~valid]:
+        parsed: datetime = parse_twitter_time(strings[row])
+        result[row] = np.datetime64(
+            parsed.astimezone(timezone.utc).replace(tzinfo=None), "s"
+        )
+    return result
 
 
 def process_json_object(
-    dict_: Dict[str, Dict[str, Any]]
+    dict_: Dict[str, Dict[str, Any]],
 ) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
     """
     Processes a dictionary containing user and tweet data and extracts relevant information for database insertion.
@@ -24,11 +194,7 @@ def process_json_object(
         user["followers_count"],
         user["friends_count"],
         user["statuses_count"],
-        (
-            datetime.strptime(user["created_at"], "%a %b %d %H:%M:%S %z %Y")
-            if user["created_at"]
-            else None
-        ),
+        (parse_twitter_time_cached(user["created_at"]) if user["created_at"] else None),
         user["default_profile"],
         user["default_profile_image"],
     )
@@ -39,7 +205,7 @@ def process_json_object(
         tweet["text"],
         tweet["lang"],
         (
-            datetime.strptime(tweet["creation_time"], "%a %b %d %H:%M:%S %z %Y")
+            parse_twitter_time(tweet["creation_time"])
             if tweet["creation_time"]
             else None
         ),
@@ -54,3 +220,60 @@ def process_json_object(
     )
 
     return user_data, tweet_data
+
+
+def reduce_user_snapshots(
+    user_data: List[Tuple[Any, ...]], tweet_data: List[Tuple[Any, ...]]
+) -> List[Tuple[Any, ...]]:
+    """
+    Keeps the newest snapshot of every user of a batch, i.e. the user data of
+    their most recent tweet (the first one for equal or missing creation times).
+
+    Args:
+        user_data (List[Tuple[Any, ...]]): The user rows, one per tweet.
+        tweet_data (List[Tuple[Any, ...]]): The tweet rows, in the same order.
+
+    Returns:
+        List[Tuple[Any, ...]]: One user row per user, with the creation time
+            of the tweet as the snapshot_time column at the end.
+    """
+    latest: Dict[str, Tuple[Any, ...]] = {}
+    for user, tweet in zip(user_data, tweet_data):
+        snapshot_time: Optional[datetime] = tweet[4]
+        kept: Optional[Tuple[Any, ...]] = latest.get(user[0])
+        if kept is None or (
+            snapshot_time is not None and (kept[-1] is None or snapshot_time > kept[-1])
+        ):
+            latest[user[0]] = (*user, snapshot_time)
+    return list(latest.values())
+
+
+def convert_ids_to_integers(
+    user_data: List[Tuple[Any, ...]], tweet_data: List[Tuple[Any, ...]]
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
+    """
+    Converts the tweet and user IDs of the rows to integers, for the tables
+    with integer IDs (see the Integer IDs queries).
+
+    Args:
+        user_data (List[Tuple[Any, ...]]): The user rows.
+        tweet_data (List[Tuple[Any, ...]]): The tweet rows.
+
+    Returns:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet
+            rows, with the IDs as integers and the missing ones as None.
+    """
+    users: List[Tuple[Any, ...]] = [(int(user[0]), *user[1:]) for user in user_data]
+    tweets: List[Tuple[Any, ...]] = [
+        (
+            int(tweet[0]),
+            int(tweet[1]),
+            *tweet[2:9],
+            None if tweet[9] is None else int(tweet[9]),
+            tweet[10],
+            None if tweet[11] is None else int(tweet[11]),
+            tweet[12],
+        )
+        for tweet in tweet_data
+    ]
+    return users, tweets
@@ -0,0 +1,645 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from helper_functions import (
+    TWITTER_TIME_FORMAT,
+    convert_ids_to_integers,
+    parse_twitter_time,
+    parse_twitter_time_cached,
+    parse_twitter_time_column,
+)
+from insert_to_db import (
+    bulk_insert_batches,
+    create_db,
+    insert_batches,
+    iterate_json_batches,
+    iterate_json_batches_pipelined,
+)
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+from database_backends import MysqlBackend, SqliteBackend, open_backend
+from database_queries import INDEXED_QUERIES, SECONDARY_INDEXES
+from database_utils import (
+    connection_pool,
+    form_connection_params,
+    get_arrow_dataframe_from_query,
+    get_dataframe_from_query,
+    iterate_dataframes_from_query,
+)
+from json_codec import dumps
+from viz_constants import (
+    DTYPES_REPLY_INTEGER_IDS,
+    DTYPES_TWEETS,
+    DTYPES_TWEETS_INTEGER_IDS,
+    DTYPES_USERS,
+    QUERY_REPLY,
+    QUERY_TWEETS,
+    QUERY_USERS,
+)
+
+# This is a script benchmarking the insertion of the cleaned tweets into the
+# database on synthetic rows:
+# - `python insert_benchmark.py sqlite --millions 2` compares the rows/s of
+#   committing every batch into the keyed SQLite tables against the bulk load
+#   through staging tables in a single transaction.
+# - `python insert_benchmark.py pipeline --millions 2 --workers 3` compares the
+#   tweets/s of converting the cleaned JSON file in the main process against
+#   converting it on worker processes while the database is written.
+# - `python insert_benchmark.py timestamps --millions 1` compares the
+#   timestamps/s of datetime.strptime against the Twitter timestamp parsers.
+# - `python insert_benchmark.py integer-ids --millions 1` compares the SQLite
+#   tables with text and with integer IDs: the size of the database, the time
+#   of the QUERY_REPLY join and the memory of the Tweets DataFrame.
+# - `python insert_benchmark.py indexes --millions 1` times the hot queries of
+#   INDEXED_QUERIES on SQLite before and after the secondary indexes are
+#   created, and checks with their plans that they use their index.
+# - `python insert_benchmark.py reads --millions 1` compares the time and peak
+#   memory of reading the Tweets and Users tables like the EDA notebooks with
+#   get_dataframe_from_query, get_arrow_dataframe_from_query and chunks of
+#   iterate_dataframes_from_query (counted by language, without keeping them).
+# - `python insert_benchmark.py connections --millions 0.2 --batch-size 10000`
+#   compares the time per batch of updates (like the sentiment scores) with a
+#   new connection per batch against the connection pool, on SQLite, and with
+#   `--mysql` on the MySQL server of the environment variables as well (e.g. a
+#   local server), in a scratch table dropped afterwards.
+
+
+def synthetic_rows(
+    n_tweets: int, seed: int = 0
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
+    """
+    Creates user and tweet rows like the ones of process_json_object.
+
+    The tweet IDs are shuffled, like the quoted and retweeted tweets of the raw
+    files, and every user has about 10 tweets.
+
+    Args:
+        n_tweets (int): The number of tweets.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows.
+    """
+    random = Random(seed)
+    tweet_ids: List[int] = list(range(n_tweets))
+    random.shuffle(tweet_ids)
+    start = datetime(2019, 5, 22, tzinfo=timezone.utc)
+    user_rows: List[Tuple[Any, ...]] = []
+    tweet_rows: List[Tuple[Any, ...]] = []
+    for i in tweet_ids:
+        user_id: str = str(10**9 + random.randrange(max(n_tweets // 10, 1)))
+        user_rows.append(
+            (user_id, 0, i % 5000, 300, 10_000, start - timedelta(days=3000), 0, 0)
+        )
+        tweet_rows.append(
+            (
+                str(1_130_000_000_000_000_000 + i),
+                user_id,
+                f"@KLM synthetic tweet number {i} about a delayed flight",
+                "en",
+                start + timedelta(seconds=i),
+                "NL",
+                i % 7,
+                i % 3,
+                0,
+                str(1_130_000_000_000_000_000 + i - 1) if i % 4 == 0 else None,
+                0,
+                None,
+                0,
+            )
+        )
+    return user_rows, tweet_rows
+
+
+def iterate_batches(
+    user_rows: List[Tuple[Any, ...]],
+    tweet_rows: List[Tuple[Any, ...]],
+    batch_size: int,
+) -> Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]:
+    """
+    Splits the rows into batches, like the batch iterators of insert_to_db.
+
+    Args:
+        user_rows (List[Tuple[Any, ...]]): The user rows.
+        tweet_rows (List[Tuple[Any, ...]]): The tweet rows.
+        batch_size (int): The number of rows per batch.
+
+    Yields:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows of a batch.
+    """
+    for start in range(0, len(tweet_rows), batch_size):
+        yield (
+            user_rows[start : start + batch_size],
+            tweet_rows[start : start + batch_size],
+        )
+
+
+def benchmark_sqlite(millions: float, batch_size: int) -> None:
+    """
+    Compares the rows/s of the batch insertion and of the bulk load into SQLite.
+
+    Args:
+        millions (float): The number of tweets, in millions.
+        batch_size (int): The number of rows per batch.
+    """
+    user_rows, tweet_rows = synthetic_rows(int(millions * 1_000_000))
+    print(f"Synthetic data: {len(tweet_rows):,} tweets")
+
+    loaders: Dict[str, Callable[[Dict[str, Any], Iterator], None]] = {
+        "batch commits": lambda params, batches: insert_batches(params, True, batches),
+        "bulk load": lambda params, batches: bulk_insert_batches(params, True, batches),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, load in loaders.items():
+            connection_params: Dict[str, Any] = {
+                "file_path": os.path.join(directory, f"{name}.db")
+            }
+            create_db(connection_params, local=True)
+            start: float = time.perf_counter()
+            load(connection_params, iterate_batches(user_rows, tweet_rows, batch_size))
+            elapsed: float = time.perf_counter() - start
+            size_mb: float = os.path.getsize(connection_params["file_path"]) / 1024**2
+            print(
+                f"{name:>13}: {len(tweet_rows) / elapsed:10,.0f} tweets/s "
+                f"({elapsed:.1f} s, database of {size_mb:.0f} MB)"
+            )
+
+
+def write_cleaned_file(file_path: str, n_tweets: int) -> None:
+    """
+    Writes synthetic tweets in the format of the cleaned JSON file.
+
+    Args:
+        file_path (str): The path to the file.
+        n_tweets (int): The number of tweets.
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        for i in range(n_tweets):
+            cleaned_tweet: Dict[str, Dict[str, Any]] = {
+                "user": {
+                    "user_id": str(10**9 + i % max(n_tweets // 10, 1)),
+                    "verified": False,
+                    "followers_count": i % 5000,
+                    "friends_count": 300,
+                    "statuses_count": 10_000,
+                    "created_at": "Mon Jan 02 10:00:00 +0000 2012",
+                    "default_profile": 0,
+                    "default_profile_image": 0,
+                },
+                "tweet": {
+                    "tweet_id": str(1_130_000_000_000_000_000 + i),
+                    "text": f"@KLM synthetic tweet number {i} about a delayed flight",
+                    "lang": "en",
+                    "creation_time": "Wed May 22 14:15:03 +0000 2019",
+                    "country_code": "NL",
+                    "favorite_count": i % 7,
+                    "retweet_count": i % 3,
+                    "reply_count": 0,
+                    "possibly_sensitive": False,
+                    "replied_tweet_id": None,
+                    "replied_count": 0,
+                    "quoted_status_id": None,
+                    "quote_count": 0,
+                },
+            }
+            file.write(dumps(cleaned_tweet) + ",\n")
+
+
+def benchmark_pipeline(millions: float, batch_size: int, workers: int) -> None:
+    """
+    Compares the tweets/s of the insertion with the JSON batches converted in
+    the main process and on worker processes.
+
+    Args:
+        millions (float): The number of tweets, in millions.
+        batch_size (int): The number of rows per batch.
+        workers (int): The number of worker processes.
+    """
+    n_tweets: int = int(millions * 1_000_000)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path: str = os.path.join(directory, "cleaned_tweets.json")
+        write_cleaned_file(file_path, n_tweets)
+        print(f"Synthetic data: {n_tweets:,} tweets")
+
+        readers: Dict[str, Callable[[], Iterator]] = {
+            "main process": lambda: iterate_json_batches(batch_size, file_path),
+            f"{workers} workers": lambda: iterate_json_batches_pipelined(
+                batch_size, workers, 2, file_path
+            ),
+        }
+        for name, read in readers.items():
+            connection_params: Dict[str, Any] = {
+                "file_path": os.path.join(directory, f"{name}.db")
+            }
+            create_db(connection_params, local=True)
+            start: float = time.perf_counter()
+            bulk_insert_batches(connection_params, True, read())
+            elapsed: float = time.perf_counter() - start
+            print(f"{name:>13}: {n_tweets / elapsed:10,.0f} tweets/s ({elapsed:.1f} s)")
+
+
+def benchmark_timestamps(millions: float) -> None:
+    """
+    Compares the timestamps/s of datetime.strptime and of the Twitter
+    timestamp parsers, on distinct tweet timestamps and on user creation
+    timestamps repeated for about 10 tweets per user.
+
+    Args:
+        millions (float): The number of timestamps, in millions.
+    """
+    n_values: int = int(millions * 1_000_000)
+    random = Random(0)
+    start = datetime(2019, 5, 22, tzinfo=timezone.utc)
+    tweet_times: List[str] = [
+        (start + timedelta(seconds=i)).strftime("%a %b %d %H:%M:%S +0000 %Y")
+        for i in range(n_values)
+    ]
+    user_times: List[str] = [
+        tweet_times[random.randrange(max(n_values // 10, 1))] for _ in range(n_values)
+    ]
+    print(f"Synthetic data: {n_values:,} timestamps")
+
+    parsers: Dict[str, Callable[[List[str]], Any]] = {
+        "strptime": lambda values: [
+            datetime.strptime(value, TWITTER_TIME_FORMAT) for value in values
+        ],
+        "parse_twitter_time": lambda values: [
+            parse_twitter_time(value) for value in values
+        ],
+        "cached": lambda values: [parse_twitter_time_cached(value) for value in values],
+        "column": parse_twitter_time_column,
+    }
+    for values_name, values in [("tweets", tweet_times), ("users", user_times)]:
+        for name, parse in parsers.items():
+            parse_twitter_time_cached.cache_clear()
+            start_time: float = time.perf_counter()
+            parse(values)
+            elapsed: float = time.perf_counter() - start_time
+            print(
+                f"{values_name:>6} {name:>18}: {n_values / elapsed:12,.0f} timestamps/s"
+            )
+
+
+def benchmark_integer_ids(millions: float, batch_size: int) -> None:
+    """
+    Compares the SQLite tables with text IDs and with integer IDs, on the
+    size of the database, the time of the QUERY_REPLY join (alone and read
+    into a DataFrame) and the memory of the Tweets DataFrame.
+
+    Args:
+        millions (float): The number of tweets, in millions.
+        batch_size (int): The number of rows per batch.
+    """
+    user_rows, tweet_rows = synthetic_rows(int(millions * 1_000_000))
+    print(f"Synthetic data: {len(tweet_rows):,} tweets")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for integer_ids in (False, True):
+            name: str = "integer IDs" if integer_ids else "text IDs"
+            connection_params: Dict[str, Any] = {
+                "file_path": os.path.join(directory, f"{name}.db")
+            }
+            create_db(connection_params, True, integer_ids)
+            batches = iterate_batches(user_rows, tweet_rows, batch_size)
+            if integer_ids:
+                batches = (convert_ids_to_integers(*batch) for batch in batches)
+            bulk_insert_batches(connection_params, True, batches)
+            size_mb: float = os.path.getsize(connection_params["file_path"]) / 1024**2
+
+            with sqlite3.connect(connection_params["file_path"]) as connection:
+                start: float = time.perf_counter()
+                connection.execute(
+                    f"SELECT count(*) FROM ({QUERY_REPLY.rstrip().rstrip(';')})"
+                ).fetchone()
+                join_time: float = time.perf_counter() - start
+            connection.close()
+
+            start = time.perf_counter()
+            get_dataframe_from_query(
+                QUERY_REPLY,
+                connection_params,
+                True,
+                DTYPES_REPLY_INTEGER_IDS if integer_ids else None,
+                "tweet_id",
+            )
+            reply_time: float = time.perf_counter() - start
+
+            df_tweets = get_dataframe_from_query(
+                QUERY_TWEETS,
+                connection_params,
+                True,
+                DTYPES_TWEETS_INTEGER_IDS if integer_ids else DTYPES_TWEETS,
+                "tweet_id",
+                parse_dates=["creation_time"],
+            )
+            memory_mb: float = df_tweets.memory_usage(deep=True).sum() / 1024**2
+            print(
+                f"{name:>11}: database of {size_mb:6.1f} MB, join in {join_time:6.3f} s, "
+                f"QUERY_REPLY DataFrame in {reply_time:6.3f} s, "
+                f"Tweets DataFrame of {memory_mb:6.1f} MB"
+            )
+
+
+def benchmark_indexes(millions: float, batch_size: int) -> None:
+    """
+    Times the hot queries of INDEXED_QUERIES on SQLite without and with the
+    secondary indexes, and checks with the query plans that every query uses
+    its index. 90% of the tweets have a sentiment score and a third of them
+    are in a categorised conversation, like a database after the later stages.
+
+    Args:
+        millions (float): The number of tweets, in millions.
+        batch_size (int): The number of rows per batch.
+    """
+    user_rows, tweet_rows = synthetic_rows(int(millions * 1_000_000))
+    print(f"Synthetic data: {len(tweet_rows):,} tweets")
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection_params: Dict[str, Any] = {
+            "file_path": os.path.join(directory, "indexes.db")
+        }
+        create_db(connection_params, local=True)
+        bulk_insert_batches(
+            connection_params, True, iterate_batches(user_rows, tweet_rows, batch_size)
+        )
+        with open_backend(connection_params, True) as backend:
+            # CONCAT of the category texts is built into SQLite from 3.44
+            if sqlite3.sqlite_version_info < (3, 44):
+                backend.connection.create_function(
+                    "CONCAT",
+                    -1,
+                    lambda *texts: "".join(
+                        str(text) for text in texts if text is not None
+                    ),
+                )
+            backend.execute_queries(
+                [
+                    "UPDATE Tweets SET sentiment_score = 0.5 WHERE rowid % 10 != 0",
+                    # Conversations of three tweets
+                    "INSERT INTO Conversations SELECT rowid / 9, rowid / 3 % 3, "
+                    "tweet_id FROM Tweets WHERE rowid % 3 = 0",
+                    "INSERT INTO ConversationsCategory SELECT DISTINCT "
+                    "conversation_id, 'Booking' FROM Conversations",
+                ]
+            )
+
+            def time_queries() -> Dict[str, float]:
+                times: Dict[str, float] = {}
+                for name, (query, _) in INDEXED_QUERIES.items():
+                    start: float = time.perf_counter()
+                    backend.execute(query).fetchall()
+                    times[name] = time.perf_counter() - start
+                return times
+
+            before: Dict[str, float] = time_queries()
+            start: float = time.perf_counter()
+            backend.create_indexes()
+            print(
+                f"{len(SECONDARY_INDEXES)} indexes created in "
+                f"{time.perf_counter() - start:.2f} s"
+            )
+            after: Dict[str, float] = time_queries()
+            uses_index: Dict[str, bool] = backend.check_indexed_queries()
+
+    for name, (_, index) in INDEXED_QUERIES.items():
+        print(
+            f"{name:>27}: {before[name]:8.4f} s without indexes, "
+            f"{after[name]:8.4f} s with "
+            + (
+                f"{index} ({'used' if uses_index[name] else 'NOT USED'})"
+                if index
+                else "the primary keys only"
+            )
+        )
+    assert all(uses_index.values()), "A hot query does not use its index"
+
+
+def measure_read(
+    read: str, connection_params: Dict[str, Any]
+) -> Tuple[float, float, Dict[str, int]]:
+    """
+    Reads the Tweets and Users tables like the EDA notebooks, in a new process
+    so that its peak memory is the one of the read.
+
+    Args:
+        read (str): "pandas", "arrow" or "chunks", see benchmark_reads.
+        connection_params (Dict[str, Any]): The parameters of the SQLite database.
+
+    Returns:
+        Tuple[float, float, Dict[str, int]]: The time of the read in seconds,
+            the peak memory of the process in MB and the number of rows read
+            from every table.
+    """
+    start: float = time.perf_counter()
+    if read == "chunks":
+        language_counts = sum(
+            chunk["lang"].value_counts()
+            for chunk in iterate_dataframes_from_query(
+                QUERY_TWEETS,
+                connection_params,
+                True,
+                100_000,
+                DTYPES_TWEETS,
+                "tweet_id",
+                parse_dates=["creation_time"],
+            )
+        )
+        n_rows: Dict[str, int] = {"Tweets": int(language_counts.sum())}
+    else:
+        get_dataframe = (
+            get_arrow_dataframe_from_query
+            if read == "arrow"
+            else get_dataframe_from_query
+        )
+        df_users = get_dataframe(
+            QUERY_USERS,
+            connection_params,
+            True,
+            DTYPES_USERS,
+            "user_id",
+            parse_dates=["creation_time", "snapshot_time"],
+        )
+        df_tweets = get_dataframe(
+            QUERY_TWEETS,
+            connection_params,
+            True,
+            DTYPES_TWEETS,
+            "tweet_id",
+            parse_dates=["creation_time"],
+        )
+        n_rows = {"Tweets": len(df_tweets), "Users": len(df_users)}
+    elapsed: float = time.perf_counter() - start
+    # The peak resident memory of the process, in kB (Linux only)
+    with open("/proc/self/status") as file:
+        peak_kb: int = next(
+            int(line.split()[1]) for line in file if line.startswith("VmHWM:")
+        )
+    return elapsed, peak_kb / 1024, n_rows
+
+
+def benchmark_reads(millions: float, batch_size: int) -> None:
+    """
+    Compares the time and peak memory of reading the Tweets and Users tables
+    of a SQLite database like the EDA notebooks: all at once with
+    get_dataframe_from_query and get_arrow_dataframe_from_query, and in chunks
+    of iterate_dataframes_from_query, counted by language without being kept.
+    Every read must return all the rows of the tables.
+
+    Args:
+        millions (float): The number of tweets, in millions.
+        batch_size (int): The number of rows per batch.
+    """
+    user_rows, tweet_rows = synthetic_rows(int(millions * 1_000_000))
+    print(f"Synthetic data: {len(tweet_rows):,} tweets")
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection_params: Dict[str, Any] = {
+            "file_path": os.path.join(directory, "reads.db")
+        }
+        create_db(connection_params, local=True)
+        bulk_insert_batches(
+            connection_params, True, iterate_batches(user_rows, tweet_rows, batch_size)
+        )
+        expected_rows: Dict[str, int] = {
+            "Tweets": len(tweet_rows),
+            "Users": len({row[0] for row in user_rows}),
+        }
+        del user_rows, tweet_rows
+        for read in ("pandas", "arrow", "chunks"):
+            # A spawned process, which does not share the memory of this one
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                elapsed, peak_mb, n_rows = executor.submit(
+                    measure_read, read, connection_params
+                ).result()
+            print(f"{read:>6}: {elapsed:6.2f} s, peak memory of {peak_mb:6.0f} MB")
+            assert all(
+                n_rows[table] == expected_rows[table] for table in n_rows
+            ), f"The {read} read returned {n_rows} rows instead of {expected_rows}"
+
+
+def benchmark_connections(millions: float, batch_size: int, mysql: bool) -> None:
+    """
+    Compares the time per batch of updates like update_sentiment_scores, which
+    opens a backend for every batch, with a new connection per batch and with
+    the connection pool. The rows are written to a scratch table, which is
+    dropped afterwards.
+
+    Args:
+        millions (float): The number of updated rows, in millions.
+        batch_size (int): The number of rows per batch.
+        mysql (bool): Whether to benchmark the MySQL server of the environment
+            variables as well.
+    """
+    n_rows: int = int(millions * 1_000_000)
+    batches: List[List[Tuple[float, int]]] = [
+        [(0.5, row) for row in range(start, min(start + batch_size, n_rows))]
+        for start in range(0, n_rows, batch_size)
+    ]
+    print(f"{len(batches):,} batches of {batch_size:,} updated rows")
+
+    with tempfile.TemporaryDirectory() as directory:
+        databases: Dict[str, Tuple[type, Dict[str, Any]]] = {
+            "SQLite": (
+                SqliteBackend,
+                {"file_path": os.path.join(directory, "connections.db")},
+            )
+        }
+        if mysql:
+            databases["MySQL"] = (MysqlBackend, form_connection_params(local=False))
+        for database, (backend_class, connection_params) in databases.items():
+            with backend_class(connection_params) as backend:
+                backend.execute_queries(
+                    [
+                        "DROP TABLE IF EXISTS ConnectionBenchmark",
+                        "CREATE TABLE ConnectionBenchmark(id INTEGER PRIMARY KEY, value REAL)",
+                        (
+                            "INSERT INTO ConnectionBenchmark(id) VALUES (?)",
+                            [(row,) for row in range(n_rows)],
+                        ),
+                    ]
+                )
+            for pooled in (False, True):
+                start: float = time.perf_counter()
+                for batch in batches:
+                    with backend_class(connection_params, pooled) as backend:
+                        backend.update_rows("ConnectionBenchmark", "value", "id", batch)
+                per_batch: float = (time.perf_counter() - start) / len(batches)
+                start = time.perf_counter()
+                for _ in batches:
+                    with backend_class(connection_params, pooled) as backend:
+                        pass
+                connect_time: float = (time.perf_counter() - start) / len(batches)
+                name: str = "pooled" if pooled else "new connection"
+                print(
+                    f"{database:>6}, {name:>14}: {per_batch * 1000:8.2f} ms per batch, "
+                    f"of which {connect_time * 1000:8.3f} ms to connect and disconnect"
+                )
+            with backend_class(connection_params) as backend:
+                backend.execute_queries(["DROP TABLE IF EXISTS ConnectionBenchmark"])
+        connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the database insertion.")
+    parser.add_argument(
+        "benchmark",
+        choices=[
+            "sqlite",
+            "pipeline",
+            "timestamps",
+            "integer-ids",
+            "indexes",
+            "reads",
+            "connections",
+        ],
+    )
+    parser.add_argument(
+        "--millions", type=float, default=2.0, help="Number of synthetic tweets."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100_000, help="Number of rows per batch."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=3,
+        help="Number of processes of the pipeline benchmark.",
+    )
+    parser.add_argument(
+        "--mysql",
+        action="store_true",
+        help="Run the connections benchmark on the MySQL server as well.",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark == "sqlite":
+        benchmark_sqlite(args.millions, args.batch_size)
+    elif args.benchmark == "pipeline":
+        benchmark_pipeline(args.millions, args.batch_size, args.workers)
+    elif args.benchmark == "timestamps":
+        benchmark_timestamps(args.millions)
+    elif args.benchmark == "integer-ids":
+        benchmark_integer_ids(args.millions, args.batch_size)
+    elif args.benchmark == "indexes":
+        benchmark_indexes(args.millions, args.batch_size)
+    elif args.benchmark == "reads":
+        benchmark_reads(args.millions, args.batch_size)
+    else:
+        benchmark_connections(args.millions, args.batch_size, args.mysql)
@@ -1,9 +1,16 @@
-import json
 import os
 import sys
-from typing import Any, Dict, List, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Tuple, Union
 
-from helper_functions import process_json_object
+from helper_functions import (
+    convert_ids_to_integers,
+    process_json_object,
+    reduce_user_snapshots,
+)
 from tqdm.auto import tqdm
 
 sys.path.append(
@@ -13,114 +20,546 @@ sys.path.append(
     )
 )
 
+from database_backends import open_backend
 from database_queries import *
-from database_utils import connect_to_database, execute_queries, form_connection_params
-from defined_paths import path_processed_tweets_json
+from database_utils import form_connection_params, split_into_batches
+from defined_paths import path_processed_tweets_json, path_processed_tweets_parquet
+from json_codec import loads
+from parquet_utils import iterate_parts, table_to_rows
 
 
-def create_db(connection_params: Dict[str, Any], local: bool) -> None:
+def create_db(
+    connection_params: Dict[str, Any], local: bool, integer_ids: bool = False
+) -> None:
     """
     Creates database tables for storing user and tweet data based on the connection parameters and database type.
 
     Args:
         connection_params (Dict[str, Any]): The parameters required to establish a database connection.
-        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+        local (bool): Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
+        integer_ids (bool, optional): Whether the tweet and user IDs are stored
+            as integers instead of text (see the Integer IDs queries). Defaults to False.
+
+    Returns:
+        None
+    """
+    with open_backend(connection_params, local) as backend:
+        backend.create_tables(integer_ids)
+
+
+def convert_json_lines(
+    lines: List[Union[str, bytes]],
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
+    """
+    Converts lines of the cleaned JSON file to user and tweet rows.
+
+    Args:
+        lines (List[Union[str, bytes]]): The lines, one cleaned tweet per line.
+
+    Returns:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows.
+    """
+    user_data: List[Tuple[Any, ...]] = []
+    tweet_data: List[Tuple[Any, ...]] = []
+    for line in lines:
+        # Without the newline (\r\n for files read in binary on Windows) and the comma
+        tweet_dict: Dict[str, Any] = loads(line.rstrip()[:-1])
+        if data := process_json_object(tweet_dict):
+            user_data.append(data[0])
+            tweet_data.append(data[1])
+    return user_data, tweet_data
+
+
+def convert_json_chunk(
+    chunk: Tuple[List[bytes], int, int],
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]], int, int]:
+    """
+    Converts a chunk of iterate_json_chunks to user and tweet rows, keeping its position.
+
+    Args:
+        chunk (Tuple[List[bytes], int, int]): The lines, and the byte offset and
+            line number after them.
+
+    Returns:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]], int, int]: The user and
+            tweet rows, and the byte offset and line number after them.
+    """
+    lines, byte_offset, line_number = chunk
+    return (*convert_json_lines(lines), byte_offset, line_number)
+
+
+def iterate_json_chunks(
+    batch_size: int,
+    file_path: str = path_processed_tweets_json,
+    byte_offset: int = 0,
+    line_number: int = 0,
+) -> Iterator[Tuple[List[bytes], int, int]]:
+    """
+    Lazily reads chunks of lines of the cleaned JSON file, with their position.
+
+    Args:
+        batch_size (int): The number of lines per chunk.
+        file_path (str, optional): The path to the cleaned JSON file.
+            Defaults to path_processed_tweets_json.
+        byte_offset (int, optional): The byte offset of the first line to read,
+            the start of a line. Defaults to 0.
+        line_number (int, optional): The number of lines before byte_offset. Defaults to 0.
+
+    Yields:
+        Tuple[List[bytes], int, int]: The lines, and the byte offset and line
+            number after them.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(byte_offset)
+        for lines in split_into_batches(file, batch_size):
+            byte_offset += sum(map(len, lines))
+            line_number += len(lines)
+            yield lines, byte_offset, line_number
+
+
+def map_in_workers(
+    function: Callable[[Any], Any],
+    items: Iterator[Any],
+    workers: int,
+    queue_depth: int,
+) -> Iterator[Any]:
+    """
+    Lazily applies a function to items on worker processes, while the caller
+    uses the previous results.
+
+    The results are yielded in the order of the items. At most workers +
+    queue_depth items are taken ahead: a new one is only sent to the workers
+    when the caller takes a result, so a slow caller also slows down the
+    reading of the items. When the iteration stops early (e.g. on a database
+    error), the items not started yet are cancelled and the running ones are
+    awaited.
+
+    Args:
+        function (Callable[[Any], Any]): A module-level function, sent to the workers.
+        items (Iterator[Any]): The items.
+        workers (int): The number of worker processes.
+        queue_depth (int): The number of results which may wait for the caller.
+
+    Yields:
+        Any: The results of the function.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque(
+            executor.submit(function, item)
+            for item in islice(items, workers + queue_depth)
+        )
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(function, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iterate_json_batches(
+    batch_size: int, file_path: str = path_processed_tweets_json
+) -> Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]:
+    """
+    Lazily reads batches of user and tweet rows from the cleaned JSON file.
+
+    Args:
+        batch_size (int): The number of rows per batch.
+        file_path (str, optional): The path to the cleaned JSON file.
+            Defaults to path_processed_tweets_json.
+
+    Yields:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows of a batch.
+    """
+    for lines, _, _ in iterate_json_chunks(batch_size, file_path):
+        yield convert_json_lines(lines)
+
+
+def iterate_json_batches_pipelined(
+    batch_size: int,
+    parse_workers: int,
+    queue_depth: int,
+    file_path: str = path_processed_tweets_json,
+) -> Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]:
+    """
+    Lazily reads batches of user and tweet rows from the cleaned JSON file,
+    converting them on worker processes while the caller writes the previous
+    batches to the database (see map_in_workers).
+
+    Args:
+        batch_size (int): The number of rows per batch.
+        parse_workers (int): The number of worker processes.
+        queue_depth (int): The number of converted batches which may wait for the caller.
+        file_path (str, optional): The path to the cleaned JSON file.
+            Defaults to path_processed_tweets_json.
+
+    Yields:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows of a batch.
+    """
+    chunks = iterate_json_chunks(batch_size, file_path)
+    with closing(chunks):
+        yield from map_in_workers(
+            convert_json_lines,
+            (lines for lines, _, _ in chunks),
+            parse_workers,
+            queue_depth,
+        )
+
+
+def iterate_parquet_batches(
+    batch_size: int,
+) -> Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]:
+    """
+    Lazily reads batches of user and tweet rows from the cleaned Parquet dataset.
+
+    The columns are already typed and the timestamps already parsed, so the
+    rows are taken from the memory-mapped Arrow tables without any decoding.
+
+    Args:
+        batch_size (int): The maximum number of rows per batch.
+
+    Yields:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows of a batch.
+    """
+    for users, tweets in iterate_parts(path_processed_tweets_parquet):
+        for start in range(0, len(tweets), batch_size):
+            yield (
+                table_to_rows(users.slice(start, batch_size)),
+                table_to_rows(tweets.slice(start, batch_size)),
+            )
+
+
+def iterate_integer_id_batches(
+    batches: Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]],
+) -> Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]:
+    """
+    Lazily converts the IDs of batches of user and tweet rows to integers, see
+    convert_ids_to_integers.
+
+    Args:
+        batches (Iterator[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]): The
+            user and tweet rows of every batch, closed with this iterator.
+
+    Yields:
+        Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]: The user and tweet rows of a batch.
+    """
+    with closing(batches):
+        for user_data, tweet_data in batches:
+            yield convert_ids_to_integers(user_data, tweet_data)
+
+
+def insert_batches(
+    connection_params: Dict[str, Any],
+    local: bool,
+    batches: Iterable[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]],
+) -> None:
+    """
+    Inserts batches of user and tweet rows, committing after every batch.
+
+    Only the newest snapshot of every user of a batch is sent to the database
+    (see reduce_user_snapshots), and it only updates a user from an older tweet.
+    The first row of every tweet ID is kept.
+
+    Args:
+        connection_params (Dict[str, Any]): The parameters required to establish a database connection.
+        local (bool): Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
+        batches (Iterable[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]): The user
+            and tweet rows of every batch.
+
+    Returns:
+        None
+    """
+    with open_backend(connection_params, local) as backend:
+        for user_data, tweet_data in tqdm(batches, desc="Uploading batches: "):
+            backend.execute_queries(
+                [
+                    (
+                        backend.upsert_users,
+                        reduce_user_snapshots(user_data, tweet_data),
+                    ),
+                    (INSERT_TWEETS, tweet_data),
+                ]
+            )
+
+
+def bulk_insert_batches(
+    connection_params: Dict[str, Any],
+    local: bool,
+    batches: Iterable[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]],
+) -> None:
+    """
+    Loads batches of user and tweet rows into the database in a single transaction.
+
+    The rows are appended to staging tables without keys with the fastest way
+    of the database, and the Users and Tweets tables are then filled from them
+    in one pass sorted by their key (see database_backends and the bulk load
+    queries). The result is the same as the one of insert_batches: the newest
+    snapshot of every user and the first row of every tweet ID are kept.
+
+    For SQLite, the load runs without a rollback journal, so a load interrupted
+    by a crash leaves a database which has to be reset. For MySQL, the server
+    must allow LOAD DATA LOCAL INFILE with the local_infile variable set to ON.
+
+    Args:
+        connection_params (Dict[str, Any]): The parameters required to establish a database connection.
+        local (bool): Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
+        batches (Iterable[Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]]): The user
+            and tweet rows of every batch.
+
+    Returns:
+        None
+    """
+    with open_backend(connection_params, local, bulk_load=True) as backend:
+        backend.begin_bulk_load()
+        for user_data, tweet_data in tqdm(batches, desc="Staging batches: "):
+            backend.stage_rows("Users", reduce_user_snapshots(user_data, tweet_data))
+            backend.stage_rows("Tweets", tweet_data)
+        print("Building the Users and Tweets tables")
+        backend.end_bulk_load()
+
+
+def resume_insert_json(
+    connection_params: Dict[str, Any],
+    local: bool,
+    batch_size: int,
+    parse_workers: int = 0,
+    queue_depth: int = 2,
+    file_path: str = path_processed_tweets_json,
+    integer_ids: bool = False,
+) -> None:
+    """
+    Inserts the cleaned JSON file in batches like insert_batches, resuming
+    after the last batch committed by a previous, interrupted, load.
+
+    Every batch is committed in the same transaction as its position in the
+    file, in the LoadProgress table. A batch is therefore either inserted and
+    recorded or not at all, and a retried batch never inserts a row twice.
+
+    Args:
+        connection_params (Dict[str, Any]): The parameters required to establish a database connection.
+        local (bool): Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
+        batch_size (int): The size of each batch for data insertion.
+        parse_workers (int, optional): The number of processes converting the
+            batches, see map_in_workers. 0 converts them in the main process.
+            Defaults to 0.
+        queue_depth (int, optional): The number of converted batches which may
+            wait for the database. Defaults to 2.
+        file_path (str, optional): The path to the cleaned JSON file.
+            Defaults to path_processed_tweets_json.
+        integer_ids (bool, optional): Whether the IDs are converted to integers,
+            for the tables with integer IDs. Defaults to False.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the recorded position is not the start of a line of the
+            file, e.g. if the file was extracted again since.
+    """
+    source: str = os.path.basename(file_path)
+    with open_backend(connection_params, local) as backend:
+        progress: List[Tuple[int, int]] = backend.execute(
+            SELECT_LOAD_PROGRESS, (source,)
+        ).fetchall()
+        byte_offset, line_number = progress[0] if progress else (0, 0)
+        if byte_offset:
+            with open(file_path, "rb") as file:
+                file.seek(byte_offset - 1)
+                if file.read(1) != b"\n":
+                    raise ValueError(
+                        f"{source} changed since its load was interrupted, "
+                        "reset the database to load it again"
+                    )
+            print(f"Resuming the load of {source} after line {line_number:,}")
+
+        chunks = iterate_json_chunks(batch_size, file_path, byte_offset, line_number)
+        batches = (
+            map_in_workers(convert_json_chunk, chunks, parse_workers, queue_depth)
+            if parse_workers > 0
+            else (convert_json_chunk(chunk) for chunk in chunks)
+        )
+        with closing(chunks), closing(batches):
+            for user_data, tweet_data, byte_offset, line_number in tqdm(
+                batches, desc="Uploading batches: "
+            ):
+                if integer_ids:
+                    user_data, tweet_data = convert_ids_to_integers(
+                        user_data, tweet_data
+                    )
+                backend.execute_queries(
+                    [
+                        (
+                            backend.upsert_users,
+                            reduce_user_snapshots(user_data, tweet_data),
+                        ),
+                        (INSERT_TWEETS, tweet_data),
+                        (REPLACE_LOAD_PROGRESS, [(source, byte_offset, line_number)]),
+                    ]
+                )
+
+
+def load_tables(
+    connection_params: Dict[str, Any],
+    local: bool,
+    batch_size: int,
+    input_format: str,
+    bulk_load: bool,
+    parse_workers: int,
+    queue_depth: int,
+    resume: bool,
+    integer_ids: bool,
+) -> None:
+    """
+    Loads the user and tweet data into the tables, see database_fill for the arguments.
 
     Returns:
         None
     """
-    connection = connect_to_database(connection_params, local)
-    table_creation: List[str] = [
-        CREATE_USERS_MYSQL,
-        CREATE_TWEETS_MYSQL,
-        CREATE_CONVERSATIONS_MYSQL,
-        CREATE_CONVERSATIONS_CATEGORY_MYSQL,
-    ]
-    if local:
-        table_creation: List[str] = [
-            CREATE_USERS_SQLITE,
-            CREATE_TWEETS_SQLITE,
-            CREATE_CONVERSATIONS_SQLITE,
-            CREATE_CONVERSATIONS_CATEGORY_SQLITE,
-        ]
-
-    execute_queries(connection, table_creation)
-    connection.close()
+    if resume:
+        resume_insert_json(
+            connection_params,
+            local,
+            batch_size,
+            parse_workers,
+            queue_depth,
+            integer_ids=integer_ids,
+        )
+        return
+
+    if input_format == "parquet":
+        # The Parquet columns are already typed, there is nothing to convert
+        batches = iterate_parquet_batches(batch_size)
+    elif parse_workers > 0:
+        batches = iterate_json_batches_pipelined(batch_size, parse_workers, queue_depth)
+    else:
+        batches = iterate_json_batches(batch_size)
+    if integer_ids:
+        batches = iterate_integer_id_batches(batches)
+
+    # Closed explicitly, to stop the workers as soon as the insertion fails
+    with closing(batches):
+        if bulk_load:
+            bulk_insert_batches(connection_params, local, batches)
+        else:
+            insert_batches(connection_params, local, batches)
 
 
 def database_fill(
-    connection_params: Dict[str, Any], local: bool, batch_size: int
+    connection_params: Dict[str, Any],
+    local: bool,
+    batch_size: int,
+    input_format: str = "json",
+    bulk_load: bool = False,
+    parse_workers: int = 0,
+    queue_depth: int = 2,
+    resume: bool = False,
+    integer_ids: bool = False,
 ) -> None:
     """
     Fills the database tables with user and tweet data in batches.
 
+    The secondary indexes (see SECONDARY_INDEXES) are dropped before the load
+    and built again once the tables are filled.
+
     Args:
         connection_params (Dict[str, Any]): The parameters required to establish a database connection.
-        local (bool): Flag indicating whether the database is local (SQLite) or remote (MySQL).
+        local (bool): Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
         batch_size (int): The size of each batch for data insertion.
+        input_format (str, optional): The format of the cleaned tweets, "json" or "parquet".
+            Defaults to "json".
+        bulk_load (bool, optional): Whether to load the database with
+            bulk_insert_batches instead of committing every batch. Defaults to False.
+        parse_workers (int, optional): The number of processes converting the
+            JSON batches while the database is written, see
+            iterate_json_batches_pipelined. 0 converts them in the main process.
+            Defaults to 0.
+        queue_depth (int, optional): The number of converted batches which may
+            wait for the database. Defaults to 2.
+        resume (bool, optional): Whether to record the progress of the load of
+            the JSON file and resume an interrupted load, see resume_insert_json.
+            Not available with the Parquet input or bulk_load. Defaults to False.
+        integer_ids (bool, optional): Whether the IDs are converted to integers,
+            for the tables created with integer IDs. Defaults to False.
 
     Returns:
         None
+
+    Raises:
+        ValueError: If resume is combined with the Parquet input or bulk_load.
     """
-    insertion_user: str = """
-    INSERT OR IGNORE INTO Users(user_id, verified, followers_count, friends_count,
-    statuses_count, creation_time, default_profile, default_profile_image)
-    VALUES(?, ?, ?, ?, ?, ?, ?, ?);
-    """
-
-    insertion_tweets: str = """
-    INSERT OR IGNORE INTO Tweets(tweet_id, user_id, full_text, lang, creation_time, country_code, favorite_count,
-    retweet_count, possibly_sensitive, replied_tweet_id, reply_count, quoted_status_id, quote_count)
-    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-    """
-    if not local:
-        insertion_user = insertion_user.replace("?", "%s").replace(" OR", "")
-        insertion_tweets = insertion_tweets.replace("?", "%s").replace(" OR", "")
-
-    with open(path_processed_tweets_json, "r") as file:
-        connection = connect_to_database(connection_params, local)
-        user_data: List[Tuple[Any, ...]] = []
-        tweet_data: List[Tuple[Any, ...]] = []
-        for line in tqdm(file, desc="Uploading data: ", mininterval=5):
-            tweet_dict: Dict[str, Any] = json.loads(line[:-2])
-            if data := process_json_object(tweet_dict):
-                user_data.append(data[0])
-                tweet_data.append(data[1])
-            if len(user_data) >= batch_size:
-                execute_queries(
-                    connection,
-                    [(insertion_user, user_data), (insertion_tweets, tweet_data)],
-                )
-                user_data, tweet_data = [], []
-        if user_data:
-            execute_queries(
-                connection,
-                [(insertion_user, user_data), (insertion_tweets, tweet_data)],
-            )
+    if resume and (input_format == "parquet" or bulk_load):
+        raise ValueError(
+            "Only the JSON input without bulk_load can resume an interrupted load"
+        )
 
-        connection.close()
+    # The secondary indexes are built once the tables are loaded
+    with open_backend(connection_params, local) as backend:
+        backend.drop_indexes()
+    load_tables(
+        connection_params,
+        local,
+        batch_size,
+        input_format,
+        bulk_load,
+        parse_workers,
+        queue_depth,
+        resume,
+        integer_ids,
+    )
+    print("Creating the secondary indexes")
+    with open_backend(connection_params, local) as backend:
+        backend.create_indexes()
 
 
 if __name__ == "__main__":
     local: bool = True
     reset: bool = False
     batch_size: int = 100_000
+    # "parquet" if the tweets were extracted with `--output-format parquet`
+    input_format: str = "json"
+    # Opt-in load through staging tables, see bulk_insert_batches: on SQLite it
+    # runs without a journal, under an exclusive lock and in a single
+    # transaction, so a crash corrupts the database and the next run needs
+    # reset = True, and on MySQL the server needs local_infile=ON
+    bulk_load: bool = False
+    # Processes converting the JSON batches while the database is written
+    # (0 to convert them in the main process), and converted batches which may
+    # wait for the database
+    parse_workers: int = max((os.cpu_count() or 1) - 1, 0)
+    queue_depth: int = 2
+    # Resume an interrupted load of the JSON file (requires bulk_load = False)
+    resume: bool = False
+    # Store the tweet and user IDs as integers instead of text (for a new or
+    # reset database, see the Integer IDs queries)
+    integer_ids: bool = False
     connection_params: Dict[str, Any] = form_connection_params(local)
     if reset:
         print("Resetting the database")
-        connection = connect_to_database(connection_params, local)
-        execute_queries(
-            connection,
-            [
-                "DROP TABLE IF EXISTS ConversationsCategory",
-                "DROP TABLE IF EXISTS Conversations",
-                "DROP TABLE IF EXISTS Tweets",
-                "DROP TABLE IF EXISTS Users",
-            ],
-        )
+        with open_backend(connection_params, local) as backend:
+            backend.execute_queries(
+                [
+                    "DROP TABLE IF EXISTS LoadProgress",
+                    "DROP TABLE IF EXISTS ConversationsCategory",
+                    "DROP TABLE IF EXISTS Conversations",
+                    "DROP TABLE IF EXISTS Tweets",
+                    "DROP TABLE IF EXISTS Users",
+                ]
+            )
     print("Start database creation")
-    create_db(connection_params, local)
+    create_db(connection_params, local, integer_ids)
     print("Database has been created")
     print("Start data insertion")
-    database_fill(connection_params, local, batch_size)
+    database_fill(
+        connection_params,
+        local,
+        batch_size,
+        input_format,
+        bulk_load,
+        parse_workers,
+        queue_depth,
+        resume,
+        integer_ids,
+    )
     print("Data insertion finished")
@@ -0,0 +1,352 @@
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+from insert_to_db import bulk_insert_batches, create_db, insert_batches
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "_0_Constants_and_Utils",
+    )
+)
+
+import database_backends
+from database_backends import write_load_data_file
+
+# Checks the LOAD DATA files of the MySQL bulk load, and the loader itself with
+# a stand-in for the MySQL connection, as no server is needed for the tests.
+
+
+def read_load_data_file(file_path: str) -> List[List[Optional[str]]]:
+    """
+    Reads a LOAD DATA file with the rules of MySQL for the format of the bulk
+    load: tab-separated fields, newline-terminated rows, backslash escapes and
+    \\N for NULL.
+    """
+    escapes: Dict[str, str] = {"t": "\t", "n": "\n", "r": "\r", "0": "\0", "\\": "\\"}
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        data: str = file.read()
+    rows: List[List[Optional[str]]] = []
+    row: List[Optional[str]] = []
+    field: str = ""
+    escaped: bool = False
+    is_null: bool = False
+    for character in data:
+        if escaped:
+            escaped = False
+            if character == "N" and field == "":
+                is_null = True
+            else:
+                field += escapes.get(character, character)
+        elif character == "\\":
+            escaped = True
+        elif character in "\t\n":
+            row.append(None if is_null else field)
+            field, is_null = "", False
+            if character == "\n":
+                rows.append(row)
+                row = []
+        else:
+            field += character
+    return rows
+
+
+def as_mysql_string(value: Any) -> Optional[str]:
+    """
+    Returns the value as the string MySQL receives from mysql-connector.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+creation_time = datetime(2019, 5, 22, 14, 15, 3, tzinfo=timezone.utc)
+test_cases = [
+    {
+        "name": "1. Simple row",
+        "rows": [("1", True, 10, 20, 30, creation_time, False, 1)],
+    },
+    {
+        "name": "2. NULL and empty fields",
+        "rows": [("2", None, "", "N", "\\N", None)],
+    },
+    {
+        "name": "3. Tabs, newlines and backslashes in the text",
+        "rows": [
+            ("3", "line\nbreak\ttab\\backslash\r\n", "\\t is not a tab"),
+            ("4", "ends with a backslash \\", "\0 null character"),
+        ],
+    },
+    {
+        "name": "4. Unicode text",
+        "rows": [("5", "Flug verspätet 😡 ✈️", "日本語")],
+    },
+]
+
+for test_case in test_cases:
+    print(f"Starting: {test_case['name']}")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path: str = os.path.join(directory, "rows.tsv")
+        write_load_data_file(file_path, test_case["rows"])
+        result = read_load_data_file(file_path)
+    expected = [[as_mysql_string(value) for value in row] for row in test_case["rows"]]
+    assert (
+        result == expected
+    ), f"'{test_case['name']}' failed: expected {expected}, got {result}"
+    print(f"'{test_case['name']}' passed.")
+    print()
+
+
+class StagingCursor:
+    """
+    Stand-in for a MySQL cursor, loading the files into staging lists and
+    merging them like the bulk load: the newest snapshot of every user (the
+    first one for equal times) and the first row of every tweet ID.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, Tuple[Any, ...]]]):
+        self.tables = tables
+        self.staging: Dict[str, List[List[Optional[str]]]] = {}
+
+    def execute(self, query: str, params: Tuple[Any, ...] = ()) -> None:
+        words: List[str] = query.split()
+        if query.strip().startswith("CREATE TEMPORARY TABLE"):
+            self.staging[words[3]] = []
+        elif query.strip().startswith("LOAD DATA LOCAL INFILE"):
+            self.staging[words[7]].extend(read_load_data_file(params[0]))
+        elif query.strip().startswith(("INSERT INTO", "INSERT IGNORE INTO")):
+            table: str = words[words.index("INTO") + 1].split("(")[0]
+            for row in self.staging[f"{table}Staging"]:
+                kept: Optional[Tuple[Any, ...]] = self.tables[table].get(row[0])
+                if kept is None or (
+                    table == "Users"
+                    and row[-1] is not None
+                    and (kept[-1] is None or row[-1] > kept[-1])
+                ):
+                    self.tables[table][row[0]] = tuple(row)
+
+
+class StagingConnection:
+    def __init__(self, tables: Dict[str, Dict[str, Tuple[Any, ...]]]):
+        self.tables = tables
+
+    def cursor(self) -> StagingCursor:
+        return StagingCursor(self.tables)
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def tweet_row(tweet_id, user_id, text, hour):
+    return (tweet_id, user_id, text, "en", creation_time.replace(hour=hour), "NL") + (
+        1,
+        2,
+        None,
+        None,
+        0,
+        None,
+        0,
+    )
+
+
+print("Starting: 5. The newest snapshot of every user and the first row of every tweet")
+# The user 10 has 5 followers at 14h, 7 at 16h and 3 at 12h, the user 20 has 1
+# and then 9 followers at the same time, and the tweet 100 is duplicated
+user_10 = ("10", True, 5, 2, 3, creation_time, False, False)
+user_20 = ("20", False, 1, 1, 1, creation_time, True, True)
+batches = [
+    (
+        [user_10, user_10[:2] + (7,) + user_10[3:], user_20],
+        [
+            tweet_row("100", "10", "first\ttext", 14),
+            tweet_row("101", "10", "text", 16),
+            tweet_row("102", "20", "text", 9),
+        ],
+    ),
+    (
+        [user_10[:2] + (3,) + user_10[3:], user_20[:2] + (9,) + user_20[3:]],
+        [
+            tweet_row("100", "10", "second text", 12),
+            tweet_row("103", "20", "text", 9),
+        ],
+    ),
+]
+expected_followers: Dict[str, int] = {"10": 7, "20": 1}
+expected_texts: Dict[str, str] = {
+    "100": "first\ttext",
+    "101": "text",
+    "102": "text",
+    "103": "text",
+}
+
+tables: Dict[str, Dict[str, Tuple[Any, ...]]] = {"Users": {}, "Tweets": {}}
+with mock.patch.object(
+    database_backends, "connect_to_database", return_value=StagingConnection(tables)
+):
+    bulk_insert_batches({}, False, batches)
+
+with tempfile.TemporaryDirectory() as directory:
+    for load in (insert_batches, bulk_insert_batches):
+        connection_params: Dict[str, Any] = {
+            "file_path": os.path.join(directory, f"{load.__name__}.db")
+        }
+        create_db(connection_params, local=True)
+        load(connection_params, True, batches)
+        with sqlite3.connect(connection_params["file_path"]) as connection:
+            for table in ["Users", "Tweets"]:
+                expected = sorted(
+                    connection.execute(f"SELECT * FROM {table}").fetchall()
+                )
+                # SQLite keeps the timestamps as text with the time zone, and the
+                # Tweets table has the sentiment_score column as well
+                expected = [
+                    tuple(
+                        (
+                            as_mysql_string(datetime.fromisoformat(value))
+                            if isinstance(value, str) and value.endswith("+00:00")
+                            else as_mysql_string(value)
+                        )
+                        for value in row[: len(row) - (table == "Tweets")]
+                    )
+                    for row in expected
+                ]
+                result = sorted(tables[table].values())
+                assert (
+                    result == expected
+                ), f"'5. The newest snapshot of every user and the first row of every tweet' failed for {table} and {load.__name__}: expected {expected}, got {result}"
+            followers: Dict[str, int] = dict(
+                connection.execute("SELECT user_id, followers_count FROM Users")
+            )
+            assert (
+                followers == expected_followers
+            ), f"'5. The newest snapshot of every user and the first row of every tweet' failed for {load.__name__}: expected {expected_followers}, got {followers}"
+            texts: Dict[str, str] = dict(
+                connection.execute("SELECT tweet_id, full_text FROM Tweets")
+            )
+            assert (
+                texts == expected_texts
+            ), f"'5. The newest snapshot of every user and the first row of every tweet' failed for {load.__name__}: expected {expected_texts}, got {texts}"
+print("'5. The newest snapshot of every user and the first row of every tweet' passed.")
+print()
+
+print("Starting: 6. Databases created before the snapshot_time column are migrated")
+with tempfile.TemporaryDirectory() as directory:
+    for file_name in ["old.db", "old.duckdb"]:
+        connection_params = {"file_path": os.path.join(directory, file_name)}
+        # The Users table of a database created before the snapshot_time column
+        with database_backends.open_backend(connection_params, True) as backend:
+            backend.execute_queries(
+                [
+                    re.sub(r",(.*)\n\s*snapshot_time [^\n]*", r"\1", query)
+                    for query in backend.table_creation
+                ]
+                + [
+                    (
+                        "INSERT INTO Users VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [user_10[:2] + (1,) + user_10[3:]],
+                    )
+                ]
+            )
+            assert "snapshot_time" not in backend.table_columns(
+                "Users"
+            ), f"'6. Databases created before the snapshot_time column are migrated' failed for {file_name}: the old table already has the column"
+        create_db(connection_params, local=True)
+        insert_batches(connection_params, True, batches)
+        with database_backends.open_backend(connection_params, True) as backend:
+            followers = dict(
+                backend.execute("SELECT user_id, followers_count FROM Users").fetchall()
+            )
+        assert (
+            followers == expected_followers
+        ), f"'6. Databases created before the snapshot_time column are migrated' failed for {file_name}: expected {expected_followers}, got {followers}"
+print("'6. Databases created before the snapshot_time column are migrated' passed.")
+print()
+
+print("Starting: 7. DuckDB inserts and updates every batch like SQLite")
+with tempfile.TemporaryDirectory() as directory:
+    results: Dict[str, Dict[str, List[Tuple[Any, ...]]]] = {}
+    for file_name in ["insert.db", "insert.duckdb", "bulk.duckdb"]:
+        connection_params = {"file_path": os.path.join(directory, file_name)}
+        create_db(connection_params, local=True)
+        load = bulk_insert_batches if file_name.startswith("bulk") else insert_batches
+        load(connection_params, True, batches)
+        with database_backends.open_backend(connection_params, True) as backend:
+            # The last score of a tweet is kept
+            backend.update_rows(
+                "Tweets",
+                "sentiment_score",
+                "tweet_id",
+                [(0.5, "100"), (0.25, "101"), (-0.5, "100"), (1.0, "999")],
+            )
+            users = backend.execute(
+                "SELECT user_id, followers_count, snapshot_time FROM Users"
+            ).fetchall()
+            tweets = backend.execute(
+                "SELECT tweet_id, full_text, sentiment_score FROM Tweets"
+            ).fetchall()
+        # SQLite keeps the timestamps as text with the time zone
+        results[file_name] = {
+            "Users": sorted(
+                (
+                    user_id,
+                    followers,
+                    datetime.fromisoformat(str(snapshot_time)).replace(tzinfo=None),
+                )
+                for user_id, followers, snapshot_time in users
+            ),
+            "Tweets": sorted(tweets),
+        }
+    for file_name in ["insert.duckdb", "bulk.duckdb"]:
+        assert (
+            results[file_name] == results["insert.db"]
+        ), f"'7. DuckDB inserts and updates every batch like SQLite' failed for {file_name}: expected {results['insert.db']}, got {results[file_name]}"
+    scores = {row[0]: row[2] for row in results["insert.duckdb"]["Tweets"]}
+    assert scores == {
+        "100": -0.5,
+        "101": 0.25,
+        "102": None,
+        "103": None,
+    }, f"'7. DuckDB inserts and updates every batch like SQLite' failed: got the scores {scores}"
+print("'7. DuckDB inserts and updates every batch like SQLite' passed.")
+print()
+
+print("Starting: 8. The user upsert of MySQL depends on the server version")
+versions: Dict[str, str] = {
+    "8.0.36": database_backends.UPSERT_USERS_MYSQL,
+    "8.0.19-log": database_backends.UPSERT_USERS_MYSQL,
+    "9.1.0": database_backends.UPSERT_USERS_MYSQL,
+    "8.0.18": database_backends.UPSERT_USERS_MYSQL_VALUES,
+    "5.7.44": database_backends.UPSERT_USERS_MYSQL_VALUES,
+    "10.11.6-MariaDB": database_backends.UPSERT_USERS_MYSQL_VALUES,
+    "5.5.5-10.6.12-MariaDB-log": database_backends.UPSERT_USERS_MYSQL_VALUES,
+}
+for version, expected_upsert in versions.items():
+    connection = mock.MagicMock()
+    connection.cursor.return_value.fetchone.return_value = (version,)
+    with mock.patch.object(
+        database_backends, "connect_to_database", return_value=connection
+    ):
+        backend = database_backends.MysqlBackend({})
+        assert (
+            backend.upsert_users == expected_upsert
+        ), f"'8. The user upsert of MySQL depends on the server version' failed for {version}"
+        # The version is only queried once per connection
+        backend.upsert_users
+        assert connection.cursor.return_value.execute.call_count == 1
+print("'8. The user upsert of MySQL depends on the server version' passed.")
+print()
+
+print("All tests passed!")
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+import numpy as np
+from helper_functions import (
+    TWITTER_TIME_FORMAT,
+    parse_twitter_time,
+    parse_twitter_time_cached,
+    parse_twitter_time_column,
+)
+
+# Checks that the Twitter timestamp parsers give exactly the results and the
+# errors of datetime.strptime.
+
+
+def strptime_or_error(value):
+    try:
+        return datetime.strptime(value, TWITTER_TIME_FORMAT)
+    except ValueError as e:
+        return f"ValueError: {e}"
+
+
+def parse_or_error(parse, value):
+    try:
+        return parse(value)
+    except ValueError as e:
+        return f"ValueError: {e}"
+
+
+def as_utc_datetime64(parsed):
+    return np.datetime64(parsed.astimezone(timezone.utc).replace(tzinfo=None), "s")
+
+
+random = Random(0)
+start = datetime(2006, 3, 21, tzinfo=timezone.utc)
+random_values = [
+    (start + timedelta(seconds=random.randrange(20 * 365 * 24 * 3600))).strftime(
+        "%a %b %d %H:%M:%S +0000 %Y"
+    )
+    for _ in range(10_000)
+]
+
+test_cases = [
+    {
+        "name": "1. Timestamps of the Twitter API",
+        "values": [
+            "Wed Oct 10 20:19:24 +0000 2018",
+            "Mon Jan 02 10:00:00 +0000 2012",
+            "Sat Feb 29 23:59:59 +0000 2020",
+            "Thu Jan 01 00:00:00 +0000 1970",
+            "Fri Dec 31 23:59:59 +0000 9999",
+        ],
+    },
+    {
+        "name": "2. Random timestamps between 2006 and 2026",
+        "values": random_values,
+    },
+    {
+        "name": "3. Other time zone offsets",
+        "values": [
+            "Wed Oct 10 20:19:24 +0200 2018",
+            "Wed Oct 10 20:19:24 -0530 2018",
+            "Wed Oct 10 20:19:24 -0000 2018",
+            "Wed Oct 10 20:19:24 +2359 2018",
+        ],
+    },
+    {
+        "name": "4. Variants accepted by strptime",
+        "values": [
+            "wed oct 10 20:19:24 +0000 2018",
+            "WED OCT 10 20:19:24 +0000 2018",
+            "Wed Oct 1 20:19:24 +0000 2018",
+            "Wed Oct 10 20:19:24 +00:00 2018",
+            "Wed Oct 10 20:19:24 Z 2018",
+            "Wed Oct 10 2:19:24 +0000 2018",
+            "Wed Oct 10 20:19:24 +0000 2018".replace("2018", "２０１８"),
+            "Sun Oct 10 20:19:24 +0000 2018",
+        ],
+    },
+    {
+        "name": "5. Invalid timestamps raise the errors of strptime",
+        "values": [
+            "Wed Feb 30 20:19:24 +0000 2018",
+            "Wed Oct 10 24:19:24 +0000 2018",
+            "Wed Oct 10 20:60:24 +0000 2018",
+            "Wed Oct 10 20:19:60 +0000 2018",
+            "Wed Oct 10 20:19:24 +0060 2018",
+            "Wed Oct 10 20:19:24 +2400 2018",
+            "Wed Oct 00 20:19:24 +0000 2018",
+            "Wed Oct 10 20:19:24 +0000 0000",
+            "Xed Oct 10 20:19:24 +0000 2018",
+            "Wed Oct 10 20:19:24 +0000 2018 ",
+            "Wed Oct 10 20:19:24 +0000 20180",
+            "Wed Oct 10 20-19-24 +0000 2018",
+            "Wed Oct 1a 20:19:24 +0000 2018",
+            "not a timestamp",
+        ],
+    },
+]
+
+for test_case in test_cases:
+    print(f"Starting: {test_case['name']}")
+    for value in test_case["values"]:
+        expected = strptime_or_error(value)
+        for parse in (parse_twitter_time, parse_twitter_time_cached):
+            result = parse_or_error(parse, value)
+            # repr also compares the time zones, which == does not
+            assert repr(result) == repr(
+                expected
+            ), f"'{test_case['name']}' failed for {value!r}: expected {expected!r}, got {result!r}"
+
+        column_result = parse_or_error(parse_twitter_time_column, [value])
+        if isinstance(expected, str):
+            assert (
+                column_result == expected
+            ), f"'{test_case['name']}' failed for the column {value!r}: expected {expected!r}, got {column_result!r}"
+        else:
+            assert column_result[0] == as_utc_datetime64(
+                expected
+            ), f"'{test_case['name']}' failed for the column {value!r}: expected {expected!r}, got {column_result!r}"
+    print(f"'{test_case['name']}' passed.")
+    print()
+
+print("Starting: 6. Columns with missing values and mixed formats")
+values = [None, "", *random_values[:100], "Wed Oct 1 20:19:24 +0000 2018", None]
+result = parse_twitter_time_column(values)
+expected = [
+    as_utc_datetime64(strptime_or_error(value)) if value else np.datetime64("NaT")
+    for value in values
+]
+assert result.dtype == np.dtype(
+    "datetime64[s]"
+), f"'6. Columns with missing values and mixed formats' failed: got the type {result.dtype}"
+assert np.array_equal(
+    result, np.array(expected, "datetime64[s]"), equal_nan=True
+), f"'6. Columns with missing values and mixed formats' failed: expected {expected}, got {result}"
+assert len(parse_twitter_time_column([])) == 0
+assert np.isnat(parse_twitter_time_column([None, ""])).all()
+print("'6. Columns with missing values and mixed formats' passed.")
+print()
+
+print("All tests passed!")
@@ -1,7 +1,7 @@
 from collections import defaultdict
 
 import pandas as pd
-from tqdm.notebook import tqdm
+from tqdm.auto import tqdm
 
 
 class TrieNode:
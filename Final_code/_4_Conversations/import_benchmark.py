@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+# This is a script benchmarking the start of a run, in a fresh interpreter
+# with `python -X importtime`:
+# - `python import_benchmark.py` imports the modules of a conversation run
+#   (database_utils, database_backends and conversation_algorithm), creates the
+#   tables of a new SQLite database and reads its tweets, then reports the time
+#   until the first query, the slowest imports, the heavy packages which were
+#   loaded (e.g. mysql-connector or TensorFlow) and the network connections.
+# - `python import_benchmark.py --modules sentiment_utils category_utils` does
+#   the same after importing other modules, which should not load their models
+#   or download anything until they are used.
+
+FOLDER: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The folders of the modules which can be benchmarked
+MODULE_FOLDERS: List[str] = [
+    os.path.join(FOLDER, folder)
+    for folder in (
+        "_0_Constants_and_Utils",
+        "_4_Conversations",
+        "_5_Sentiment_Score",
+        "_6_Categorisation",
+    )
+]
+CONVERSATION_MODULES: List[str] = [
+    "database_utils",
+    "database_backends",
+    "conversation_algorithm",
+]
+# Packages which a SQLite run should not load
+HEAVY_PACKAGES: Tuple[str, ...] = (
+    "mysql",
+    "sqlalchemy",
+    "connectorx",
+    "adbc_driver_sqlite",
+    "tensorflow",
+    "transformers",
+    "nltk",
+    "IPython",
+)
+# Time until the first query of a run on SQLite, in seconds
+START_BUDGET: float = 1.0
+
+# The run in the fresh interpreter: the audit hook records every connection of
+# a socket, e.g. the downloads of NLTK or of the Hugging Face models
+RUN_CODE: str = """
+import json, sys, time
+start = time.perf_counter()
+connections = []
+sys.addaudithook(
+    lambda event, args: connections.append(repr(args[1]))
+    if event == "socket.connect"
+    else None
+)
+sys.path[:0] = {folders!r}
+for module in {modules!r}:
+    __import__(module)
+imported = time.perf_counter() - start
+from database_backends import open_backend
+from database_utils import get_dataframe_from_query
+connection_params = {{"file_path": {file_path!r}}}
+with open_backend(connection_params, True) as backend:
+    backend.create_tables()
+get_dataframe_from_query("SELECT * FROM Tweets", connection_params, True)
+print(json.dumps({{
+    "imported": imported,
+    "started": time.perf_counter() - start,
+    "modules": sorted(sys.modules),
+    "connections": connections,
+}}))
+"""
+
+
+def parse_import_times(stderr: str) -> List[Tuple[str, float]]:
+    """
+    Parses the report of `python -X importtime` into the cumulative time of
+    the modules imported directly by the run.
+
+    Args:
+        stderr (str): The standard error of the interpreter.
+
+    Returns:
+        List[Tuple[str, float]]: The modules and their cumulative import time
+            in seconds, slowest first.
+    """
+    times: List[Tuple[int, str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth: int = len(name) - len(name.lstrip())
+        times.append((depth, name.strip(), int(cumulative) / 1e6))
+    top_depth: int = min(depth for depth, _, _ in times)
+    return sorted(
+        ((name, seconds) for depth, name, seconds in times if depth == top_depth),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def benchmark_imports(modules: List[str], top: int) -> bool:
+    """
+    Runs the start of a run in a fresh interpreter and prints its report.
+
+    Args:
+        modules (List[str]): The modules imported before the first query.
+        top (int): The number of slowest imports printed.
+
+    Returns:
+        bool: Whether the run started within START_BUDGET seconds, without
+            heavy packages and without network connections.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        code: str = RUN_CODE.format(
+            folders=MODULE_FOLDERS,
+            modules=modules,
+            file_path=os.path.join(directory, "benchmark.db"),
+        )
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=directory,
+        )
+    if process.returncode != 0:
+        print(process.stderr.splitlines()[-1])
+        return False
+    result: Dict[str, Any] = json.loads(process.stdout.splitlines()[-1])
+
+    print(f"Imports of {', '.join(modules)}: {result['imported']:.3f} s")
+    print(f"Start until the first query on SQLite: {result['started']:.3f} s")
+    print("Slowest imports:")
+    for name, seconds in parse_import_times(process.stderr)[:top]:
+        print(f"  {name:<40} {seconds:.3f} s")
+    heavy: List[str] = [
+        package for package in HEAVY_PACKAGES if package in result["modules"]
+    ]
+    print(f"Heavy packages loaded: {', '.join(heavy) or 'none'}")
+    print(f"Network connections: {len(result['connections'])}")
+    for connection in result["connections"]:
+        print(f"  {connection}")
+    return result["started"] < START_BUDGET and not heavy and not result["connections"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the imports and the start of a run on SQLite."
+    )
+    parser.add_argument("--modules", nargs="*", default=[])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    passed: bool = benchmark_imports(CONVERSATION_MODULES + args.modules, args.top)
+    print(
+        f"{'Within' if passed else 'Over'} the budget of {START_BUDGET} s "
+        "without heavy packages or network connections"
+    )
+    sys.exit(0 if passed else 1)
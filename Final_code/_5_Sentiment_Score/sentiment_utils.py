@@ -5,12 +5,10 @@ import re
 import string
 import sys
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Any, List, Tuple
 
 import pandas as pd
-import tensorflow as tf
-from scipy.special import softmax
-from transformers import AutoTokenizer, TFAutoModelForSequenceClassification
 
 sys.path.append(
     os.path.join(
@@ -19,22 +17,35 @@ sys.path.append(
     )
 )
 
-from database_utils import connect_to_database, execute_queries
+from database_backends import open_backend
 
-# Load the tokenizer and model
+# The sentiment model, loaded by get_sentiment_model
 model_name = "cardiffnlp/twitter-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = TFAutoModelForSequenceClassification.from_pretrained(
-    "cardiffnlp/twitter-roberta-base-sentiment"
-)
-if physical_devices := tf.config.list_physical_devices("GPU"):
-    try:
-        for device in physical_devices:
-            tf.config.experimental.set_memory_growth(device, True)
-    except RuntimeError as e:
-        print(e)
 
-device = "/GPU:0" if tf.config.list_physical_devices("GPU") else "/CPU:0"
+
+@lru_cache(maxsize=None)
+def get_sentiment_model() -> Tuple[Any, Any, str]:
+    """
+    Loads the tokenizer and the model the first time they are needed, so that
+    importing this module does not load TensorFlow, the model or the GPUs.
+
+    Returns:
+        Tuple[Any, Any, str]: The tokenizer, the model and the TensorFlow device.
+    """
+    import tensorflow as tf
+    from transformers import AutoTokenizer, TFAutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = TFAutoModelForSequenceClassification.from_pretrained(model_name)
+    if physical_devices := tf.config.list_physical_devices("GPU"):
+        try:
+            for device in physical_devices:
+                tf.config.experimental.set_memory_growth(device, True)
+        except RuntimeError as e:
+            print(e)
+
+    device = "/GPU:0" if physical_devices else "/CPU:0"
+    return tokenizer, model, device
 
 
 def process_batch(texts):
@@ -49,6 +60,10 @@ def process_batch(texts):
 
     This function uses a pre-trained transformer model for sequence classification to analyze the sentiment of the texts in the given batch. It returns a list of ranked sentiment labels for the input texts, where the first label is the most likely sentiment and the subsequent labels are less likely sentiments.
     """
+    import tensorflow as tf
+    from scipy.special import softmax
+
+    tokenizer, model, device = get_sentiment_model()
     # Get the maximum sequence length for the model
     encoded_input = tokenizer(
         texts, return_tensors="tf", padding=True, truncation=True, max_length=512
@@ -64,6 +79,8 @@ def process_batch(texts):
 
 
 def clear_gpu_memory():
+    import tensorflow as tf
+
     tf.keras.backend.clear_session()  # Clear the current session
     with contextlib.suppress(AttributeError):
         tf.compat.v1.reset_default_graph()  # For TensorFlow 1.x compatibility
@@ -92,6 +109,8 @@ def apply_sentiment_analysis(
     """
     texts = df[text_column].tolist()
     results = []
+    # Loaded before the threads, which would otherwise all load it at once
+    get_sentiment_model()
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         for i in range(0, len(texts), batch_size):
@@ -127,18 +146,15 @@ def update_sentiment_scores(
     batch: List[Tuple[str, str]], connection_params: dict, local: bool
 ) -> None:
     """
-    Update full_text values for a batch of data in the local SQLite database.
+    Update sentiment_score values for a batch of tweets in the database.
 
     Args:
-        batch: List of (full_text, tweet_id) pairs.
-        db_path: The path to the SQLite database file.
+        batch: List of (sentiment_score, tweet_id) pairs.
+        connection_params: The parameters required to establish the database connection.
+        local: Flag indicating whether the database is local (SQLite or DuckDB) or remote (MySQL).
     """
-    update_query = "UPDATE Tweets SET sentiment_score = ? WHERE tweet_id = ?"
-    if not local:
-        update_query = update_query.replace("?", "%s")
-    with connect_to_database(connection_params, local) as connection:
-        execute_queries(connection, [(update_query, batch)])
-        connection.commit()
+    with open_backend(connection_params, local) as backend:
+        backend.update_rows("Tweets", "sentiment_score", "tweet_id", batch)
 
 
 def get_batches(df: pd.DataFrame, batch_size: int = 1000) -> List[pd.DataFrame]:
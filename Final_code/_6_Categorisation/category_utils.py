@@ -1,25 +1,51 @@
 import re
 import string
+import threading
 from functools import lru_cache
-from typing import List
+from typing import Any, Callable, Dict, List, Set, Tuple
 
-import nltk
 import pandas as pd
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
 
-nltk.download("punkt")
-nltk.download("stopwords")
-nltk.download("wordnet")
+# The NLTK data used by normalise_text, by its path in the NLTK data folders
+NLTK_RESOURCES: Dict[str, str] = {
+    "punkt": "tokenizers/punkt",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+}
+# The threads normalising the texts at once wait for one download
+nltk_lock: threading.Lock = threading.Lock()
 
-# Initialize once to avoid repeated initialization
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words("english"))
+
+@lru_cache(maxsize=None)
+def get_nltk_tools() -> Tuple[Callable[[str], List[str]], Any, Set[str]]:
+    """
+    Initialises NLTK the first time it is needed, downloading only the data
+    which is not installed yet, so that importing this module neither loads
+    NLTK nor goes online.
+
+    Returns:
+        Tuple[Callable[[str], List[str]], Any, Set[str]]: The tokenizer, the
+            lemmatizer and the English stop words.
+    """
+    import nltk
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    with nltk_lock:
+        for name, path in NLTK_RESOURCES.items():
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                nltk.download(name)
+
+    # Initialize once to avoid repeated initialization
+    return word_tokenize, WordNetLemmatizer(), set(stopwords.words("english"))
 
 
 @lru_cache(maxsize=512)
 def process_token(token):
+    _, lemmatizer, stop_words = get_nltk_tools()
     return lemmatizer.lemmatize(token) if token not in stop_words else ""
 
 
@@ -39,6 +65,7 @@ def normalise_text(tweet):
     # Remove numbers
     tweet = re.sub(r"\d+", "", tweet)
     # Tokenize the tweet
+    word_tokenize, _, _ = get_nltk_tools()
     tokens = word_tokenize(tweet)
     # Process tokens to remove stop words and lemmatize
     processed_tokens = [process_token(token) for token in tokens if token]